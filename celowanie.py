@@ -0,0 +1,213 @@
+import numpy as np
+
+from model_kwadratowy import initial_state, integrate_states, inverse_height
+
+# Zadanie odwrotne: jaki kąt (albo jaka prędkość) trafia w cel (x, y) przy danym oporze, masie i g.
+# Dla kąta zwracane są dwa rozwiązania – płaskie (niskie) i stromne (wysokie); NaN oznacza,
+# że cel jest poza zasięgiem. Wszystkie argumenty mogą być tablicami, więc całą tabelę
+# rozwiązań ogniowych liczy się jednym wywołaniem. Model kwadratowy przyjmuje też wiatr, wysokość
+# skali atmosfery i wysokość wystrzału (jak integrate_batch); y celu liczone jest wtedy w tym samym
+# układzie co y_launch. Model liniowy (postać zamknięta) zakłada bezwietrzne powietrze o stałej
+# gęstości i start z y = 0.
+
+# Liczba iteracji metod z przedziałem izolacji (Newton z bisekcją, Illinois, złoty podział)
+NEWTON_ITERATIONS = 60
+ILLINOIS_ITERATIONS = 40
+GOLDEN_ITERATIONS = 40
+GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+def _broadcast(*args):
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in args))
+    return [a.ravel().copy() for a in arrays], arrays[0].shape
+
+
+def _shape(result, shape):
+    result = result.reshape(shape)
+    return result[()] if result.ndim == 0 else result
+
+
+def _newton_bracketed(func, lo, hi, iterations=NEWTON_ITERATIONS):
+    # Newton z zabezpieczeniem bisekcją: func(x) -> (wartość, pochodna), func(lo) < 0 < func(hi).
+    # Krok Newtona wychodzący poza przedział izolacji zastępowany jest połową przedziału.
+    x = 0.5 * (lo + hi)
+    for _ in range(iterations):
+        with np.errstate(all='ignore'):
+            val, der = func(x)
+            lo = np.where(val < 0, x, lo)
+            hi = np.where(val < 0, hi, x)
+            x_newton = x - val / der
+        inside = np.isfinite(x_newton) & (x_newton > lo) & (x_newton < hi)
+        x_next = np.where(inside, x_newton, 0.5 * (lo + hi))
+        if np.all(np.abs(x_next - x) <= 1e-15 * np.maximum(1.0, np.abs(x))):
+            return x_next
+        x = x_next
+    return x
+
+
+def _illinois(func, a, b, fa, fb, iterations=ILLINOIS_ITERATIONS, xtol=1e-12):
+    # Regula falsi w wariancie Illinois (przedział izolacji jak w metodzie Brenta) dla wielu
+    # równań naraz; fa i fb mają przeciwne znaki. Każda iteracja to jedno wywołanie func.
+    for _ in range(iterations):
+        with np.errstate(all='ignore'):
+            c = b - fb * (b - a) / (fb - fa)
+        c = np.where(np.isfinite(c) & (c > np.minimum(a, b)) & (c < np.maximum(a, b)), c, 0.5 * (a + b))
+        fc = func(c)
+        flip = np.sign(fc) != np.sign(fb)
+        a, fa = np.where(flip, b, a), np.where(flip, fb, 0.5 * fa)
+        b, fb = c, fc
+        if np.all((np.abs(b - a) <= xtol * np.maximum(1.0, np.abs(b))) | (fb == 0)):
+            break
+    return b
+
+
+def golden_max(func, lo, hi, iterations=GOLDEN_ITERATIONS):
+    # Maksimum funkcji jednomodalnej metodą złotego podziału, wektorowo dla wszystkich wierszy
+    c = hi - GOLDEN * (hi - lo)
+    d = lo + GOLDEN * (hi - lo)
+    fc, fd = func(c), func(d)
+    for _ in range(iterations):
+        left = fc > fd
+        lo = np.where(left, lo, c)
+        hi = np.where(left, d, hi)
+        c, d = np.where(left, hi - GOLDEN * (hi - lo), d), np.where(left, c, lo + GOLDEN * (hi - lo))
+        f_new = func(np.where(left, c, d))
+        fc, fd = np.where(left, f_new, fd), np.where(left, fc, f_new)
+    # Lepszy z dwóch ostatnich punktów, a nie środek przedziału – gdy maksimum leży na granicy
+    # dziedziny (func = -inf poza nią), środek mógłby wypaść tuż za granicą
+    return np.where(fc >= fd, c, d)
+
+
+# --- Model liniowy (postać zamknięta) ---
+
+def _height_linear(theta, x, v0, tau, g):
+    # Wysokość toru nad punktem x przy kącie theta [rad] i jej pochodna po theta:
+    # h = x tan(theta) + g tau x / (v0 cos(theta)) + g tau² ln(1 - x / (tau v0 cos(theta)))
+    cos = np.cos(theta)
+    q = x / (tau * v0 * cos)
+    h = x * np.tan(theta) + g * tau * x / (v0 * cos) + g * tau**2 * np.log1p(-q)
+    dh = x / cos**2 + g * tau * x * np.sin(theta) / (v0 * cos**2) - g * tau**2 * q * np.tan(theta) / (1 - q)
+    return h, dh
+
+
+def solve_angle_linear(x_target, y_target, v0, k1, m, g):
+    # Kąty [°] trafiające w (x_target, y_target) w modelu liniowym: (niski, wysoki).
+    # Wysokość nad celem h(theta) ma postać zamkniętą, a na krańcach dziedziny spada do -inf,
+    # więc najpierw szukamy jej maksimum, a potem po jednym pierwiastku po każdej stronie.
+    (x, y, v0, k1, m, g), shape = _broadcast(x_target, y_target, v0, k1, m, g)
+    tau = m / k1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        theta_max = np.arccos(np.where(x < tau * v0, x / (tau * v0), np.nan))
+    reachable = (x > 0) & np.isfinite(theta_max)
+    theta_max = np.where(reachable, theta_max, 1.0)
+
+    # Maksimum h: pochodna jest malejąca, od +inf do -inf na krańcach dziedziny
+    lo, hi = -theta_max, theta_max.copy()
+    for _ in range(NEWTON_ITERATIONS):
+        mid = 0.5 * (lo + hi)
+        with np.errstate(all='ignore'):
+            rising = _height_linear(mid, x, v0, tau, g)[1] > 0
+        lo = np.where(rising, mid, lo)
+        hi = np.where(rising, hi, mid)
+    theta_top = 0.5 * (lo + hi)
+    with np.errstate(all='ignore'):
+        reachable &= _height_linear(theta_top, x, v0, tau, g)[0] >= y
+
+    def rising_branch(theta):
+        h, dh = _height_linear(theta, x, v0, tau, g)
+        return h - y, dh
+
+    def falling_branch(theta):
+        h, dh = _height_linear(theta, x, v0, tau, g)
+        return y - h, -dh
+
+    low = _newton_bracketed(rising_branch, -theta_max, theta_top)
+    high = _newton_bracketed(falling_branch, theta_top, theta_max)
+    low = np.where(reachable, np.degrees(low), np.nan)
+    high = np.where(reachable, np.degrees(high), np.nan)
+    return _shape(low, shape), _shape(high, shape)
+
+
+def solve_velocity_linear(x_target, y_target, angle, k1, m, g):
+    # Najmniejsza prędkość [m/s] trafiająca w cel przy zadanym kącie w modelu liniowym.
+    # Liczymy w zmiennej s = 1 / v0, w której wysokość nad celem maleje od x tan(kąt) (s = 0)
+    # do -inf (s = tau cos(kąt) / x), więc przedział izolacji jest skończony.
+    (x, y, angle, k1, m, g), shape = _broadcast(x_target, y_target, angle, k1, m, g)
+    tau = m / k1
+    theta = np.radians(angle)
+    cos = np.cos(theta)
+    reachable = (x > 0) & (g > 0) & (cos > 0) & (y < x * np.tan(theta))
+
+    def height(s):
+        q = x * s / (tau * cos)
+        h = x * np.tan(theta) + g * tau * x * s / cos + g * tau**2 * np.log1p(-q)
+        dh = g * tau * x / cos * (1 - 1 / (1 - q))
+        return y - h, -dh
+
+    s_max = np.where(reachable, tau * cos / np.where(x > 0, x, 1.0), 1.0)
+    s = _newton_bracketed(height, np.zeros_like(x), s_max)
+    with np.errstate(divide='ignore'):
+        v0 = np.where(reachable, 1 / s, np.nan)
+    return _shape(v0, shape)
+
+
+# --- Model kwadratowy (wsadowe całkowanie ODE) ---
+
+def height_at_distance(x_target, y_target, v0, angle, g, drag, mass, rtol=1e-7, atol=1e-9,
+                       wind=0.0, scale_height=0.0, y_launch=0.0):
+    # Ciągła miara trafienia dla modelu kwadratowego: wysokość toru nad x_target, jeśli pocisk
+    # tam doleci, w przeciwnym razie y - (x_target - x) w chwili zejścia poniżej poziomu
+    # min(y_target, y_launch) - 1. Obie gałęzie zgadzają się na granicy, więc funkcja jest ciągła,
+    # a jej znak względem y_target rozstrzyga trafienie ponad/poniżej celu.
+    (x_target, y_target, v0, angle, g, drag, mass, wind, scale_height, y_launch), shape = _broadcast(
+        x_target, y_target, v0, angle, g, drag, mass, wind, scale_height, y_launch)
+    floor = np.minimum(y_target, y_launch) - 1.0
+
+    def event(state, rows):
+        return np.minimum(x_target[rows] - state[0], state[1] - floor[rows])
+
+    state0 = initial_state(v0, angle, y_start=y_launch)
+    inv_height = inverse_height(scale_height)
+    _, y_end, _, _ = integrate_states(state0, g, drag / mass, event=event, rtol=rtol, atol=atol,
+                                      wind=wind if np.any(wind) else None,
+                                      inv_height=inv_height if np.any(inv_height) else None)
+    return _shape(y_end[1] - np.maximum(x_target - y_end[0], 0.0), shape)
+
+
+def solve_angle_quadratic(x_target, y_target, v0, g, drag, mass, rtol=1e-7, atol=1e-9,
+                          wind=0.0, scale_height=0.0, y_launch=0.0):
+    # Kąty [°] trafiające w cel w modelu z kwadratowym oporem (projectile_ode): (niski, wysoki).
+    # Każda iteracja złotego podziału i metody Illinois to jedno wsadowe całkowanie wszystkich celów.
+    (x, y, v0, g, drag, mass, wind, scale_height, y_launch), shape = _broadcast(
+        x_target, y_target, v0, g, drag, mass, wind, scale_height, y_launch)
+
+    def miss(angle):
+        return height_at_distance(x, y, v0, angle, g, drag, mass, rtol, atol, wind, scale_height, y_launch) - y
+
+    bottom = np.full_like(x, -90.0)
+    top = np.full_like(x, 90.0)
+    angle_top = golden_max(miss, bottom, top)
+    f_top = miss(angle_top)
+    reachable = (x > 0) & (f_top >= 0)
+
+    low = _illinois(miss, bottom, angle_top, miss(bottom), f_top)
+    high = _illinois(miss, angle_top, top, f_top, miss(top))
+    low = np.where(reachable, low, np.nan)
+    high = np.where(reachable, high, np.nan)
+    return _shape(low, shape), _shape(high, shape)
+
+
+def solve_velocity_quadratic(x_target, y_target, angle, g, drag, mass, v_max=10000.0, rtol=1e-7, atol=1e-9,
+                             wind=0.0, scale_height=0.0, y_launch=0.0):
+    # Najmniejsza prędkość [m/s] z przedziału (0, v_max] trafiająca w cel przy zadanym kącie
+    (x, y, angle, g, drag, mass, v_max, wind, scale_height, y_launch), shape = _broadcast(
+        x_target, y_target, angle, g, drag, mass, v_max, wind, scale_height, y_launch)
+
+    def miss(v0):
+        return height_at_distance(x, y, v0, angle, g, drag, mass, rtol, atol, wind, scale_height, y_launch) - y
+
+    v_min = np.zeros_like(x)
+    f_min, f_max = miss(v_min), miss(v_max)
+    reachable = (x > 0) & (f_min < 0) & (f_max >= 0)
+    v0 = _illinois(miss, v_min, v_max, f_min, f_max)
+    return _shape(np.where(reachable, v0, np.nan), shape)
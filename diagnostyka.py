@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Pomiary wydajności: czasy wywołań (całkowanie, budowa i serializacja wykresów, klatki animacji),
+# liczniki obliczeń prawej strony ODE i kroków całkowania, liczby punktów oraz trafienia pamięci
+# podręcznych. Każda operacja ma ograniczony bufor ostatnich zdarzeń, więc rejestr może działać
+# stale; wspólny obiekt `recorder` zbiera pomiary całego procesu (wszystkich sesji Streamlit
+# i wątków w tle – ale nie procesów potomnych puli). SYMULACJE_DIAGNOSTYKA=0 wyłącza zapis.
+
+ENABLED = os.environ.get('SYMULACJE_DIAGNOSTYKA', '1') != '0'
+# Liczba ostatnich zdarzeń pamiętanych dla każdej operacji
+MAX_EVENTS = int(os.environ.get('SYMULACJE_DIAGNOSTYKA_ZDARZENIA', 1000))
+
+
+def rk45_rejected(nfev, accepted):
+    # Odrzucone kroki RK45 z liczby wywołań prawej strony: 2 na start (f0 i dobór kroku
+    # początkowego) i 6 na każdą próbę kroku (7 etapów, pierwszy przejęty z poprzedniego kroku)
+    return max((nfev - 2) // 6 - accepted, 0)
+
+
+class _Timer:
+    # Kontekst mierzący czas bloku; pola można uzupełniać w trakcie przez timer.fields
+    def __init__(self, recorder, name, fields):
+        self.recorder = recorder
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.recorder.record(self.name, time.perf_counter() - self.start, **self.fields)
+        return False
+
+
+class Recorder:
+    def __init__(self, max_events=MAX_EVENTS, enabled=ENABLED):
+        self.max_events = max_events
+        self.enabled = enabled
+        self._events = {}
+        self._calls = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds=None, **fields):
+        # Zdarzenie operacji name: czas trwania [s] i dowolne pola liczbowe (np. nfev, points)
+        if not self.enabled:
+            return
+        event = {'timestamp': time.time(), 'seconds': seconds}
+        event.update(fields)
+        with self._lock:
+            if name not in self._events:
+                self._events[name] = deque(maxlen=self.max_events)
+                self._calls[name] = 0
+            self._events[name].append(event)
+            self._calls[name] += 1
+
+    def timer(self, name, **fields):
+        return _Timer(self, name, fields)
+
+    def count(self, name, hit):
+        # Trafienie albo chybienie pamięci podręcznej name
+        if not self.enabled:
+            return
+        with self._lock:
+            counter = self._counters.setdefault(name, [0, 0])
+            counter[0 if hit else 1] += 1
+
+    def events(self, name):
+        with self._lock:
+            return list(self._events.get(name, ()))
+
+    def last(self, name):
+        with self._lock:
+            events = self._events.get(name)
+            return dict(events[-1]) if events else None
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._calls.clear()
+            self._counters.clear()
+
+    def summary(self):
+        # Statystyki operacji (z ostatnich zdarzeń; 'calls' liczy wszystkie) i pamięci podręcznych
+        with self._lock:
+            events = {name: list(queue) for name, queue in self._events.items()}
+            calls = dict(self._calls)
+            counters = {name: tuple(counter) for name, counter in self._counters.items()}
+        operations = {}
+        for name, items in events.items():
+            seconds = np.array([e['seconds'] for e in items if e['seconds'] is not None], dtype=float)
+            stats = {'calls': calls[name], 'recent': len(items)}
+            if len(seconds):
+                ms = seconds * 1000
+                stats.update(total_ms=float(ms.sum()), mean_ms=float(ms.mean()),
+                             p50_ms=float(np.percentile(ms, 50)), p95_ms=float(np.percentile(ms, 95)),
+                             max_ms=float(ms.max()))
+            # Średnie pól liczbowych zdarzeń (nfev, punkty, rozmiary...)
+            fields = sorted({key for e in items for key, value in e.items()
+                             if key not in ('timestamp', 'seconds') and isinstance(value, (int, float))
+                             and not isinstance(value, bool)})
+            for key in fields:
+                values = [e[key] for e in items if isinstance(e.get(key), (int, float))]
+                stats[f"mean_{key}"] = float(np.mean(values))
+            operations[name] = stats
+        caches = {name: {'hits': hits, 'misses': misses,
+                         'hit_ratio': hits / (hits + misses) if hits + misses else 0.0}
+                  for name, (hits, misses) in counters.items()}
+        return {'operations': operations, 'caches': caches}
+
+    def export(self, **sections):
+        # Pełny zrzut do analizy poza aplikacją: podsumowanie, zdarzenia i dodatkowe sekcje
+        # (np. pamiec_trajektorii=cache.stats())
+        data = self.summary()
+        with self._lock:
+            data['events'] = {name: list(queue) for name, queue in self._events.items()}
+        data.update(sections)
+        data['exported'] = time.time()
+        return data
+
+    def to_json(self, **sections):
+        return json.dumps(self.export(**sections), ensure_ascii=False, indent=1, default=float)
+
+
+recorder = Recorder()
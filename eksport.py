@@ -0,0 +1,269 @@
+import csv
+import io
+import os
+import shutil
+import struct
+import tempfile
+import zipfile
+
+import numpy as np
+
+from historia import OPTIONAL_PARAMS, PARAMS, RECORD_DTYPE, SERIES
+
+# Eksport i import tabel (historia strzałów, punkty trajektorii, wyniki przeglądów) porcjami:
+# writer.write({kolumna: tablica}) dopisuje kolejną porcję, więc cała tabela nigdy nie jest
+# budowana w pamięci. Formaty: CSV, NPZ i Parquet (gdy zainstalowano pyarrow).
+# NPZ zapisywany jest bez kompresji (ZIP_STORED), dzięki czemu read_table zwraca kolumny
+# mapowane z pliku (albo widoki bufora przesłanego pliku) – bez kopiowania danych.
+
+FORMATS = ('csv', 'npz', 'parquet')
+# Kolumny tekstowe w NPZ mają stałą szerokość
+STRING_DTYPE = np.dtype('U32')
+# Tabela punktów: numer strzału i jego parametry powtórzone w każdym wierszu, potem szeregi
+TRAJECTORY_COLUMNS = ('number',) + PARAMS + SERIES
+SUMMARY_COLUMNS = tuple(name for name in RECORD_DTYPE.names if name != 'slot')
+# Lokalny nagłówek pliku w archiwum ZIP (bez nazwy i pola dodatkowego)
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+
+
+def detect_format(source, fmt=None):
+    # Format z jawnego argumentu, rozszerzenia pliku albo sygnatury danych
+    if fmt:
+        return fmt
+    if isinstance(source, (str, os.PathLike)):
+        ext = os.path.splitext(os.fspath(source))[1].lower().lstrip('.')
+        if ext in FORMATS:
+            return ext
+        with open(source, 'rb') as f:
+            head = f.read(4)
+    else:
+        head = bytes(source[:4])
+    if head.startswith(b'PK'):
+        return 'npz'
+    if head == b'PAR1':
+        return 'parquet'
+    return 'csv'
+
+
+class CsvWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._columns = None
+
+    def write(self, columns):
+        if self._columns is None:
+            self._columns = list(columns)
+            self._writer.writerow(self._columns)
+        self._writer.writerows(zip(*(np.asarray(columns[name]).tolist() for name in self._columns)))
+
+    def close(self):
+        self._file.close()
+
+
+class NpzWriter:
+    # Każda kolumna spływa porcjami do pliku tymczasowego; przy zamknięciu pliki są przepisywane
+    # blokami do archiwum jako człony .npy o znanym już rozmiarze
+    def __init__(self, path):
+        self.path = path
+        self._dir = tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path)))
+        self._files = {}
+        self._dtypes = {}
+        self._lengths = {}
+
+    def write(self, columns):
+        for name, values in columns.items():
+            values = np.asarray(values)
+            if values.dtype.kind in 'US':
+                values = values.astype(STRING_DTYPE)
+            if name not in self._files:
+                self._files[name] = open(os.path.join(self._dir.name, f"{len(self._files)}.bin"), 'wb')
+                self._dtypes[name] = values.dtype
+                self._lengths[name] = 0
+            self._files[name].write(np.ascontiguousarray(values, dtype=self._dtypes[name]).tobytes())
+            self._lengths[name] += len(values)
+
+    def close(self):
+        try:
+            with zipfile.ZipFile(self.path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for name, spool in self._files.items():
+                    spool.close()
+                    header = {'descr': np.lib.format.dtype_to_descr(self._dtypes[name]),
+                              'fortran_order': False, 'shape': (self._lengths[name],)}
+                    with archive.open(f"{name}.npy", 'w', force_zip64=True) as member, \
+                            open(spool.name, 'rb') as data:
+                        np.lib.format.write_array_header_1_0(member, header)
+                        shutil.copyfileobj(data, member)
+        finally:
+            self._dir.cleanup()
+
+
+class ParquetWriter:
+    # Każda porcja to osobna grupa wierszy pliku Parquet
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Eksport do Parquet wymaga pakietu pyarrow (pip install pyarrow)") from None
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self._writer = None
+
+    def write(self, columns):
+        table = self._pa.table({name: np.asarray(values) for name, values in columns.items()})
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = table.cast(self._writer.schema)  # jak w NPZ – typy kolumn ustala pierwsza porcja
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+WRITERS = {'csv': CsvWriter, 'npz': NpzWriter, 'parquet': ParquetWriter}
+
+
+def write_table(path, chunks, fmt=None):
+    # Zapis porcji {kolumna: tablica} z dowolnego iteratora; zwraca liczbę wierszy
+    writer = WRITERS[fmt or detect_format(path)](path)
+    rows = 0
+    try:
+        for columns in chunks:
+            writer.write(columns)
+            rows += len(next(iter(columns.values())))
+    finally:
+        writer.close()
+    return rows
+
+
+def _read_npz(source):
+    # Kolumny NPZ bez kopiowania: ze ścieżki przez np.memmap, z bufora przez np.frombuffer.
+    # Człony skompresowane (np. z np.savez_compressed) są po prostu wczytywane.
+    is_path = isinstance(source, (str, os.PathLike))
+    raw = open(source, 'rb') if is_path else io.BytesIO(source)
+    columns = {}
+    with raw, zipfile.ZipFile(raw) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    columns[name] = np.lib.format.read_array(member)
+                continue
+            raw.seek(info.header_offset)
+            fields = _LOCAL_HEADER.unpack(raw.read(_LOCAL_HEADER.size))
+            raw.seek(info.header_offset + _LOCAL_HEADER.size + fields[-2] + fields[-1])
+            version = np.lib.format.read_magic(raw)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(raw)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(raw)
+            offset = raw.tell()
+            order = 'F' if fortran_order else 'C'
+            if is_path:
+                columns[name] = np.memmap(source, dtype=dtype, mode='r', offset=offset, shape=shape, order=order)
+            else:
+                count = int(np.prod(shape))
+                columns[name] = np.frombuffer(source, dtype=dtype, count=count, offset=offset).reshape(shape, order=order)
+    return columns
+
+
+def _read_parquet(source):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Odczyt Parquet wymaga pakietu pyarrow (pip install pyarrow)") from None
+    if isinstance(source, (str, os.PathLike)):
+        table = pq.read_table(source, memory_map=True)
+    else:
+        table = pq.read_table(io.BytesIO(source))
+    return {name: table.column(name).to_numpy() for name in table.column_names}
+
+
+def _read_csv(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+    else:
+        rows = list(csv.reader(io.StringIO(bytes(source).decode('utf-8'))))
+    if not rows:
+        return {}
+    header, body = rows[0], rows[1:]
+    columns = {}
+    for name, values in zip(header, zip(*body) if body else [()] * len(header)):
+        try:
+            columns[name] = np.array(values, dtype=float)
+        except ValueError:
+            columns[name] = np.array(values)
+    if 'number' in columns:
+        columns['number'] = columns['number'].astype(np.int64)
+    return columns
+
+
+def read_table(source, fmt=None):
+    # source: ścieżka albo bajty (np. z st.file_uploader); zwraca {kolumna: tablica}
+    fmt = detect_format(source, fmt)
+    if fmt == 'npz':
+        return _read_npz(source)
+    if fmt == 'parquet':
+        return _read_parquet(source)
+    return _read_csv(source)
+
+
+# --- Źródła porcji ---
+
+def summary_chunks(history):
+    # Odczyty wszystkich strzałów historii – jedna porcja (historia jest ograniczona)
+    shots = history.shots()
+    yield {name: shots[name] for name in SUMMARY_COLUMNS}
+
+
+def trajectory_chunks(history, rehydrate):
+    # Punkty kolejnych strzałów, po jednej porcji na strzał
+    for shot in history.shots():
+        data = history.series(shot, rehydrate)
+        n = data.shape[1]
+        columns = {'number': np.full(n, shot['number'])}
+        columns.update({name: np.full(n, shot[name]) for name in PARAMS})
+        columns.update({name: np.asarray(data[i], dtype=float) for i, name in enumerate(SERIES)})
+        yield columns
+
+
+def sweep_chunks(result, chunk_size=65536):
+    # Wyniki przeglądu parametrów w postaci długiej: kolumna na każdą oś i każdy wynik
+    from przeglad import OUTPUTS
+
+    total = int(np.prod(result.shape))
+    flat = result.values.reshape(len(OUTPUTS), -1)
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        idx = np.unravel_index(np.arange(start, stop), result.shape)
+        columns = {dim: result.coords[dim][i] for dim, i in zip(result.dims, idx)}
+        columns.update({name: np.full(stop - start, value) for name, value in result.fixed.items()})
+        columns.update({name: flat[k, start:stop] for k, name in enumerate(OUTPUTS)})
+        yield columns
+
+
+def split_trajectories(table):
+    # Strzały z tabeli punktów: (numer, parametry, szeregi (t, x, y, vx, vy)) – szeregi są
+    # wycinkami kolumn, więc przy NPZ pozostają widokami mapowanego pliku
+    numbers = np.asarray(table['number'])
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(numbers)) + 1, [len(numbers)]])
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        params = tuple(float(table[name][start]) if name in table else OPTIONAL_PARAMS[name] for name in PARAMS)
+        yield int(numbers[start]), params, tuple(table[name][start:stop] for name in SERIES)
+
+
+def load_into_history(history, table, timestamp):
+    # Dopisuje strzały z tabeli punktów do historii; zwraca ich liczbę
+    missing = [name for name in TRAJECTORY_COLUMNS if name not in table and name not in OPTIONAL_PARAMS]
+    if missing:
+        raise ValueError(f"Brak kolumn: {', '.join(missing)}")
+    count = 0
+    for _, params, series in split_trajectories(table):
+        history.append(params, np.stack(series), timestamp)
+        count += 1
+    return count
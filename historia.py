@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+
+from diagnostyka import recorder
+
+# Zwarta historia strzałów dla sesji Streamlit. Każdy strzał to jeden wiersz tablicy strukturalnej
+# (parametry + odczyty), a historia jest pierścieniem o stałej pojemności – najstarsze strzały
+# wypadają. Punkty toru (t, x, y, vx, vy) trzymane są w float32 tylko dla kilku ostatnich strzałów;
+# starsze odtwarzane są na żądanie (np. z pamięci trajektorii na dysku), gdy trzeba je narysować.
+
+DEFAULT_MAX_SHOTS = int(os.environ.get('SYMULACJE_HISTORIA', 100))
+DEFAULT_MAX_POINTS = int(os.environ.get('SYMULACJE_HISTORIA_PUNKTY', 20))
+
+SERIES = ('t', 'x', 'y', 'vx', 'vy')
+PARAMS = ('v0', 'angle', 'g', 'drag', 'mass', 'wind', 'scale_height', 'y_launch', 'y_target')
+# Parametry rozszerzonego modelu (wiatr, atmosfera, wysokości) – gdy ich brak, np. w starszych
+# plikach eksportu, obowiązują wartości domyślne modelu podstawowego
+OPTIONAL_PARAMS = {'wind': 0.0, 'scale_height': 0.0, 'y_launch': 0.0, 'y_target': 0.0}
+RECORD_DTYPE = np.dtype([
+    ('number', np.int64),
+    ('timestamp', 'U8'),
+    ('v0', np.float64),
+    ('angle', np.float64),
+    ('g', np.float64),
+    ('drag', np.float64),
+    ('mass', np.float64),
+    ('wind', np.float64),
+    ('scale_height', np.float64),
+    ('y_launch', np.float64),
+    ('y_target', np.float64),
+    ('t_flight', np.float64),
+    ('range', np.float64),
+    ('max_height', np.float64),
+    ('final_speed', np.float64),
+    ('slot', np.int64),
+])
+
+
+class TrajectoryHistory:
+    def __init__(self, max_shots=DEFAULT_MAX_SHOTS, max_points=DEFAULT_MAX_POINTS):
+        self.max_shots = max(1, int(max_shots))
+        self.max_points = max(0, int(max_points))
+        self.records = np.zeros(self.max_shots, dtype=RECORD_DTYPE)
+        self.start = 0
+        self.count = 0
+        self.total = 0
+        # Zmienia się przy każdej modyfikacji – pozwala wykryć, że trzeba przerysować wykres
+        self.version = 0
+        # Bufor punktów alokowany przy pierwszym strzale, gdy znana jest liczba próbek
+        self.points = None
+        self.slot_owner = np.full(self.max_points, -1, dtype=np.int64)
+
+    def __len__(self):
+        return self.count
+
+    def _order(self):
+        return (self.start + np.arange(self.count)) % self.max_shots
+
+    def shots(self):
+        # Kopia rekordów w kolejności od najstarszego
+        return self.records[self._order()]
+
+    def last(self):
+        return self.records[(self.start + self.count - 1) % self.max_shots] if self.count else None
+
+    def append(self, params, data, timestamp):
+        # params = wartości PARAMS (brakujące końcowe – domyślne), data = tablica (5, n) z szeregami SERIES
+        data = np.asarray(data)
+        t, x, y, vx, vy = data
+        if self.count == self.max_shots:
+            index = self.start
+            self.start = (self.start + 1) % self.max_shots
+        else:
+            index = (self.start + self.count) % self.max_shots
+            self.count += 1
+
+        record = self.records[index]
+        record['number'] = self.total + 1
+        record['timestamp'] = timestamp
+        for name in OPTIONAL_PARAMS:
+            record[name] = OPTIONAL_PARAMS[name]
+        for name, value in zip(PARAMS, params):
+            record[name] = value
+        record['t_flight'] = t[-1]
+        record['range'] = x[-1]
+        record['max_height'] = np.max(y)
+        record['final_speed'] = np.hypot(vx[-1], vy[-1])
+        record['slot'] = -1
+
+        if self.max_points:
+            if self.points is None:
+                self.points = np.empty((self.max_points,) + data.shape, dtype=np.float32)
+            if self.points.shape[1:] == data.shape:
+                slot = self.total % self.max_points
+                self.points[slot] = data
+                self.slot_owner[slot] = record['number']
+                record['slot'] = slot
+
+        self.total += 1
+        self.version += 1
+        return record
+
+    def series(self, record, rehydrate):
+        # Punkty toru dla rekordu: z bufora, jeśli wciąż tam są, inaczej rehydrate(*parametry) -> (5, n)
+        slot = record['slot']
+        if slot >= 0 and self.slot_owner[slot] == record['number']:
+            recorder.count('historia', True)
+            return self.points[slot]
+        recorder.count('historia', False)
+        return np.asarray(rehydrate(*(float(record[name]) for name in PARAMS)))
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+        self.slot_owner[:] = -1
+        self.version += 1
+
+    def memory(self):
+        # Zużycie pamięci historii w bajtach
+        points = self.points.nbytes if self.points is not None else 0
+        return {
+            'shots': self.count,
+            'with_points': int(np.sum(self.slot_owner > self.total - self.count)),
+            'records_bytes': self.records.nbytes,
+            'points_bytes': points,
+            'bytes': self.records.nbytes + points,
+        }
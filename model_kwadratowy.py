@@ -0,0 +1,363 @@
+import math
+import time
+
+import numpy as np
+
+from diagnostyka import recorder, rk45_rejected
+
+# Wsadowy integrator modelu z kwadratowym oporem powietrza (F = -b * |v_wzgl| * v_wzgl), opcjonalnie
+# z wiatrem, gęstością powietrza malejącą wykładniczo z wysokością i niezerową wysokością startu/celu.
+# N rzutów jest liczonych razem jako struktura tablic: stan (4, N) = [x, y, vx, vy], w którym każda
+# składowa jest ciągłym wektorem, więc prawa strona to kilka operacji na całych wektorach. Każda
+# kolumna (rzut) ma własny krok czasowy, a rzuty, które już wylądowały, są usuwane z roboczego zestawu.
+# Metoda i sterowanie krokiem są takie same jak w RK45 z scipy (Dormand–Prince 5(4)),
+# więc przy tych samych rtol/atol wyniki zgadzają się z compute_trajectory.
+
+# Tak jak w compute_trajectory – start z niewielkiej wysokości, aby nie zakończyć od razu
+Y_START = 1e-6
+# Liczba próbek trajektorii zwracanych przez compute_trajectory
+N_POINTS = 300
+# Koniec przedziału całkowania compute_trajectory [s]
+T_MAX = 1000.0
+
+# Współczynniki Dormanda–Prince'a (jak scipy.integrate.RK45)
+_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+_A = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+]
+_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+# Wielomian interpolacji gęstej (4. rzędu) dla kroku RK45
+_P = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+SAFETY = 0.9
+MIN_FACTOR = 0.2
+MAX_FACTOR = 10
+ERROR_EXPONENT = -1 / 5
+
+# Liczba bisekcji przy szukaniu chwili zdarzenia wewnątrz kroku (precyzja ~1e-15 długości kroku)
+ROOT_ITERATIONS = 52
+
+
+def projectile_ode_batch(state, g, k, wind=None, inv_height=None):
+    # Wektorowa wersja projectile_ode w układzie struktury tablic: state ma kształt (4, N), więc każda
+    # składowa (x, y, vx, vy) jest ciągłym wektorem. g i k = drag / mass mają kształt (N,); opcjonalnie
+    # wind – wiatr wzdłuż osi x [m/s] i inv_height – odwrotność wysokości skali atmosfery [1/m]
+    # (gęstość ρ(y) = ρ0 * exp(-y * inv_height)). None pomija wyraz, więc model bez wiatru
+    # i ze stałą gęstością kosztuje tyle co wcześniej.
+    vx = state[2]
+    vy = state[3]
+    u = vx if wind is None else vx - wind
+    kv = k * np.hypot(u, vy)
+    if inv_height is not None:
+        kv = kv * np.exp(-inv_height * state[1])
+    out = np.empty_like(state)
+    out[0] = vx
+    out[1] = vy
+    out[2] = -kv * u
+    out[3] = -g - kv * vy
+    return out
+
+
+def inverse_height(scale_height):
+    # 1 / wysokość skali; 0 (albo mniej) oznacza stałą gęstość powietrza
+    scale_height = np.asarray(scale_height, dtype=float)
+    return np.divide(1.0, scale_height, out=np.zeros_like(scale_height), where=scale_height > 0)
+
+
+def _rms(a):
+    return np.sqrt(np.mean(a**2, axis=0))
+
+
+def _initial_step(y0, f0, coef, t_max, rtol, atol):
+    # Wektorowa kopia scipy.integrate._ivp.common.select_initial_step
+    scale = atol + np.abs(y0) * rtol
+    d0 = _rms(y0 / scale)
+    d1 = _rms(f0 / scale)
+    h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / np.maximum(d1, 1e-300))
+    h0 = np.minimum(h0, t_max)
+    f1 = projectile_ode_batch(y0 + h0 * f0, *coef)
+    d2 = _rms((f1 - f0) / scale) / h0
+    dmax = np.maximum(d1, d2)
+    with np.errstate(divide='ignore'):
+        h1 = np.where(dmax <= 1e-15, np.maximum(1e-6, h0 * 1e-3), (0.01 / dmax) ** (1 / 5))
+    return np.minimum(np.minimum(100 * h0, h1), t_max)
+
+
+def _dense(y_old, h, Q, theta):
+    # Stan w chwili t_old + theta * h z wielomianu interpolacji; Q ma kształt (4, 4, N)
+    p = np.cumprod(np.repeat(theta[None, :], 4, axis=0), axis=0)
+    return y_old + h * np.einsum('kpn,pn->kn', Q, p)
+
+
+def _crossing(y_old, h, Q, func, rows):
+    # Bisekcja theta w [0, 1] dla funkcji malejącej przez zero wewnątrz kroku
+    lo = np.zeros(len(h))
+    hi = np.ones(len(h))
+    for _ in range(ROOT_ITERATIONS):
+        mid = 0.5 * (lo + hi)
+        above = func(_dense(y_old, h, Q, mid), rows) > 0
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+    return hi
+
+
+def _ground(state, rows):
+    return state[1]
+
+
+def _vertical_speed(state, rows):
+    return state[3]
+
+
+def descent(y_target):
+    # Zdarzenie zejścia na wysokość celu y_target (N,) – jak hit_ground dla wielu wierszy
+    def event(state, rows):
+        dy = state[1] - y_target[rows]
+        return np.where(state[3] > 0, np.maximum(dy, state[3]), dy)
+    return event
+
+
+def integrate_states(state0, g, k, event=_ground, t_max=T_MAX, rtol=1e-7, atol=1e-9, wind=None, inv_height=None):
+    # Całkuje wszystkie kolumny stanu (4, N) do chwili, gdy event(stan) spadnie do zera (jak zdarzenie
+    # z direction = -1 w solve_ivp) albo do t_max. Zwraca czas końcowy, stan końcowy (4, N),
+    # maskę zakończenia zdarzeniem oraz maksymalną wysokość osiągniętą w locie.
+    # g, k, wind i inv_height: tablice (N,); wind / inv_height = None wyłączają swoje wyrazy.
+    start = time.perf_counter()
+    n = state0.shape[1]
+    t_end = np.zeros(n)
+    y_end = state0.copy()
+    hit = np.zeros(n, dtype=bool)
+    apex = state0[1].copy()
+
+    # Roboczy zestaw aktywnych kolumn – kompaktowany, gdy któraś z nich kończy lot
+    rows = np.arange(n)
+    t = np.zeros(n)
+    y = state0.copy()
+    coef = tuple(None if c is None else np.broadcast_to(np.asarray(c, dtype=float), (n,))
+                 for c in (g, k, wind, inv_height))
+    f = projectile_ode_batch(y, *coef)
+    h_abs = _initial_step(y, f, coef, t_max, rtol, atol)
+    rejected = np.zeros(n, dtype=bool)
+    ev = event(y, rows)
+    K = np.empty((7,) + y.shape)
+    # Liczniki dla diagnostyki: iteracje pętli, próby kroków i kroki zaakceptowane (sumy po wierszach)
+    iterations = attempts = accepted = 0
+
+    while len(rows):
+        min_step = 10 * np.abs(np.nextafter(t, np.inf) - t)
+        h_abs = np.maximum(h_abs, min_step)
+        t_new = np.minimum(t + h_abs, t_max)
+        h = t_new - t
+
+        K[0] = f
+        for s in range(1, 6):
+            dy = sum(a * K[j] for j, a in enumerate(_A[s]) if a)
+            K[s] = projectile_ode_batch(y + h * dy, *coef)
+        y_new = y + h * np.tensordot(_B, K[:6], axes=1)
+        f_new = projectile_ode_batch(y_new, *coef)
+        K[6] = f_new
+
+        scale = atol + np.maximum(np.abs(y), np.abs(y_new)) * rtol
+        err = _rms(h * np.tensordot(_E, K, axes=1) / scale)
+        accept = err < 1
+        iterations += 1
+        attempts += len(rows)
+        accepted += int(accept.sum())
+
+        with np.errstate(divide='ignore'):
+            factor = np.where(err == 0, MAX_FACTOR, SAFETY * err**ERROR_EXPONENT)
+        factor = np.where(accept, np.minimum(MAX_FACTOR, factor), np.maximum(MIN_FACTOR, factor))
+        factor = np.where(accept & rejected, np.minimum(1, factor), factor)
+        h_next = h_abs * factor
+        rejected = ~accept
+
+        ev_new = event(y_new, rows)
+        landed = accept & (ev >= 0) & (ev_new <= 0)
+        timed_out = accept & ~landed & (t_new >= t_max)
+        stalled = ~accept & (h_next < min_step)
+
+        # Wierzchołek: vy zmienia znak z dodatniego na niedodatni w zaakceptowanym kroku
+        peak = accept & (y[3] > 0) & (y_new[3] <= 0)
+        if peak.any() or landed.any():
+            Q = np.einsum('skn,sp->kpn', K, _P)
+        if peak.any():
+            theta = _crossing(y[:, peak], h[peak], Q[..., peak], _vertical_speed, rows[peak])
+            y_peak = _dense(y[:, peak], h[peak], Q[..., peak], theta)[1]
+            apex[rows[peak]] = np.maximum(apex[rows[peak]], y_peak)
+        apex[rows[accept]] = np.maximum(apex[rows[accept]], np.where(landed, -np.inf, y_new[1])[accept])
+
+        if landed.any():
+            theta = _crossing(y[:, landed], h[landed], Q[..., landed], event, rows[landed])
+            y_end[:, rows[landed]] = _dense(y[:, landed], h[landed], Q[..., landed], theta)
+            t_end[rows[landed]] = t[landed] + theta * h[landed]
+            hit[rows[landed]] = True
+        for done in (timed_out, stalled):
+            if done.any():
+                y_end[:, rows[done]] = np.where(accept[done], y_new[:, done], y[:, done])
+                t_end[rows[done]] = np.where(accept[done], t_new[done], t[done])
+
+        t = np.where(accept, t_new, t)
+        y = np.where(accept, y_new, y)
+        f = np.where(accept, f_new, f)
+        ev = np.where(accept, ev_new, ev)
+        h_abs = h_next
+
+        finished = landed | timed_out | stalled
+        if finished.any():
+            keep = ~finished
+            rows, t, ev, h_abs, rejected = (a[keep] for a in (rows, t, ev, h_abs, rejected))
+            y, f = y[:, keep], f[:, keep]
+            coef = tuple(None if c is None else c[keep] for c in coef)
+            K = np.empty((7,) + y.shape)
+
+    # Prawa strona liczona dla wierszy: start (f0 i dobór kroku) oraz 6 razy na każdą próbę kroku
+    recorder.record('integrate_states', time.perf_counter() - start, rows=n, iterations=iterations,
+                    nfev=2 * n + 6 * attempts, accepted=accepted, rejected=attempts - accepted,
+                    hits=int(hit.sum()))
+    return t_end, y_end, hit, apex
+
+
+def initial_state(v0, angle, y_start=Y_START):
+    # Stan początkowy (4, N) dla tablic prędkości, kątów w stopniach i wysokości startu
+    angle_rad = np.radians(angle)
+    v0, angle_rad, y_start = np.broadcast_arrays(np.asarray(v0, dtype=float), angle_rad,
+                                                 np.asarray(y_start, dtype=float))
+    state = np.zeros((4,) + v0.shape)
+    state[1] = y_start
+    state[2] = v0 * np.cos(angle_rad)
+    state[3] = v0 * np.sin(angle_rad)
+    return state.reshape(4, -1)
+
+
+def integrate_batch(v0, angle, g, drag, mass, rtol=1e-7, atol=1e-9, t_max=T_MAX,
+                    wind=0.0, scale_height=0.0, y_launch=0.0, y_target=0.0):
+    # Odpowiednik wielokrotnego wywołania compute_trajectory dla tablic parametrów.
+    # Zwraca (czas lotu, zasięg, wysokość maksymalna, prędkość końcowa) dla każdego wiersza.
+    v0, angle, g, drag, mass, wind, scale_height, y_launch, y_target = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (v0, angle, g, drag, mass, wind, scale_height, y_launch, y_target)))
+    shape = v0.shape
+    state0 = initial_state(v0.ravel(), angle.ravel(), y_launch.ravel() + Y_START)
+    # Wyrazy rozszerzonego modelu tylko wtedy, gdy są potrzebne
+    inv_height = inverse_height(scale_height.ravel())
+    event = descent(y_target.ravel()) if np.any(y_target) or np.any(y_launch < 0) else _ground
+    t_hit, y_end, _, apex = integrate_states(state0, g.ravel(), (drag / mass).ravel(), event=event,
+                                             t_max=t_max, rtol=rtol, atol=atol,
+                                             wind=wind.ravel() if np.any(wind) else None,
+                                             inv_height=inv_height if np.any(inv_height) else None)
+    final_speed = np.hypot(y_end[2], y_end[3])
+    return (t_hit.reshape(shape), y_end[0].reshape(shape),
+            apex.reshape(shape), final_speed.reshape(shape))
+
+
+# --- Pojedynczy rzut przez scipy.integrate.solve_ivp (wersja przeniesiona z rzut_ukosny_web3.py) ---
+
+def projectile_ode(t, state, g, drag, mass, wind=0.0, inv_height=0.0):
+    # wind – wiatr wzdłuż osi x [m/s] (dodatni w kierunku strzału), inv_height – 1 / wysokość skali
+    # atmosfery [1/m]; opór zależy od prędkości względem powietrza i od gęstości ρ(y)
+    x, y, vx, vy = state
+    k = drag / mass
+    if inv_height:
+        k *= math.exp(-inv_height * y)
+    u = vx - wind
+    v = math.sqrt(u**2 + vy**2)
+    ax = - k * v * u
+    ay = - g - k * v * vy
+    return [vx, vy, ax, ay]
+
+
+def hit_ground(t, state, y_target=0.0):
+    # Zejście na wysokość celu (domyślnie ziemi). Na wznoszeniu zdarzenie jest nie mniejsze niż vy > 0,
+    # więc pocisk, który nie wzniesie się na wysokość celu, kończy lot w wierzchołku toru
+    dy = state[1] - y_target
+    return max(dy, state[3]) if state[3] > 0 else dy
+hit_ground.terminal = True
+hit_ground.direction = -1
+
+
+class ComputationCancelled(Exception):
+    pass
+
+
+def _monitored(fun, t_estimate, progress, cancel):
+    # Prawa strona ODE, która zgłasza postęp (t / szacowany czas lotu) i przerywa całkowanie,
+    # gdy ustawiono zdarzenie cancel; koszt sprawdzenia jest pomijalny wobec kroku solve_ivp
+    def wrapped(t, y):
+        if cancel is not None and cancel.is_set():
+            raise ComputationCancelled()
+        if progress is not None:
+            progress(min(t / t_estimate, 0.99))
+        return fun(t, y)
+    return wrapped
+
+
+def compute_trajectory(v0, angle, g, drag, mass, wind=0.0, scale_height=0.0, y_launch=0.0, y_target=0.0,
+                       n_points=N_POINTS, progress=None, cancel=None):
+    # Model rozszerzony: wiatr wzdłuż osi x [m/s], atmosfera wykładnicza o wysokości skali
+    # scale_height [m] (0 – stała gęstość), wysokość startu y_launch i celu y_target [m]. Gdy tor nie
+    # sięga wysokości celu, kończy się w wierzchołku (max_height < y_target).
+    # Tor zwracany jest w n_points chwilach równomiernie od startu do końca lotu, z rozwiązania
+    # gęstego solvera. progress(ułamek) i cancel (threading.Event) są opcjonalne – dla obliczeń
+    # w tle (zadania.py).
+    # scipy importowane dopiero tutaj – sam moduł ładuje się bez niego
+    from scipy.integrate import solve_ivp
+
+    start = time.perf_counter()
+    angle_rad = math.radians(angle)
+    inv_height = float(inverse_height(scale_height))
+    # Ustawiamy początkową wysokość na niewielką wartość, aby uniknąć natychmiastowego zakończenia
+    initial_state = [0.0, y_launch + Y_START, v0 * math.cos(angle_rad), v0 * math.sin(angle_rad)]
+    fun = lambda t, y: projectile_ode(t, y, g, drag, mass, wind, inv_height)
+    if progress is not None or cancel is not None:
+        # Czas lotu bez oporu ogranicza z góry czas lotu z oporem
+        t_estimate = 2 * initial_state[3] / g if g > 0 and initial_state[3] > 0 else T_MAX
+        fun = _monitored(fun, min(t_estimate, T_MAX), progress, cancel)
+    # Zdarzenie musi mieć własne atrybuty terminal/direction – bez nich solve_ivp całkowałby dalej
+    # aż do T_MAX, a zliczał także przejścia w górę
+    event = lambda t, y: hit_ground(t, y, y_target)
+    event.terminal = hit_ground.terminal
+    event.direction = hit_ground.direction
+    # Wierzchołek (vy = 0) jako zdarzenie – wysokość maksymalna nie zależy od liczby punktów toru
+    apex = lambda t, y: y[3]
+    apex.direction = -1
+    sol = solve_ivp(
+        fun=fun,
+        t_span=(0, T_MAX),
+        y0=initial_state,
+        events=(event, apex),
+        dense_output=True,
+        rtol=1e-7,
+        atol=1e-9
+    )
+    if sol.t_events[0].size > 0:
+        t_hit = sol.t_events[0][0]
+    else:
+        t_hit = sol.t[-1]
+    t_vals = np.linspace(0, t_hit, n_points)
+    sol_vals = sol.sol(t_vals)
+    x = sol_vals[0]
+    y = sol_vals[1]
+    vx = sol_vals[2]
+    vy = sol_vals[3]
+    max_height = max(np.max(y), np.max(sol.y_events[1].reshape(-1, 4)[:, 1], initial=-np.inf))
+    range_val = x[-1]
+    final_speed = math.sqrt(vx[-1]**2 + vy[-1]**2)
+    # sol.t zawiera chwilę startu i koniec każdego zaakceptowanego kroku
+    steps = len(sol.t) - 1
+    recorder.record('compute_trajectory', time.perf_counter() - start, nfev=sol.nfev, njev=sol.njev,
+                    accepted=steps, rejected=rk45_rejected(sol.nfev, steps), points=n_points,
+                    hit=bool(sol.t_events[0].size))
+    return t_vals, x, y, vx, vy, max_height, range_val, final_speed
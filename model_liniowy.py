@@ -0,0 +1,91 @@
+import numpy as np
+
+# Model rzutu ukośnego z liniowym oporem powietrza (F = -k1 * v) w postaci zamkniętej.
+# Wzory są te same co w ProjectileSimulation.wspx/wspy, ale liczone na całych tablicach NumPy.
+
+# Gdy ciało nigdy nie spada (g = 0), trajektorię próbkujemy do tylu stałych czasowych m/k1
+HORIZON_TAU = 10.0
+# Poniżej tej wartości vy0 / (g * tau) czas lotu liczony jest z rozwinięcia w szereg (błąd ~1e-15)
+SERIES_EPS = 1e-5
+# Wzory dzielą przez k1 – zerowy opór zastępujemy w wywołujących modułach bardzo małym
+MIN_LINEAR_DRAG = 1e-9
+
+
+def position(t, angle, v0, k1, m, g):
+    # Położenie (x, y) w chwili t – wszystkie argumenty mogą być tablicami (broadcasting)
+    angle_rad = np.radians(angle)
+    tau = np.divide(m, k1)
+    decay = -np.expm1(-np.divide(t, tau))  # 1 - exp(-k1 * t / m) bez utraty precyzji dla małych t
+    x = (v0 * tau * np.cos(angle_rad)) * decay
+    y = (v0 * tau * np.sin(angle_rad) + g * tau**2) * decay - g * tau * t
+    return x, y
+
+
+def landing_time(angle, v0, k1, m, g):
+    # Dokładny czas lądowania (y = 0, t > 0) z funkcji W Lamberta.
+    # Dla u = t / tau równanie toru ma postać c * (1 - exp(-u)) = u, gdzie c = 1 + vy0 / (g * tau),
+    # więc u = c + W0(-c * exp(-c)). Zwraca inf, gdy ciało nigdy nie spada (g = 0).
+    from scipy.special import lambertw  # import leniwy – scipy ładowane dopiero przy pierwszym użyciu
+
+    angle, v0, k1, m, g = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (angle, v0, k1, m, g)))
+    tau = m / k1
+    vy0 = v0 * np.sin(np.radians(angle))
+    falls = g > 0
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        c = np.where(falls, 1.0 + vy0 / (g * tau), 1.0)
+        c = np.maximum(c, 1.0)
+        u = c + lambertw(-c * np.exp(-c)).real
+        # Kilka kroków Newtona poprawia wynik przy c bliskim 1 (kąty bliskie 0°), gdzie W0 traci precyzję
+        for _ in range(6):
+            f = c * -np.expm1(-u) - u
+            df = c * np.exp(-u) - 1.0
+            u = np.where(df < 0, u - f / df, u)
+        u = np.where(c > 1.0, np.maximum(u, 0.0), 0.0)
+        # Przy znikomym oporze c - 1 ginie w zaokrągleniu i W0 zawodzi – szereg u = 2e - 2/3 e² (e = c - 1)
+        eps = np.where(falls, vy0 / (g * tau), 0.0)
+        u = np.where((eps > 0) & (eps < SERIES_EPS), 2 * eps - 2 / 3 * eps**2, u)
+    t_land = np.where(falls, tau * u, np.where(vy0 < 0, 0.0, np.inf))
+    return t_land[()] if t_land.ndim == 0 else t_land
+
+
+def flight_summary(angle, v0, k1, m, g):
+    # Podsumowanie lotu w postaci zamkniętej, bez generowania punktów trajektorii.
+    # Zwraca (czas lotu, zasięg, czas wierzchołka, wysokość maksymalna, prędkość końcowa, kąt uderzenia [°]).
+    # Wierzchołek z vy(t) = 0: t = tau * ln(1 + vy0 / (g * tau)), y = tau * vy0 - g * tau² * ln(1 + vy0 / (g * tau)).
+    # Dla g = 0 ciało nie spada: czasy są nieskończone, a zasięg i wysokość to asymptoty toru.
+    angle, v0, k1, m, g = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (angle, v0, k1, m, g)))
+    tau = m / k1
+    angle_rad = np.radians(angle)
+    vx0 = v0 * np.cos(angle_rad)
+    vy0 = v0 * np.sin(angle_rad)
+    t_flight = np.asarray(landing_time(angle, v0, k1, m, g))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(g > 0, vy0 / (g * tau), np.inf)
+        log_c = np.log1p(np.maximum(ratio, 0.0))
+        t_apex = np.where(vy0 > 0, tau * log_c, 0.0)
+        max_height = np.where(vy0 > 0, np.where(g > 0, tau * vy0 - g * tau**2 * log_c, tau * vy0), 0.0)
+
+        decay = np.exp(-t_flight / tau)
+        range_val = vx0 * tau * -np.expm1(-t_flight / tau)
+        vx = vx0 * decay
+        vy = (vy0 + g * tau) * decay - g * tau
+    impact_speed = np.hypot(vx, vy)
+    impact_angle = np.degrees(np.arctan2(-vy, vx))
+
+    result = (t_flight, range_val, t_apex, max_height, impact_speed, impact_angle)
+    return tuple(r[()] if r.ndim == 0 else r for r in result)
+
+
+def trajectory(angle, v0, k1, m, g, n_points=500):
+    # Pełna trajektoria jako n_points próbek równomiernie rozłożonych w czasie, od startu do lądowania.
+    # Liczba punktów jest parametrem, a nie skutkiem ubocznym kroku czasowego.
+    t_land = landing_time(angle, v0, k1, m, g)
+    t_end = t_land if np.isfinite(t_land) else HORIZON_TAU * m / k1
+    t = np.linspace(0.0, t_end, n_points)
+    x, y = position(t, angle, v0, k1, m, g)
+    y = np.maximum(y, 0.0)
+    if np.isfinite(t_land):
+        y[-1] = 0.0
+    return t, x, y
+
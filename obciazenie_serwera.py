@@ -0,0 +1,129 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# Test obciążeniowy serwera trajektorii (serwer_trajektorii.py): równoległe połączenia wysyłają
+# pojedyncze strzały na /strzal, a na końcu raport opóźnień (p50 / p99), przepustowości
+# i średniej wielkości partii z /zdrowie. --uruchom startuje serwer w tym samym procesie.
+#
+#   python obciazenie_serwera.py --uruchom -n 5000 -c 64
+#   python obciazenie_serwera.py --url http://127.0.0.1:8765 --wsad 100000
+
+
+def _request(conn, method, path, body=None):
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    conn.request(method, path, body, headers)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def _worker(host, port, count, seed, latencies, errors):
+    # Jedno trwałe połączenie (HTTP/1.1 keep-alive), parametry losowe
+    rng = np.random.default_rng(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    try:
+        for _ in range(count):
+            body = json.dumps({'v0': float(rng.uniform(10, 1000)), 'angle': float(rng.uniform(5, 85))})
+            start = time.perf_counter()
+            try:
+                status, _ = _request(conn, 'POST', '/strzal', body)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=60)
+                status = None
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        conn.close()
+
+
+def run_load(host, port, requests, concurrency):
+    # Zwraca (czasy odpowiedzi [s], liczba błędów, czas całkowity [s])
+    latencies, errors = [], []
+    per_thread = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    threads = [threading.Thread(target=_worker, args=(host, port, n, i, latencies, errors))
+               for i, n in enumerate(per_thread) if n]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies), len(errors), time.perf_counter() - start
+
+
+def run_batch(host, port, rows):
+    # Jedno żądanie /wsad z `rows` wierszami NDJSON; zwraca (czas do pierwszej porcji, czas całkowity, wiersze)
+    rng = np.random.default_rng(0)
+    body = '\n'.join(json.dumps({'v0': float(v), 'angle': float(a)})
+                     for v, a in zip(rng.uniform(10, 1000, rows), rng.uniform(5, 85, rows)))
+    conn = http.client.HTTPConnection(host, port, timeout=600)
+    try:
+        start = time.perf_counter()
+        conn.request('POST', '/wsad', body.encode('utf-8'), {'Content-Type': 'application/x-ndjson'})
+        response = conn.getresponse()
+        first = response.read1()
+        first_chunk = time.perf_counter() - start
+        received = first.count(b'\n') + response.read().count(b'\n')
+        return first_chunk, time.perf_counter() - start, received
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test obciążeniowy serwera trajektorii")
+    parser.add_argument('--url', default='http://127.0.0.1:8765', help="adres serwera")
+    parser.add_argument('--uruchom', action='store_true', help="uruchom serwer w tym procesie (wolny port)")
+    parser.add_argument('--workers', type=int, default=None, help="wątki obliczeniowe serwera (z --uruchom)")
+    parser.add_argument('--okno', type=float, default=None, help="okno łączenia [ms] (z --uruchom)")
+    parser.add_argument('-n', '--zadania', type=int, default=2000, help="liczba żądań /strzal")
+    parser.add_argument('-c', '--rownolegle', type=int, default=32, help="liczba równoległych połączeń")
+    parser.add_argument('--wsad', type=int, default=0, help="dodatkowo jedno żądanie /wsad z tyloma wierszami")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.uruchom:
+        from serwer_trajektorii import BATCH_WINDOW, DEFAULT_WORKERS, TrajectoryServer
+
+        window = BATCH_WINDOW if args.okno is None else args.okno / 1000
+        server = TrajectoryServer(('127.0.0.1', 0), args.workers or DEFAULT_WORKERS, window)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+    else:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+
+    try:
+        latencies, errors, elapsed = run_load(host, port, args.zadania, args.rownolegle)
+        ms = latencies * 1000
+        print(f"Żądania /strzal: {len(latencies)} ({errors} błędów), {args.rownolegle} połączeń, {elapsed:.2f} s")
+        print(f"  przepustowość: {len(latencies) / elapsed:.0f} żądań/s")
+        print(f"  opóźnienie [ms]: p50 {np.percentile(ms, 50):.2f}, p90 {np.percentile(ms, 90):.2f}, "
+              f"p99 {np.percentile(ms, 99):.2f}, max {ms.max():.2f}")
+
+        if args.wsad:
+            first_chunk, total, received = run_batch(host, port, args.wsad)
+            print(f"Żądanie /wsad: {received} wierszy w {total:.2f} s ({received / total:.0f} wierszy/s), "
+                  f"pierwsza porcja po {first_chunk * 1000:.0f} ms")
+
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        try:
+            _, body = _request(conn, 'GET', '/zdrowie')
+        finally:
+            conn.close()
+        health = json.loads(body)
+        print(f"Serwer: {health['strzaly']} strzałów w {health['partie']} partiach, "
+              f"średnio {health['srednia_partia']:.1f} strzałów na partię")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
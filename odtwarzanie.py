@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+
+# Odtwarzanie toru policzonego raz, ze stałą rozdzielczością, w czasie rzeczywistym: w każdej
+# klatce czas symulacji to czas zegara ściennego × przyspieszenie, a rysowana jest część toru
+# do tej chwili. Przyspieszenie nie zmienia więc obliczeń ani kosztu klatki, a gdy klatki się
+# spóźniają (obciążona maszyna), kolejna po prostu przeskakuje dalej – czas animacji się zgadza.
+
+
+class Playback:
+    def __init__(self, t, speed=1.0, clock=time.perf_counter):
+        self.t = np.asarray(t, dtype=float)   # chwile próbek toru, rosnąco
+        self.speed = float(speed)
+        self.clock = clock
+        self.frames = 0
+        self.dropped = 0
+        self._origin = None
+        self._offset = 0.0
+        self._started = None
+
+    @property
+    def duration(self):
+        # Czas trwania odtwarzania [s] przy bieżącym przyspieszeniu
+        return (self.t[-1] - self.t[0]) / self.speed
+
+    def start(self):
+        self._origin = self._started = self.clock()
+        self._offset = float(self.t[0])
+        self.frames = 0
+        self.dropped = 0
+
+    def sim_time(self):
+        if self._origin is None:
+            return self._offset
+        return min(self._offset + (self.clock() - self._origin) * self.speed, float(self.t[-1]))
+
+    def set_speed(self, speed):
+        # Zmiana przyspieszenia w trakcie – od bieżącego położenia, bez skoku
+        self._offset = self.sim_time()
+        if self._origin is not None:
+            self._origin = self.clock()
+        self.speed = float(speed)
+
+    def finished(self, t_sim):
+        # Czy chwila t_sim zwrócona przez frame() to już koniec toru. Nie czytamy zegara ponownie –
+        # mógłby przekroczyć koniec już po klatce, która narysowała stan sprzed lądowania.
+        return t_sim >= self.t[-1]
+
+    def frame(self):
+        # (liczba próbek do narysowania, czas symulacji) dla bieżącej klatki; ostatnia z nich
+        # przypada w chwili <= czasu symulacji.
+        # Zegar rusza przy pierwszej klatce, jeśli nie wywołano wcześniej start().
+        if self._origin is None:
+            self.start()
+        t_sim = self.sim_time()
+        self.frames += 1
+        return max(int(np.searchsorted(self.t, t_sim, side='right')), 1), t_sim
+
+    def late_frames(self, interval):
+        # Dla pętli z własnym zegarem (np. FuncAnimation): ile klatek co interval sekund powinno już
+        # zostać narysowanych ponad te, które narysowano – czyli ile pominięto pod obciążeniem
+        if self._started is None:
+            return 0
+        return max(int((self.clock() - self._started) / interval) + 1 - self.frames, 0)
+
+    def run(self, interval):
+        # Klatki co interval sekund zegara ściennego aż do końca toru; gdy rysowanie klatki trwa
+        # dłużej, pominięte terminy są liczone w dropped, a następna klatka nadrabia czas
+        self.start()
+        deadline = self._origin
+        while True:
+            count, t_sim = self.frame()
+            yield count, t_sim
+            if self.finished(t_sim):
+                return
+            deadline += interval
+            late = self.clock() - deadline
+            if late > 0:
+                missed = int(late // interval) + 1
+                self.dropped += missed
+                deadline += missed * interval
+            time.sleep(max(deadline - self.clock(), 0.0))
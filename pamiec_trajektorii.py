@@ -0,0 +1,111 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+# Trwała pamięć podręczna trajektorii na dysku, wspólna dla wszystkich sesji i restartów serwera.
+# Klucze powstają z parametrów zaokrąglonych do zadanej liczby cyfr znaczących, więc strzały
+# różniące się o mniej niż rozdzielczość trafiają w ten sam wpis. Każdy wpis to jeden plik .npy,
+# czytany z mapowaniem pamięci; po przekroczeniu limitu rozmiaru usuwane są najdawniej używane pliki.
+
+DEFAULT_DIR = os.environ.get('SYMULACJE_CACHE_DIR',
+                             os.path.join(os.path.expanduser('~'), '.cache', 'symulacje'))
+DEFAULT_MAX_BYTES = int(float(os.environ.get('SYMULACJE_CACHE_MB', 256)) * 2**20)
+# 4 cyfry znaczące odwzorowują dokładnie kroki suwaków aplikacji (np. masa 123.4 kg); przy mniejszej
+# rozdzielczości obliczenia idą z innymi wartościami niż wpisane – aplikacje pokazują wtedy użyte wartości
+DEFAULT_DIGITS = int(os.environ.get('SYMULACJE_CACHE_DIGITS', 4))
+
+
+class TrajectoryCache:
+    def __init__(self, directory=DEFAULT_DIR, digits=DEFAULT_DIGITS, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.digits = digits
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def quantize(self, *params):
+        # Parametry zaokrąglone do rozdzielczości pamięci – obliczenia wykonujemy już na nich,
+        # aby wpis odpowiadał dokładnie swojemu kluczowi
+        return tuple(float(f"{float(p):.{self.digits}g}") for p in params)
+
+    def _path(self, namespace, params):
+        digest = hashlib.sha1(f"{namespace}:{params!r}".encode()).hexdigest()[:24]
+        return os.path.join(self.directory, f"{namespace}-{digest}.npy")
+
+    def get(self, namespace, params):
+        # Tablica z pamięci (mapowana, tylko do odczytu) albo None
+        path = self._path(namespace, self.quantize(*params))
+        try:
+            data = np.load(path, mmap_mode='r')
+            os.utime(path)  # znacznik ostatniego użycia dla polityki LRU
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, namespace, params, array):
+        path = self._path(namespace, self.quantize(*params))
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp, path)  # atomowo – inne sesje nigdy nie widzą połowy pliku
+        self._evict()
+
+    def get_or_compute(self, namespace, params, compute):
+        # compute(*parametry_zaokrąglone) -> ndarray; wynik zapisywany przy chybieniu
+        params = self.quantize(*params)
+        data = self.get(namespace, params)
+        if data is None:
+            data = np.asarray(compute(*params))
+            self.put(namespace, params, data)
+        return data
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npy'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue  # np. plik wciąż zmapowany w innym procesie (Windows)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,318 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from model_kwadratowy import T_MAX, compute_trajectory, integrate_batch
+from model_liniowy import flight_summary, trajectory as linear_trajectory
+from tablica_strzelnicza import DEFAULT_PATH as FIRING_TABLE_PATH
+
+# Porównanie silników fizyki rzutu: opóźnienie pojedynczego strzału, przepustowość wsadu,
+# szczyt pamięci (tracemalloc) i błąd względem rozwiązania referencyjnego (DOP853, rtol 1e-12)
+# na stałej siatce parametrów. Wynik to plik JSON, który służy jako wzorzec – polecenie
+# `porownaj` zestawia dwa pomiary i zgłasza pogorszenia ponad zadany próg.
+#
+#   python porownanie_silnikow.py pomiar -o wzorzec.json
+#   python porownanie_silnikow.py pomiar --silniki integrate_batch,flight_summary -o nowy.json
+#   python porownanie_silnikow.py porownaj wzorzec.json nowy.json --prog 0.2
+#
+# Nowy silnik wystarczy dopisać do ENGINES: funkcja przyjmuje tablice (v0, angle, drag, mass, g)
+# i zwraca (czas lotu, zasięg, wysokość maksymalna, prędkość końcowa); brakujące wielkości jako NaN.
+
+OUTPUTS = ('t_flight', 'range', 'max_height', 'final_speed')
+# Siatka błędu: prędkości logarytmicznie od 10 do 1000 m/s, opór w jednostkach każdego modelu
+# (b [N·s²/m²] jak w rzut_ukosny_web3.py, k1 [kg/s] jak w rzut_ukosny.py)
+GRID = {
+    'v0': (10.0, 1000.0, 8),
+    'angle': (15.0, 45.0, 75.0),
+    'drag': {'kwadratowy': (0.0, 0.001, 0.01, 0.05), 'liniowy': (0.1, 1.0, 3.0, 10.0)},
+    'mass': 10.0,
+    'g': 9.81,
+}
+QUICK_GRID = dict(GRID, v0=(10.0, 1000.0, 4), angle=(20.0, 60.0),
+                  drag={'kwadratowy': (0.0, 0.01), 'liniowy': (0.1, 3.0)})
+# Strzały do pomiaru opóźnienia (kąt 45°, środkowy opór modelu)
+LATENCY_V0 = (50.0, 300.0, 1000.0)
+LATENCY_DRAG = {'kwadratowy': 0.005, 'liniowy': 1.0}
+REPEATS = 7
+BATCH_SIZE = 10000
+SEED = 2024
+REFERENCE_RTOL = 1e-12
+REFERENCE_ATOL = 1e-12
+# Domyślny próg pogorszenia (ułamek) i błędy uznawane za zerowe przy porównaniu
+THRESHOLD = 0.2
+ERROR_FLOOR = 1e-9
+
+
+def _per_shot(func):
+    # Silnik liczący jeden strzał naraz – pętla po wierszach
+    def batch(v0, angle, drag, mass, g):
+        results = np.array([func(*shot) for shot in zip(v0, angle, drag, mass, g)], dtype=float)
+        return tuple(results.reshape(-1, len(OUTPUTS)).T)
+    return batch
+
+
+def _solve_ivp_shot(v0, angle, drag, mass, g):
+    t, x, y, vx, vy, max_height, range_val, final_speed = compute_trajectory(v0, angle, g, drag, mass)
+    return t[-1], range_val, max_height, final_speed
+
+
+def _integrate_batch(v0, angle, drag, mass, g):
+    return integrate_batch(v0, angle, g, drag, mass)
+
+
+def _trajectory_shot(v0, angle, drag, mass, g):
+    # Odczyty z próbkowanego toru (bez prędkości) – koszt rysowania pełnej trajektorii
+    t, x, y = linear_trajectory(angle, v0, drag, mass, g)
+    return t[-1], x[-1], y.max(), math.nan
+
+
+def _flight_summary(v0, angle, drag, mass, g):
+    t_flight, range_val, _, max_height, final_speed, _ = flight_summary(angle, v0, drag, mass, g)
+    return t_flight, range_val, max_height, final_speed
+
+
+class Engine:
+    def __init__(self, name, model, func, vectorized, max_batch=BATCH_SIZE):
+        self.name = name
+        self.model = model
+        self.func = func
+        self.vectorized = vectorized
+        self.max_batch = max_batch   # wsad pomiaru przepustowości (pętle po strzałach są wolne)
+
+    def __call__(self, v0, angle, drag, mass, g):
+        arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=float)) for a in (v0, angle, drag, mass, g)))
+        return tuple(np.asarray(r, dtype=float) for r in self.func(*arrays))
+
+
+ENGINES = [
+    Engine('solve_ivp', 'kwadratowy', _per_shot(_solve_ivp_shot), False, max_batch=200),
+    Engine('integrate_batch', 'kwadratowy', _integrate_batch, True),
+    Engine('trajectory', 'liniowy', _per_shot(_trajectory_shot), False, max_batch=2000),
+    Engine('flight_summary', 'liniowy', _flight_summary, True),
+]
+
+
+def available_engines():
+    # Stałe silniki oraz tablica strzelnicza, jeśli została zbudowana
+    engines = list(ENGINES)
+    if os.path.exists(FIRING_TABLE_PATH):
+        from tablica_strzelnicza import FiringTable
+
+        table = FiringTable.load(FIRING_TABLE_PATH)
+
+        def firing_table(v0, angle, drag, mass, g):
+            t_flight, range_val, max_height, _ = table.query(v0, angle, g, drag, mass)
+            return t_flight, range_val, max_height, np.full(len(v0), np.nan)
+        engines.append(Engine('tablica_strzelnicza', 'kwadratowy', firing_table, True))
+    return engines
+
+
+def reference(model, v0, angle, drag, mass, g):
+    # Rozwiązanie wzorcowe jednego strzału: DOP853 z bardzo małą tolerancją i zdarzeniami
+    # lądowania oraz wierzchołka (vy = 0)
+    from scipy.integrate import solve_ivp
+
+    k = drag / mass
+    if model == 'liniowy':
+        def rhs(t, s):
+            return [s[2], s[3], -k * s[2], -g - k * s[3]]
+    else:
+        def rhs(t, s):
+            v = math.hypot(s[2], s[3])
+            return [s[2], s[3], -k * v * s[2], -g - k * v * s[3]]
+
+    def ground(t, s):
+        return s[1]
+    ground.terminal = True
+    ground.direction = -1
+
+    def apex(t, s):
+        return s[3]
+    apex.direction = -1
+
+    angle_rad = math.radians(angle)
+    sol = solve_ivp(rhs, (0.0, T_MAX), [0.0, 0.0, v0 * math.cos(angle_rad), v0 * math.sin(angle_rad)],
+                    method='DOP853', events=(ground, apex), rtol=REFERENCE_RTOL, atol=REFERENCE_ATOL)
+    if not sol.t_events[0].size:
+        return math.nan, math.nan, math.nan, math.nan
+    x, _, vx, vy = sol.y_events[0][0]
+    max_height = sol.y_events[1][0][1] if sol.t_events[1].size else 0.0
+    return sol.t_events[0][0], x, max_height, math.hypot(vx, vy)
+
+
+def error_grid(model, grid):
+    # Płaska siatka parametrów modelu: (v0, angle, drag, mass, g) jako tablice
+    v0 = np.geomspace(*grid['v0'][:2], int(grid['v0'][2]))
+    v0, angle, drag = (a.ravel() for a in np.meshgrid(v0, grid['angle'], grid['drag'][model], indexing='ij'))
+    return v0, angle, drag, np.full_like(v0, grid['mass']), np.full_like(v0, grid['g'])
+
+
+def random_batch(model, n, seed=SEED):
+    # Losowe strzały z zakresu siatki – wsad do pomiaru przepustowości i pamięci
+    rng = np.random.default_rng(seed)
+    drag = GRID['drag'][model]
+    v0 = np.exp(rng.uniform(math.log(GRID['v0'][0]), math.log(GRID['v0'][1]), n))
+    return (v0, rng.uniform(5.0, 85.0, n), rng.uniform(min(drag), max(drag), n),
+            np.full(n, GRID['mass']), np.full(n, GRID['g']))
+
+
+def measure_latency(engine, repeats):
+    times = []
+    for v0 in LATENCY_V0:
+        params = (v0, 45.0, LATENCY_DRAG[engine.model], GRID['mass'], GRID['g'])
+        for _ in range(repeats):
+            start = time.perf_counter()
+            engine(*params)
+            times.append(time.perf_counter() - start)
+    ms = np.array(times) * 1000
+    return {'p50_ms': float(np.percentile(ms, 50)), 'p95_ms': float(np.percentile(ms, 95))}
+
+
+def measure_batch(engine, n):
+    batch = random_batch(engine.model, n)
+    start = time.perf_counter()
+    engine(*batch)
+    elapsed = time.perf_counter() - start
+    # Pamięć osobnym przebiegiem – tracemalloc spowalnia kod Pythona i zafałszowałby czas
+    tracemalloc.start()
+    try:
+        engine(*batch)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'batch': n, 'shots_per_s': n / elapsed, 'peak_kb': peak / 1024}
+
+
+def measure_error(engine, params, expected):
+    results = engine(*params)
+    errors = {}
+    for name, value, ref in zip(OUTPUTS, results, expected):
+        rel = np.abs(value - ref) / np.maximum(np.abs(ref), 1e-12)
+        valid = np.isfinite(ref) & np.isfinite(value)
+        if np.all(np.isnan(value)):
+            continue  # silnik nie podaje tej wielkości
+        errors[name] = {'max': float(rel[valid].max()) if valid.any() else math.inf,
+                        'median': float(np.median(rel[valid])) if valid.any() else math.inf,
+                        'failed': int(np.sum(np.isfinite(ref) & ~np.isfinite(value)))}
+    return errors
+
+
+def run(engines, grid, repeats, batch_size, log=print):
+    references = {}
+    report = {}
+    for engine in engines:
+        if engine.model not in references:
+            params = error_grid(engine.model, grid)
+            log(f"Rozwiązanie wzorcowe ({engine.model}, {len(params[0])} strzałów)...")
+            expected = np.array([reference(engine.model, *shot) for shot in zip(*params)]).T
+            references[engine.model] = (params, expected)
+        params, expected = references[engine.model]
+        log(f"{engine.name}...")
+        engine(*(p[:1] for p in params))  # rozgrzewka: importy, pamięci podręczne
+        result = {'model': engine.model, 'vectorized': engine.vectorized}
+        result['latency'] = measure_latency(engine, repeats)
+        result['throughput'] = measure_batch(engine, min(batch_size, engine.max_batch))
+        result['error'] = measure_error(engine, params, expected)
+        report[engine.name] = result
+    return report
+
+
+def environment():
+    import scipy
+
+    return {'python': sys.version.split()[0], 'numpy': np.__version__, 'scipy': scipy.__version__,
+            'platform': platform.platform(), 'machine': platform.machine(), 'processor': platform.processor(),
+            'cpu_count': os.cpu_count()}
+
+
+def compare(base, new, threshold=THRESHOLD):
+    # Lista (silnik, miara, stara wartość, nowa wartość, pogorszenie) dla wszystkich wspólnych miar;
+    # pogorszenie to względny wzrost kosztu (czas, pamięć, błąd) albo spadek przepustowości
+    rows = []
+    for name in sorted(set(base['engines']) & set(new['engines'])):
+        old, cur = base['engines'][name], new['engines'][name]
+        metrics = [(f"latencja {key}", old['latency'][key], cur['latency'][key], False)
+                   for key in ('p50_ms', 'p95_ms')]
+        metrics.append(("przepustowość", old['throughput']['shots_per_s'], cur['throughput']['shots_per_s'], True))
+        metrics.append(("pamięć kB", old['throughput']['peak_kb'], cur['throughput']['peak_kb'], False))
+        for output in sorted(set(old['error']) & set(cur['error'])):
+            metrics.append((f"błąd {output}", max(old['error'][output]['max'], ERROR_FLOOR),
+                            max(cur['error'][output]['max'], ERROR_FLOOR), False))
+        for metric, before, after, higher_is_better in metrics:
+            if higher_is_better:
+                change = before / after - 1 if after > 0 else math.inf
+            else:
+                change = after / before - 1 if before > 0 else math.inf
+            rows.append((name, metric, before, after, change, change > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Porównanie wydajności i dokładności silników rzutu ukośnego")
+    commands = parser.add_subparsers(dest='command', required=True)
+    measure = commands.add_parser('pomiar', help="zmierz silniki i zapisz wynik JSON")
+    measure.add_argument('-o', '--out', default='porownanie_silnikow.json', help="plik wynikowy JSON")
+    measure.add_argument('--silniki', help="lista silników po przecinku (domyślnie wszystkie)")
+    measure.add_argument('--szybko', action='store_true', help="mniejsza siatka i mniej powtórzeń")
+    measure.add_argument('--powtorzenia', type=int, default=REPEATS, help="powtórzenia pomiaru opóźnienia")
+    measure.add_argument('--wsad', type=int, default=BATCH_SIZE, help="strzały w pomiarze przepustowości")
+    diff = commands.add_parser('porownaj', help="porównaj dwa wyniki i zgłoś pogorszenia")
+    diff.add_argument('wzorzec', help="wynik odniesienia (JSON)")
+    diff.add_argument('nowy', help="nowy wynik (JSON)")
+    diff.add_argument('--prog', type=float, default=THRESHOLD, help="dopuszczalne pogorszenie (ułamek)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'pomiar':
+        engines = available_engines()
+        if args.silniki:
+            names = args.silniki.split(',')
+            unknown = set(names) - {e.name for e in engines}
+            if unknown:
+                parser.error(f"nieznane silniki: {', '.join(sorted(unknown))}")
+            engines = [e for e in engines if e.name in names]
+        grid = QUICK_GRID if args.szybko else GRID
+        repeats = 3 if args.szybko else args.powtorzenia
+        batch_size = min(args.wsad, 1000) if args.szybko else args.wsad
+        report = run(engines, grid, repeats, batch_size, log=lambda text: print(text, file=sys.stderr))
+        data = {'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'environment': environment(),
+                'config': {'grid': grid, 'repeats': repeats, 'batch': batch_size, 'seed': SEED,
+                           'reference': {'method': 'DOP853', 'rtol': REFERENCE_RTOL, 'atol': REFERENCE_ATOL}},
+                'engines': report}
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        for name, result in report.items():
+            errors = ', '.join(f"{k} {v['max']:.1e}" for k, v in result['error'].items())
+            print(f"{name:22s} {result['latency']['p50_ms']:10.3f} ms  "
+                  f"{result['throughput']['shots_per_s']:12.0f} strz./s  "
+                  f"{result['throughput']['peak_kb']:10.0f} kB  błąd maks.: {errors}")
+        return 0
+
+    with open(args.wzorzec, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.nowy, encoding='utf-8') as f:
+        new = json.load(f)
+    if base['config'] != new['config']:
+        print("Uwaga: pomiary wykonano z różną konfiguracją – porównanie może być mylące.")
+    if base['environment'] != new['environment']:
+        print("Uwaga: pomiary wykonano w różnych środowiskach.")
+    rows = compare(base, new, args.prog)
+    for name, metric, before, after, change, regression in rows:
+        flag = "  POGORSZENIE" if regression else ""
+        print(f"{name:22s} {metric:22s} {before:12.4g} -> {after:12.4g} ({change:+.0%}){flag}")
+    regressions = sum(r[-1] for r in rows)
+    missing = sorted(set(base['engines']) - set(new['engines']))
+    if missing:
+        print(f"Brak w nowym pomiarze: {', '.join(missing)}")
+    print(f"Pogorszenia ponad {args.prog:.0%}: {regressions}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from celowanie import golden_max
+from model_kwadratowy import integrate_batch
+from model_liniowy import MIN_LINEAR_DRAG, flight_summary
+
+# Przegląd parametrów: dowolny podzbiór (v0, kąt, opór, masa, g) podany jako ciągi wartości,
+# pozostałe jako stałe. Siatka nie jest materializowana – każda porcja odtwarza swoje punkty
+# z indeksów spłaszczonej siatki, a porcje liczone są w puli procesów. Wynik to tablica
+# z nazwanymi osiami. Osobno: kąt maksymalnego zasięgu dla każdej konfiguracji (złoty podział).
+# physics – stałe rozszerzonego modelu kwadratowego {wind, scale_height, y_launch, y_target}
+# przekazywane do integrate_batch; model liniowy ich nie obsługuje.
+
+AXES = ('v0', 'angle', 'drag', 'mass', 'g')
+OUTPUTS = ('t_flight', 'range', 'max_height', 'final_speed')
+CHUNK_SIZE = 4096
+
+
+def evaluate(model, v0, angle, drag, mass, g, physics=None):
+    # (czas lotu, zasięg, wysokość maksymalna, prędkość końcowa) dla tablic parametrów
+    physics = physics or {}
+    if model == 'liniowy':
+        if any(physics.values()):
+            raise ValueError(f"model liniowy nie uwzględnia parametrów: {', '.join(physics)}")
+        t_flight, range_val, _, max_height, final_speed, _ = flight_summary(
+            angle, v0, np.maximum(drag, MIN_LINEAR_DRAG), mass, g)
+        return t_flight, range_val, max_height, final_speed
+    t_flight, range_val, max_height, final_speed = integrate_batch(v0, angle, g, drag, mass, **physics)
+    # Strzał, który nie wznosi się na wysokość celu, kończy się w wierzchołku – to nie jest
+    # lądowanie, więc czas lotu, zasięg i prędkość końcowa są nieokreślone
+    missed = max_height < physics.get('y_target', 0.0)
+    nan = lambda a: np.where(missed, np.nan, a)
+    return nan(t_flight), nan(range_val), max_height, nan(final_speed)
+
+
+def _evaluate_chunk(model, axes, start, stop, physics=None):
+    # Punkty start:stop spłaszczonej siatki; axes to tablice wszystkich pięciu parametrów
+    # (stałe jako tablice jednoelementowe)
+    idx = np.unravel_index(np.arange(start, stop), [len(a) for a in axes])
+    params = [a[i] for a, i in zip(axes, idx)]
+    return np.stack([np.asarray(r, dtype=float) for r in evaluate(model, *params, physics=physics)])
+
+
+class SweepResult:
+    def __init__(self, dims, coords, values, fixed, model):
+        self.dims = dims        # nazwy przeglądanych osi, w kolejności AXES
+        self.coords = coords    # {oś: wartości}
+        self.values = values    # (len(OUTPUTS),) + kształt siatki
+        self.fixed = fixed      # {parametr: wartość stała}
+        self.model = model
+
+    def __getitem__(self, output):
+        return self.values[OUTPUTS.index(output)]
+
+    @property
+    def shape(self):
+        return self.values.shape[1:]
+
+    def sel(self, output, **coords):
+        # Wycinek dla najbliższych wartości podanych osi, np. sel('range', v0=300)
+        index = []
+        for dim in self.dims:
+            if dim in coords:
+                index.append(int(np.argmin(np.abs(self.coords[dim] - coords[dim]))))
+            else:
+                index.append(slice(None))
+        return self[output][tuple(index)]
+
+    def argmax(self, output, dim):
+        # Wartość osi dim, dla której output jest największy – dla każdego punktu pozostałych osi
+        axis = self.dims.index(dim)
+        return self.coords[dim][np.argmax(self[output], axis=axis)]
+
+
+def sweep(model='kwadratowy', workers=None, chunk_size=CHUNK_SIZE, physics=None, **params):
+    # params: v0, angle, drag, mass, g – liczba (stała) albo ciąg wartości (oś przeglądu)
+    missing = [name for name in AXES if name not in params]
+    if missing:
+        raise ValueError(f"Brak parametrów: {', '.join(missing)}")
+    axes = [np.atleast_1d(np.asarray(params[name], dtype=float)) for name in AXES]
+    dims = tuple(name for name in AXES if np.ndim(params[name]) > 0)
+    shape = tuple(len(a) for a in axes)
+    total = int(np.prod(shape))
+    bounds = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+
+    if workers == 1 or len(bounds) <= 1:
+        chunks = [_evaluate_chunk(model, axes, start, stop, physics) for start, stop in bounds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_evaluate_chunk, [model] * len(bounds), [axes] * len(bounds), *zip(*bounds),
+                                   [physics] * len(bounds)))
+    values = np.concatenate(chunks, axis=1).reshape((len(OUTPUTS),) + tuple(len(params[d]) for d in dims))
+    coords = {name: axes[AXES.index(name)] for name in dims}
+    fixed = {name: float(params[name]) for name in AXES if name not in dims}
+    fixed.update(physics or {})
+    return SweepResult(dims, coords, values, fixed, model)
+
+
+def _optimal_chunk(model, v0, drag, mass, g, physics=None):
+    def range_at(angle):
+        return evaluate(model, v0, angle, drag, mass, g, physics)[1]
+
+    def objective(angle):
+        # Kąty, przy których pocisk nie dolatuje na wysokość celu, nigdy nie są najlepsze
+        range_val = range_at(angle)
+        return np.where(np.isnan(range_val), -np.inf, range_val)
+
+    angle = golden_max(objective, np.zeros_like(v0), np.full_like(v0, 90.0))
+    return angle, range_at(angle)
+
+
+def optimal_angle(v0, drag, mass, g, model='kwadratowy', workers=None, chunk_size=CHUNK_SIZE, physics=None):
+    # Kąt [°] maksymalnego zasięgu i ten zasięg dla każdej konfiguracji (argumenty mogą być tablicami).
+    # Zasięg jest jednomodalny względem kąta na [0°, 90°], więc wystarcza złoty podział;
+    # każda iteracja to jedno wsadowe całkowanie wszystkich konfiguracji porcji.
+    v0, drag, mass, g = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (v0, drag, mass, g)))
+    shape = v0.shape
+    v0, drag, mass, g = (a.ravel() for a in (v0, drag, mass, g))
+    bounds = [(start, min(start + chunk_size, len(v0))) for start in range(0, len(v0), chunk_size)]
+    parts = [tuple(a[start:stop] for a in (v0, drag, mass, g)) for start, stop in bounds]
+
+    if workers == 1 or len(parts) <= 1:
+        results = [_optimal_chunk(model, *part, physics) for part in parts]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_optimal_chunk, [model] * len(parts), *zip(*parts), [physics] * len(parts)))
+    angle = np.concatenate([r[0] for r in results]).reshape(shape)
+    range_val = np.concatenate([r[1] for r in results]).reshape(shape)
+    return angle[()], range_val[()]
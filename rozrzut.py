@@ -0,0 +1,262 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model_kwadratowy import integrate_batch
+from model_liniowy import MIN_LINEAR_DRAG, flight_summary
+
+# Rozrzut punktu upadku metodą Monte Carlo: parametry strzału losowane z rozkładów normalnych
+# wokół wartości nominalnych, a próbki liczone porcjami wsadowym integratorem (opór kwadratowy)
+# albo ze wzorów zamkniętych (opór liniowy). Statystyki są strumieniowe – średnia i kowariancja
+# (Welford/Chan), kwantyle ze szkicu o względnej dokładności (jak DDSketch) i histogram 2D punktów
+# upadku – więc pamięć nie zależy od liczby próbek. Każda porcja ma własne ziarno z SeedSequence,
+# więc wynik nie zależy od liczby procesów.
+
+# drag to w modelu kwadratowym b [kg/m], a w liniowym k1 [kg/s] – wartości nie są wymienne
+PARAMS = ('v0', 'angle', 'drag', 'mass', 'g')
+# Parametry rozszerzonego modelu kwadratowego (jak integrate_batch) – domyślnie 0, czyli bezwietrzne
+# powietrze o stałej gęstości i strzał z ziemi na ziemię; postać zamknięta modelu liniowego ich nie zna
+PHYSICS = ('wind', 'scale_height', 'y_launch', 'y_target')
+# Wielkości zbierane dla każdej próbki: punkt upadku (x wzdłuż, z w bok) i czas lotu
+QUANTITIES = ('x', 'z', 't_flight')
+CHUNK_SIZE = 20000
+HIST_BINS = 60
+# Połowa szerokości histogramu w odchyleniach standardowych porcji próbnej
+HIST_SIGMAS = 6.0
+SKETCH_ACCURACY = 0.001
+
+
+class RunningMoments:
+    # Średnia i macierz kowariancji aktualizowane porcjami (wzór Chana – Welford dla całych porcji)
+    def __init__(self, dim):
+        self.count = 0
+        self.mean = np.zeros(dim)
+        self.m2 = np.zeros((dim, dim))
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        if total == 0:
+            return
+        delta = mean - self.mean
+        self.m2 = self.m2 + m2 + np.outer(delta, delta) * self.count * count / total
+        self.mean = self.mean + delta * count / total
+        self.count = total
+
+    def update(self, samples):
+        # samples: tablica (n, dim)
+        if len(samples) == 0:
+            return
+        mean = samples.mean(axis=0)
+        centered = samples - mean
+        self._combine(len(samples), mean, centered.T @ centered)
+
+    def merge(self, other):
+        self._combine(other.count, other.mean, other.m2)
+
+    def covariance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.full_like(self.m2, np.nan)
+
+
+class QuantileSketch:
+    # Szkic kwantyli o względnej dokładności: wartość v trafia do kubełka ceil(log_gamma |v|),
+    # osobno dla dodatnich i ujemnych. Liczba kubełków rośnie z logarytmem zakresu, nie z liczbą próbek.
+    def __init__(self, relative_accuracy=SKETCH_ACCURACY):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = 1e-9
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+
+    def _add(self, store, magnitudes):
+        keys, counts = np.unique(np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64),
+                                 return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values):
+        values = values[np.isfinite(values)]
+        positive = values > self.min_value
+        negative = values < -self.min_value
+        self._add(self.positive, values[positive])
+        self._add(self.negative, -values[negative])
+        self.zero += int(len(values) - positive.sum() - negative.sum())
+        self.count += len(values)
+
+    def merge(self, other):
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero += other.zero
+        self.count += other.count
+
+    def _value(self, key):
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+
+class ImpactHistogram:
+    # Histogram 2D punktów upadku o stałych krawędziach; próbki poza nim są tylko liczone
+    def __init__(self, x_edges, z_edges):
+        self.x_edges = x_edges
+        self.z_edges = z_edges
+        self.counts = np.zeros((len(x_edges) - 1, len(z_edges) - 1), dtype=np.int64)
+        self.outside = 0
+
+    def update(self, x, z):
+        counts, _, _ = np.histogram2d(x, z, bins=[self.x_edges, self.z_edges])
+        counts = counts.astype(np.int64)
+        self.counts += counts
+        self.outside += len(x) - int(counts.sum())
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.outside += other.outside
+
+
+class DispersionStats:
+    def __init__(self, edges):
+        self.moments = RunningMoments(len(QUANTITIES))
+        self.sketches = {name: QuantileSketch() for name in QUANTITIES}
+        self.histogram = ImpactHistogram(*edges)
+        self.lost = 0  # próbki bez lądowania (np. g = 0 albo cel powyżej wierzchołka)
+
+    def update(self, impacts):
+        # impacts: tablica (n, 3) z kolumnami QUANTITIES
+        finite = np.all(np.isfinite(impacts), axis=1)
+        self.lost += int(np.sum(~finite))
+        impacts = impacts[finite]
+        self.moments.update(impacts)
+        for i, name in enumerate(QUANTITIES):
+            self.sketches[name].update(impacts[:, i])
+        self.histogram.update(impacts[:, 0], impacts[:, 1])
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        for name in QUANTITIES:
+            self.sketches[name].merge(other.sketches[name])
+        self.histogram.merge(other.histogram)
+        self.lost += other.lost
+
+    @property
+    def count(self):
+        return self.moments.count
+
+    def mean(self, name):
+        return self.moments.mean[QUANTITIES.index(name)]
+
+    def std(self, name):
+        i = QUANTITIES.index(name)
+        return math.sqrt(self.moments.covariance()[i, i])
+
+    def quantile(self, name, q):
+        return self.sketches[name].quantile(q)
+
+    def ellipse(self, probability=0.95, n_points=100):
+        # Elipsa rozrzutu (x, z) obejmująca zadany odsetek punktów przy rozkładzie normalnym
+        cov = self.moments.covariance()[:2, :2]
+        values, vectors = np.linalg.eigh(cov)
+        radius = math.sqrt(-2 * math.log(1 - probability))
+        phi = np.linspace(0, 2 * np.pi, n_points)
+        circle = np.stack([np.cos(phi), np.sin(phi)])
+        points = vectors @ (radius * np.sqrt(np.maximum(values, 0.0))[:, None] * circle)
+        return self.moments.mean[0] + points[0], self.moments.mean[1] + points[1]
+
+
+def sample_parameters(rng, n, nominal, spread):
+    # Losowanie n zestawów parametrów; nominal i spread to słowniki {nazwa: wartość / odchylenie}.
+    # Azymut (odchylenie w bok) ma domyślnie wartość nominalną 0.
+    params = {}
+    for name in PARAMS + PHYSICS + ('azimuth',):
+        params[name] = nominal.get(name, 0.0) + spread.get(name, 0.0) * rng.standard_normal(n)
+    params['v0'] = np.maximum(params['v0'], 0.0)
+    params['drag'] = np.maximum(params['drag'], 0.0)
+    params['mass'] = np.maximum(params['mass'], 1e-6)
+    return params
+
+
+def impacts(model, params, rtol=1e-7, atol=1e-9):
+    # Punkty upadku (n, 3): x = zasięg * cos(azymut), z = zasięg * sin(azymut), czas lotu
+    physics = {name: params[name] for name in PHYSICS if name in params}
+    if model == 'liniowy':
+        if any(np.any(value) for value in physics.values()):
+            raise ValueError(f"model liniowy nie uwzględnia parametrów: {', '.join(PHYSICS)}")
+        t_flight, range_val = flight_summary(params['angle'], params['v0'],
+                                             np.maximum(params['drag'], MIN_LINEAR_DRAG),
+                                             params['mass'], params['g'])[:2]
+    else:
+        t_flight, range_val, max_height, _ = integrate_batch(params['v0'], params['angle'], params['g'],
+                                                             params['drag'], params['mass'], rtol=rtol, atol=atol,
+                                                             **physics)
+        # Brak lądowania w t_max – tak jak w liniowym, traktujemy jako brak punktu upadku. Tak samo
+        # strzał, który nie wznosi się na wysokość celu: kończy się w wierzchołku, a nie na celu.
+        landed = (params['g'] > 0) & (max_height >= physics.get('y_target', 0.0))
+        t_flight = np.where(landed, t_flight, np.inf)
+    azimuth = np.radians(params['azimuth'])
+    return np.stack([range_val * np.cos(azimuth), range_val * np.sin(azimuth), t_flight], axis=1)
+
+
+def _chunk_impacts(model, nominal, spread, n, seed):
+    rng = np.random.default_rng(seed)
+    return impacts(model, sample_parameters(rng, n, nominal, spread))
+
+
+def _chunk_stats(model, nominal, spread, n, seed, edges):
+    stats = DispersionStats(edges)
+    stats.update(_chunk_impacts(model, nominal, spread, n, seed))
+    return stats
+
+
+def _histogram_edges(sample, bins=HIST_BINS):
+    # Krawędzie histogramu z porcji próbnej: środek ± HIST_SIGMAS odchyleń (z minimalną szerokością)
+    sample = sample[np.all(np.isfinite(sample), axis=1)]
+    if len(sample) == 0:
+        return np.linspace(-1, 1, bins + 1), np.linspace(-1, 1, bins + 1)
+    center = sample[:, :2].mean(axis=0)
+    half = np.maximum(HIST_SIGMAS * sample[:, :2].std(axis=0), max(1e-3 * abs(center[0]), 1.0))
+    return tuple(np.linspace(c - h, c + h, bins + 1) for c, h in zip(center, half))
+
+
+def simulate(nominal, spread, n_samples, model='kwadratowy', seed=0, chunk_size=CHUNK_SIZE, workers=None):
+    # Rozrzut dla n_samples losowań. Pierwsza porcja liczona jest w bieżącym procesie i wyznacza
+    # krawędzie histogramu; pozostałe trafiają do puli procesów (workers=1 – bez puli).
+    sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    pilot = _chunk_impacts(model, nominal, spread, sizes[0], seeds[0])
+    edges = _histogram_edges(pilot)
+    stats = DispersionStats(edges)
+    stats.update(pilot)
+
+    rest = list(zip(sizes[1:], seeds[1:]))
+    if not rest:
+        return stats
+    if workers == 1:
+        for n, s in rest:
+            stats.merge(_chunk_stats(model, nominal, spread, n, s, edges))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            n, s = zip(*rest)
+            for chunk in pool.map(_chunk_stats, [model] * len(rest), [nominal] * len(rest),
+                                  [spread] * len(rest), n, s, [edges] * len(rest)):
+                stats.merge(chunk)
+    return stats
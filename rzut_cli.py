@@ -0,0 +1,190 @@
+import argparse
+import csv
+import itertools
+import json
+import sys
+
+import numpy as np
+
+from eksport import WRITERS
+from przeglad import AXES, OUTPUTS, evaluate
+
+# Obliczenia wsadowe z wiersza poleceń, bez Streamlit, Plotly i matplotlib.
+# Wejście: CSV z nagłówkiem albo JSONL, po jednym zestawie parametrów (v0, angle, drag, mass, g)
+# w wierszu; brakujące parametry biorą wartości domyślne z opcji. Opcjonalna kolumna `model`
+# (kwadratowy / liniowy) nadpisuje model dla wiersza. Wynik: parametry + czas lotu, zasięg,
+# wysokość maksymalna i prędkość końcowa, w tym samym formacie co wejście (albo --out-format);
+# do pliku można też pisać porcjami w NPZ lub Parquet (moduł eksport).
+#
+#   python rzut_cli.py strzaly.csv -o wyniki.csv
+#   python rzut_cli.py strzaly.jsonl --model liniowy > wyniki.jsonl
+#   python rzut_cli.py strzaly.csv -o wyniki.npz
+
+MODELS = ('kwadratowy', 'liniowy')
+CHUNK_SIZE = 4096
+# Wartości parametrów pominiętych w wierszu (jak domyślne suwaki rzut_ukosny_web3.py). Kolumna drag
+# to w modelu kwadratowym b [kg/m], a w liniowym k1 [kg/s] – ten ma własną wartość domyślną 'k1'
+# (jak rzut_ukosny.py i rzut_ukosny_web.py).
+DEFAULTS = {'drag': 0.005, 'k1': 1.0, 'mass': 10.0, 'g': 9.81}
+
+
+def _format(path, explicit):
+    if explicit:
+        return explicit
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'npz' if path.endswith('.npz') else 'parquet' if path.endswith('.parquet') else 'csv'
+
+
+def read_rows(stream, fmt):
+    # Kolejne wiersze wejścia jako słowniki; niepoprawny wiersz JSONL – ValueError z numerem wiersza
+    if fmt == 'jsonl':
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                raise ValueError(f"wiersz {number}: niepoprawny JSON ({error.msg})") from None
+            if not isinstance(row, dict):
+                raise ValueError(f"wiersz {number}: oczekiwano obiektu JSON z parametrami")
+            yield row
+    else:
+        yield from csv.DictReader(stream)
+
+
+def first_data_line(fmt):
+    # Numer wiersza pliku z pierwszym zestawem parametrów – w CSV pierwszy wiersz to nagłówek
+    return 1 if fmt == 'jsonl' else 2
+
+
+def _default(defaults, name, model):
+    if name == 'drag' and model == 'liniowy':
+        return defaults.get('k1')
+    return defaults.get(name)
+
+
+def _column(rows, name, defaults, models, first_line):
+    values = []
+    for i, row in enumerate(rows):
+        value = row.get(name)
+        default = _default(defaults, name, models[i])
+        if value is None or value == '':
+            if default is None:
+                raise ValueError(f"wiersz {first_line + i}: brak parametru '{name}'")
+            value = default
+        try:
+            values.append(float(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"wiersz {first_line + i}: niepoprawna wartość {name}={value!r}") from None
+    return np.array(values)
+
+
+def parse_rows(rows, defaults, model, first_line=1):
+    # Parametry (z uzupełnionymi domyślnymi) i modele dla porcji wierszy; ValueError przy błędzie
+    models = np.array([row.get('model') or model for row in rows])
+    unknown = set(models) - set(MODELS)
+    if unknown:
+        raise ValueError(f"nieznany model: {', '.join(sorted(unknown))}")
+    params = [_column(rows, name, defaults, models, first_line) for name in AXES]
+    return params, models
+
+
+def evaluate_params(params, models):
+    # Wyniki (len(OUTPUTS), n) – jedno wsadowe wywołanie na model
+    results = np.empty((len(OUTPUTS), len(models)))
+    for name in MODELS:
+        mask = models == name
+        if mask.any():
+            results[:, mask] = np.stack([np.asarray(r, dtype=float)
+                                         for r in evaluate(name, *(p[mask] for p in params))])
+    return results
+
+
+def evaluate_rows(rows, defaults, model, first_line=1):
+    # Parametry, modele i wyniki dla porcji wierszy
+    params, models = parse_rows(rows, defaults, model, first_line)
+    return params, models, evaluate_params(params, models)
+
+
+def write_rows(stream, fmt, rows, params, models, results, writer=None):
+    # Wiersz wyniku: pola wejścia, użyte parametry i model oraz wyniki.
+    # Zwraca obiekt piszący CSV, aby nagłówek trafił do pliku tylko raz.
+    for i, row in enumerate(rows):
+        out = dict(row)
+        out.update({name: float(p[i]) for name, p in zip(AXES, params)})
+        out['model'] = str(models[i])
+        out.update({name: float(r[i]) for name, r in zip(OUTPUTS, results)})
+        if fmt == 'jsonl':
+            stream.write(json.dumps(out, ensure_ascii=False) + '\n')
+        else:
+            if writer is None:
+                writer = csv.DictWriter(stream, fieldnames=list(out), extrasaction='ignore')
+                writer.writeheader()
+            writer.writerow(out)
+    return writer
+
+
+def write_columns(writer, params, models, results):
+    # Porcja wyników jako kolumny – dla zapisu do NPZ / Parquet
+    columns = dict(zip(AXES, params))
+    columns['model'] = models
+    columns.update(zip(OUTPUTS, results))
+    writer.write(columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Wsadowe obliczenia rzutu ukośnego z pliku CSV/JSONL")
+    parser.add_argument('input', help="plik wejściowy (.csv / .jsonl) albo - dla stdin")
+    parser.add_argument('-o', '--out', default='-', help="plik wynikowy (domyślnie stdout)")
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help="format wejścia (domyślnie z rozszerzenia)")
+    parser.add_argument('--out-format', choices=('csv', 'jsonl', 'npz', 'parquet'),
+                        help="format wyniku (domyślnie z rozszerzenia pliku albo jak wejście)")
+    parser.add_argument('--model', choices=MODELS, default='kwadratowy', help="model oporu powietrza")
+    parser.add_argument('--drag', type=float, default=DEFAULTS['drag'],
+                        help="domyślny współczynnik oporu kwadratowego b [kg/m]")
+    parser.add_argument('--k1', type=float, default=DEFAULTS['k1'],
+                        help="domyślny współczynnik oporu liniowego k1 [kg/s] (drag wierszy modelu liniowego)")
+    parser.add_argument('--mass', type=float, default=DEFAULTS['mass'], help="domyślna masa [kg]")
+    parser.add_argument('--g', type=float, default=DEFAULTS['g'], help="domyślna grawitacja [m/s²]")
+    parser.add_argument('--chunk', type=int, default=CHUNK_SIZE, help="liczba wierszy liczonych naraz")
+    args = parser.parse_args(argv)
+
+    in_format = _format(args.input, args.format)
+    out_format = args.out_format or (_format(args.out, None) if args.out != '-' else in_format)
+    defaults = {'drag': args.drag, 'k1': args.k1, 'mass': args.mass, 'g': args.g}
+    columnar = out_format in ('npz', 'parquet')
+    if columnar and args.out == '-':
+        parser.error(f"format {out_format} wymaga pliku wynikowego (-o)")
+
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    if columnar:
+        target = WRITERS[out_format](args.out)
+    else:
+        target = sys.stdout if args.out == '-' else open(args.out, 'w', newline='', encoding='utf-8')
+    try:
+        rows = read_rows(source, in_format)
+        writer = None
+        line = first_data_line(in_format)
+        while True:
+            try:
+                chunk = list(itertools.islice(rows, args.chunk))
+                if not chunk:
+                    break
+                params, models, results = evaluate_rows(chunk, defaults, args.model, first_line=line)
+            except ValueError as error:
+                parser.exit(1, f"Błąd: {error}\n")
+            if columnar:
+                write_columns(target, params, models, results)
+            else:
+                writer = write_rows(target, out_format, chunk, params, models, results, writer)
+            line += len(chunk)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,38 @@
+import argparse
 import math
+import time
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Button, Slider, TextBox
 from matplotlib.animation import FuncAnimation
+from matplotlib.collections import LineCollection
+from matplotlib.transforms import Bbox
+from model_liniowy import HORIZON_TAU, landing_time, position, trajectory
+from upraszczanie import prefix, simplify_indices
+from diagnostyka import recorder
+from odtwarzanie import Playback
+from salwa import Salvo, spread
+
+# Współczynnik wygładzania odczytu czasu klatki (średnia wykładnicza)
+FRAME_TIME_SMOOTHING = 0.1
+# Odczyt czasu klatki trafia do tytułu okna najwyżej co tyle sekund – rysowanie tekstu w osiach
+# w każdej klatce kosztowałoby więcej niż sama trajektoria
+FRAME_READOUT_INTERVAL = 0.25
+# Odstęp klatek animacji [ms] i górna granica liczby próbek toru
+ANIMATION_INTERVAL = 10
+MAX_SAMPLES = 200000
+# Klawisz przełączający nakładkę diagnostyczną i obszar okna, który zajmuje (ułamki figury,
+# pod panelem sterowania – poza osiami, więc blitting trajektorii jej nie zamazuje)
+OVERLAY_KEY = 'd'
+OVERLAY_AREA = (0.1, 0.03, 0.6, 0.15)
+# Salwa: liczba pocisków i rozrzut wokół bieżących parametrów (kąt ± [°], prędkość ± ułamek v0)
+SALVO_SIZE = 200
+SALVO_ANGLE_SPREAD = 15.0
+SALVO_V0_SPREAD = 0.2
 
 class ProjectileSimulation:
-    def __init__(self):
+    def __init__(self, blit=True, overlay=False, diagnostics_path=None, salvo_size=SALVO_SIZE,
+                 salvo_angle_spread=SALVO_ANGLE_SPREAD, salvo_v0_spread=SALVO_V0_SPREAD):
         # Parametry symulacji – wartości domyślne
         self.default_params = {
             'k1': 1.0,       # opór powietrza [kg/s]
@@ -12,7 +40,7 @@ class ProjectileSimulation:
             'g': 9.81,       # grawitacja [m/s²]
             'angle': 45.0,   # kąt [°]
             'v0': 500.0,     # prędkość [m/s]
-            'dt': 0.005,     # krok czasowy [s]
+            'dt': 0.005,     # krok próbkowania toru [s]
             'speed_factor': 1.0  # mnożnik przyspieszenia symulacji
         }
         self.k1 = self.default_params['k1']
@@ -24,12 +52,45 @@ class ProjectileSimulation:
         self.speed_factor = self.default_params['speed_factor']
         self.t = 0
 
-        # Listy przechowujące punkty trajektorii
-        self.x_points = []
-        self.y_points = []
+        # Próbki trajektorii policzone raz przy starcie (co dt, aż do chwili lądowania); animacja
+        # pokazuje ich część wyznaczaną przez zegar ścienny × speed_factor (moduł odtwarzanie)
+        self.t_points = np.zeros(1)
+        self.x_points = np.zeros(1)
+        self.y_points = np.zeros(1)
+        self.keep = np.zeros(1, dtype=np.intp)
+        self.shown = 0
+        self.head = (0.0, 0.0)
+        self.playback = None
+
+        # Tryb salwy: wszystkie pociski w jednej tablicy (moduł salwa), rysowane jedną kolekcją
+        # linii i jedną serią punktów zamiast osobnej linii na pocisk
+        self.salvo = None
+        self.salvo_size = salvo_size
+        self.salvo_angle_spread = salvo_angle_spread
+        self.salvo_v0_spread = salvo_v0_spread
+        self.salvo_lines = None
+        self.salvo_heads = None
+        self.salvo_shared = False
 
         self.simulation_running = False
 
+        # Tryb z blittingiem: linia trajektorii tworzona raz i aktualizowana przez set_data
+        self.blit = blit
+        self.trajectory_line = None
+        self.frame_time = None
+        self.last_frame = None
+        self.last_readout = 0.0
+        self.frame_count = 0
+
+        # Nakładka diagnostyczna (klawisz OVERLAY_KEY): czas klatki, czas rysowania, liczba punktów.
+        # Tekst jest rysowany tylko przy zmianie odczytu, na zapamiętanym tle swojego obszaru –
+        # rysowanie tekstu w każdej klatce kosztowałoby kilka razy więcej niż sama trajektoria
+        self.show_overlay = overlay
+        self.overlay_background = None
+        self.draw_time = None
+        self.drawn_points = 0
+        self.diagnostics_path = diagnostics_path
+
         # Konfiguracja wykresu
         self.fig, self.ax = plt.subplots()
         plt.subplots_adjust(left=0.1, bottom=0.55)
@@ -39,15 +100,25 @@ class ProjectileSimulation:
         self.ax.set_ylabel("Pozycja Y [m]")
         self.ax.plot(0, 0, 'ro', label="Punkt startowy")
         self.ax.legend()
-
-        # Przyciski Start, Stop i Reset
+        left, bottom, width, height = OVERLAY_AREA
+        self.overlay = self.fig.text(left, bottom + height, '', va='top', ha='left', family='monospace',
+                                     fontsize=8, animated=True, visible=overlay)
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
+        self.fig.canvas.mpl_connect('key_press_event', self.on_key)
+        if diagnostics_path:
+            self.fig.canvas.mpl_connect('close_event', self.save_diagnostics)
+
+        # Przyciski Start, Stop, Salwa i Reset
         self.start_ax = plt.axes([0.75, 0.05, 0.1, 0.075])
         self.stop_ax = plt.axes([0.87, 0.05, 0.1, 0.075])
-        self.reset_ax = plt.axes([0.75, 0.15, 0.22, 0.075])
+        self.salvo_ax = plt.axes([0.75, 0.15, 0.1, 0.075])
+        self.reset_ax = plt.axes([0.87, 0.15, 0.1, 0.075])
         self.start_button = Button(self.start_ax, 'Start')
         self.stop_button = Button(self.stop_ax, 'Stop')
-        self.reset_button = Button(self.reset_ax, 'Reset Parametrów')
+        self.salvo_button = Button(self.salvo_ax, f'Salwa ×{salvo_size}')
+        self.reset_button = Button(self.reset_ax, 'Reset')
         self.start_button.on_clicked(self.start_simulation)
+        self.salvo_button.on_clicked(self.start_salvo)
         self.stop_button.on_clicked(self.stop_simulation)
         self.reset_button.on_clicked(self.reset_parameters)
 
@@ -108,36 +179,171 @@ class ProjectileSimulation:
         self.anim = None
 
     def wspx(self, t):
-        angle_rad = math.radians(self.angle)
-        return ((self.v0 * self.m / self.k1) * math.cos(angle_rad)) * (1 - math.exp(-self.k1 * t / self.m))
+        return float(position(t, self.angle, self.v0, self.k1, self.m, self.g)[0])
 
     def wspy(self, t):
-        angle_rad = math.radians(self.angle)
-        return (((self.v0 * self.m / self.k1) * math.sin(angle_rad)) + (self.m * self.g / self.k1)) * (1 - math.exp(-self.k1 * t / self.m)) - (self.m * self.g * t / self.k1)
+        return float(position(t, self.angle, self.v0, self.k1, self.m, self.g)[1])
 
-    def start_simulation(self, event):
-        # Uruchomienie symulacji z aktualnymi parametrami
+    def start_simulation(self, event, salvo=False):
+        # Uruchomienie symulacji z aktualnymi parametrami (salvo=True: salwa pocisków z rozrzutem)
         self.simulation_running = True
         self.t = 0
-        self.x_points.clear()
-        self.y_points.clear()
+        if salvo:
+            angles, v0s = spread(self.angle, self.v0, self.salvo_size, self.salvo_angle_spread, self.salvo_v0_spread)
+            self.salvo = Salvo(angles, v0s, self.k1, self.m, self.g)
+            self.t_points = np.array([0.0, self.salvo.duration])
+        else:
+            self.salvo = None
+            self.t_points, self.x_points, self.y_points = self.sample_trajectory()
+        self.shown = 0
+        self.head = (0.0, 0.0)
         self.ax.clear()
         self.ax.grid(True)
         self.ax.plot(0, 0, 'ro', label="Punkt startowy")
         self.ax.set_title("Symulacja rzutu ukośnego z oporem powietrza")
         self.ax.set_xlabel("Pozycja X [m]")
         self.ax.set_ylabel("Pozycja Y [m]")
-        self.ax.legend()
+        self.frame_time = None
+        self.last_frame = None
+        self.frame_count = 0
+        self.draw_time = None
 
         if self.anim:
             self.anim.event_source.stop()
-        self.anim = FuncAnimation(self.fig, self.update_frame, interval=10, cache_frame_data=False)
+        self.playback = Playback(self.t_points, self.speed_factor)
+        bbox = self.ax.bbox
+        if self.salvo is not None:
+            self.start_salvo_artists()
+            self.anim = FuncAnimation(self.fig, self.update_frame, interval=ANIMATION_INTERVAL, blit=self.blit,
+                                      cache_frame_data=False)
+        elif self.blit:
+            self.trajectory_line, = self.ax.plot([], [], label="Trajektoria", color="blue")
+            self.ax.legend(loc='upper right')
+            self.presize_axes(self.x_points, self.y_points)
+            # Upraszczanie całego toru raz, w pikselach ustalonego widoku – w klatce tylko wycinek
+            self.keep = simplify_indices(self.x_points, self.y_points, width=bbox.width, height=bbox.height,
+                                         x_range=self.ax.get_xlim(), y_range=self.ax.get_ylim())
+            self.anim = FuncAnimation(self.fig, self.update_frame, interval=ANIMATION_INTERVAL, blit=True,
+                                      cache_frame_data=False)
+        else:
+            self.ax.legend()
+            self.keep = simplify_indices(self.x_points, self.y_points, width=bbox.width, height=bbox.height)
+            self.anim = FuncAnimation(self.fig, self.update_frame, interval=ANIMATION_INTERVAL, cache_frame_data=False)
         plt.draw()
 
+    def start_salvo(self, event):
+        self.start_simulation(event, salvo=True)
+
+    def start_salvo_artists(self):
+        # Jedna kolekcja linii (kolor wg kąta) i jedna seria punktów (położenia) dla całej salwy
+        self.salvo.advance(0.0)
+        self.salvo_lines = LineCollection(self.salvo.lines, array=self.salvo.angle, cmap='viridis',
+                                          linewidths=0.8, label=f"Salwa ({len(self.salvo)} pocisków)")
+        self.ax.add_collection(self.salvo_lines)
+        # Ścieżki kolekcji są widokami na tablicę salwy, więc advance() aktualizuje je w miejscu
+        # i w klatce nie trzeba budować od nowa obiektów Path dla wszystkich pocisków
+        self.salvo_shared = np.shares_memory(self.salvo_lines.get_paths()[0].vertices, self.salvo.lines)
+        self.salvo_heads, = self.ax.plot(self.salvo.heads[:, 0], self.salvo.heads[:, 1], 'o', ms=2,
+                                         color='red', zorder=3)
+        self.ax.legend(loc='upper right')
+        self.presize_axes(self.salvo.samples[..., 0], self.salvo.samples[..., 1])
+
+    def sample_trajectory(self):
+        # Próbki co (najwyżej) dt od startu do dokładnej chwili lądowania – bez przestrzelenia ziemi
+        t_land = float(landing_time(self.angle, self.v0, self.k1, self.m, self.g))
+        t_end = t_land if math.isfinite(t_land) else HORIZON_TAU * self.m / self.k1
+        n_points = min(max(math.ceil(t_end / self.dt) + 1, 2), MAX_SAMPLES)
+        return trajectory(self.angle, self.v0, self.k1, self.m, self.g, n_points)
+
+    def presize_axes(self, x, y):
+        # Zakres osi z całego toru (albo torów salwy) – w trakcie lotu nie trzeba go już zmieniać
+        x_max = x.max() if x.max() > 0 else 1.0
+        y_max = y.max() if y.max() > 0 else 1.0
+        self.ax.set_xlim(-0.02 * x_max, 1.05 * x_max)
+        self.ax.set_ylim(-0.02 * y_max, 1.1 * y_max)
+
+    def update_frame_time(self):
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            elapsed = now - self.last_frame
+            if self.frame_time is None:
+                self.frame_time = elapsed
+            else:
+                self.frame_time += FRAME_TIME_SMOOTHING * (elapsed - self.frame_time)
+            if now - self.last_readout >= FRAME_READOUT_INTERVAL:
+                if self.fig.canvas.manager is not None:
+                    self.fig.canvas.manager.set_window_title(
+                        f"Klatka {self.frame_time * 1000:.1f} ms ({1 / self.frame_time:.0f} fps), "
+                        f"punkty: {self.shown}")
+                self.update_overlay()
+                self.last_readout = now
+        self.last_frame = now
+        self.frame_count += 1
+
+    def overlay_bbox(self):
+        left, bottom, width, height = OVERLAY_AREA
+        return Bbox.from_bounds(left, bottom, width, height).transformed(self.fig.transFigure)
+
+    def on_draw(self, event):
+        # Po każdym pełnym rysowaniu: nowe tło obszaru nakładki i sama nakładka na nim
+        self.overlay_background = self.fig.canvas.copy_from_bbox(self.overlay_bbox())
+        self.blit_overlay()
+
+    def blit_overlay(self):
+        canvas = self.fig.canvas
+        if self.overlay_background is None or not canvas.supports_blit:
+            return
+        canvas.restore_region(self.overlay_background)
+        if self.show_overlay:
+            self.fig.draw_artist(self.overlay)
+        canvas.blit(self.overlay_bbox())
+
+    def update_overlay(self):
+        lines = []
+        if self.frame_time:
+            lines.append(f"klatka   {self.frame_time * 1000:6.1f} ms ({1 / self.frame_time:.0f} fps)")
+        if self.draw_time is not None:
+            lines.append(f"rysunek  {self.draw_time * 1000:6.2f} ms")
+        if self.salvo is not None:
+            lines.append(f"pociski  {self.shown}/{len(self.salvo)} w locie, {self.drawn_points} punktów")
+        else:
+            lines.append(f"punkty   {self.shown} -> {self.drawn_points}")
+        lines.append(f"t        {self.t:.2f} s (x{self.speed_factor:g})")
+        if self.playback is not None:
+            lines.append(f"pominięte {self.playback.late_frames(ANIMATION_INTERVAL / 1000)} klatek")
+        self.overlay.set_text('\n'.join(lines))
+        if self.show_overlay:
+            self.blit_overlay()
+
+    def on_key(self, event):
+        if event.key != OVERLAY_KEY:
+            return
+        self.show_overlay = not self.show_overlay
+        self.overlay.set_visible(self.show_overlay)
+        self.blit_overlay()
+
+    def save_diagnostics(self, event):
+        with open(self.diagnostics_path, 'w', encoding='utf-8') as f:
+            f.write(recorder.to_json())
+        print(f"Zapisano diagnostykę do {self.diagnostics_path}")
+
+    def finish_blit(self):
+        # Po zakończeniu animacji linia wraca do zwykłego rysowania, aby nie znikała przy przerysowaniu
+        artists = [a for a in self.animated_artists() if a is not None]
+        if artists:
+            for artist in artists:
+                artist.set_animated(False)
+            self.update_overlay()
+            self.fig.canvas.draw_idle()
+            if self.frame_time:
+                print(f"Średni czas klatki: {self.frame_time * 1000:.1f} ms ({1 / self.frame_time:.1f} fps), "
+                      f"klatek: {self.frame_count}")
+
     def stop_simulation(self, event):
         self.simulation_running = False
         if self.anim:
             self.anim.event_source.stop()
+        self.finish_blit()
 
     def reset_parameters(self, event):
         # Przywracanie wartości domyślnych oraz aktualizacja suwaków i pól tekstowych
@@ -169,30 +375,71 @@ class ProjectileSimulation:
         if not self.simulation_running:
             if self.anim:
                 self.anim.event_source.stop()
-            return
-
-        x = self.wspx(self.t)
-        y = self.wspy(self.t)
-        if y < 0 and self.t > 0:
-            y = 0
-            self.x_points.append(x)
-            self.y_points.append(y)
-            self.redraw_plot()
+            return self.animated_artists()
+
+        # Czas symulacji z zegara – przy obciążeniu klatka przeskakuje dalej, zamiast zwalniać ruch
+        self.shown, self.t = self.playback.frame()
+        # Koniec ustalamy z czasu tej klatki – zatrzymujemy się dopiero po narysowaniu stanu końcowego
+        finished = self.playback.finished(self.t)
+        if self.salvo is not None:
+            # Jedno wektorowe wywołanie dla pocisków w locie; wylądowane pozostają zamrożone
+            self.shown = self.salvo.advance(self.t)
+        elif finished:
+            self.head = (float(self.x_points[-1]), float(self.y_points[-1]))
+        else:
+            self.head = (self.wspx(self.t), max(self.wspy(self.t), 0.0))
+        self.draw_points()
+        if finished:
             self.simulation_running = False
             if self.anim:
                 self.anim.event_source.stop()
-            return
-
-        self.x_points.append(x)
-        self.y_points.append(y)
-        self.redraw_plot()
-        self.t += self.dt * self.speed_factor
+            self.finish_blit()
+        return self.animated_artists()
+
+    def animated_artists(self):
+        if not self.blit:
+            return []
+        if self.salvo is not None:
+            return [self.salvo_lines, self.salvo_heads]
+        return [self.trajectory_line]
+
+    def visible_path(self):
+        # Uproszczony tor do bieżącej chwili: zachowane próbki przed nią i dokładne położenie w niej
+        idx = prefix(self.keep, self.shown)
+        return np.append(self.x_points[idx], self.head[0]), np.append(self.y_points[idx], self.head[1])
+
+    def draw_points(self):
+        start = time.perf_counter()
+        if self.salvo is not None:
+            # Bez przebudowy osi także bez blittingu – pełne przerysowanie robi FuncAnimation
+            if self.salvo_shared:
+                self.salvo_lines.stale = True
+            else:
+                self.salvo_lines.set_segments(self.salvo.lines)
+            self.salvo_heads.set_data(self.salvo.heads[:, 0], self.salvo.heads[:, 1])
+            self.drawn_points = self.salvo.lines.shape[0] * self.salvo.lines.shape[1]
+        elif self.blit:
+            x_plot, y_plot = self.visible_path()
+            self.trajectory_line.set_data(x_plot, y_plot)
+            self.drawn_points = len(x_plot)
+        else:
+            self.redraw_plot()
+        elapsed = time.perf_counter() - start
+        if self.draw_time is None:
+            self.draw_time = elapsed
+        else:
+            self.draw_time += FRAME_TIME_SMOOTHING * (elapsed - self.draw_time)
+        recorder.record('draw_points', elapsed, points=self.shown, drawn=self.drawn_points, blit=self.blit,
+                        salvo=len(self.salvo) if self.salvo is not None else 0)
+        self.update_frame_time()
 
     def redraw_plot(self):
         self.ax.clear()
         self.ax.grid(True)
         self.ax.plot(0, 0, 'ro', label="Punkt startowy")
-        self.ax.plot(self.x_points, self.y_points, label="Trajektoria", color="blue")
+        x_plot, y_plot = self.visible_path()
+        self.drawn_points = len(x_plot)
+        self.ax.plot(x_plot, y_plot, label="Trajektoria", color="blue")
         self.ax.legend()
         self.ax.set_title("Symulacja rzutu ukośnego z oporem powietrza")
         self.ax.set_xlabel("Pozycja X [m]")
@@ -239,6 +486,8 @@ class ProjectileSimulation:
     # Speed factor można zmieniać w trakcie symulacji
     def update_speed_slider(self, val):
         self.speed_factor = self.slider_speed.val
+        if self.playback is not None:
+            self.playback.set_speed(self.speed_factor)
         print(f"Zaktualizowano przyspieszenie symulacji: {self.speed_factor}")
 
     # Callbacki dla pól tekstowych
@@ -310,5 +559,21 @@ class ProjectileSimulation:
             print("Nieprawidłowa wartość przyspieszenia!")
 
 if __name__ == '__main__':
-    sim = ProjectileSimulation()
+    parser = argparse.ArgumentParser(description="Symulacja rzutu ukośnego z oporem powietrza")
+    parser.add_argument('--bez-blit', action='store_true',
+                        help="przerysowuj cały wykres w każdej klatce (dawny tryb)")
+    parser.add_argument('--diagnostyka', action='store_true',
+                        help=f"pokaż nakładkę diagnostyczną od startu (przełączana klawiszem '{OVERLAY_KEY}')")
+    parser.add_argument('--diagnostyka-json', metavar='PLIK',
+                        help="po zamknięciu okna zapisz pomiary do pliku JSON")
+    parser.add_argument('--salwa', type=int, default=SALVO_SIZE, metavar='N',
+                        help=f"liczba pocisków w salwie (przycisk Salwa, domyślnie {SALVO_SIZE})")
+    parser.add_argument('--salwa-kat', type=float, default=SALVO_ANGLE_SPREAD, metavar='STOPNIE',
+                        help=f"rozrzut kąta salwy ± [°] (domyślnie {SALVO_ANGLE_SPREAD:g})")
+    parser.add_argument('--salwa-v0', type=float, default=SALVO_V0_SPREAD, metavar='UŁAMEK',
+                        help=f"rozrzut prędkości salwy ± ułamek v0 (domyślnie {SALVO_V0_SPREAD:g})")
+    args = parser.parse_args()
+    sim = ProjectileSimulation(blit=not args.bez_blit, overlay=args.diagnostyka,
+                               diagnostics_path=args.diagnostyka_json, salvo_size=args.salwa,
+                               salvo_angle_spread=args.salwa_kat, salvo_v0_spread=args.salwa_v0)
     plt.show()
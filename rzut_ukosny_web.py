@@ -1,26 +1,15 @@
-import math
+import numpy as np
 import streamlit as st
 import plotly.graph_objects as go
-import time  # Dodajemy opóźnienie dla efektu animacji
+from model_liniowy import flight_summary, position, trajectory as linear_trajectory
+from odtwarzanie import Playback
+from pamiec_trajektorii import TrajectoryCache
+from upraszczanie import prefix, simplify_indices
 
-def calculate_trajectory(angle, v0, k1, m, g, dt, speed_factor):
-    t = 0
-    x_points = []
-    y_points = []
-    
-    while True:
-        angle_rad = math.radians(angle)
-        x = ((v0 * m / k1) * math.cos(angle_rad)) * (1 - math.exp(-k1 * t / m))
-        y = (((v0 * m / k1) * math.sin(angle_rad)) + (m * g / k1)) * (1 - math.exp(-k1 * t / m)) - (m * g * t / k1)
-        
-        if y < 0:
-            break
-            
-        x_points.append(x)
-        y_points.append(y)
-        t += dt * speed_factor
-    
-    return x_points, y_points
+# Odstęp klatek animacji na serwerze [s] i najkrótsza klatka animacji w przeglądarce [ms];
+# w obu trybach animacja trwa dokładnie czas lotu / przyspieszenie
+SERVER_FRAME_INTERVAL = 0.05
+MIN_FRAME_MS = 20
 
 # Konfiguracja strony
 st.set_page_config(page_title="Symulacja rzutu ukośnego", layout="wide")
@@ -35,36 +24,121 @@ with st.sidebar:
     m = st.slider("Masa [kg]", 1.0, 100.0, 10.0)
     g = st.slider("Grawitacja [m/s²]", 0.0, 20.0, 9.81)
     speed_factor = st.slider("Przyspieszenie symulacji", 1.0, 100.0, 1.0)
+    n_points = st.slider("Liczba punktów trajektorii", 50, 2000, 300, step=50)
+    animation_mode = st.radio("Animacja", ["W przeglądarce", "Na serwerze (krokowo)"],
+                              help="W przeglądarce trajektoria jest wysyłana raz, a klatki odtwarza Plotly")
+    n_frames = st.slider("Liczba klatek animacji", 10, 200, 60)
     simulate_button = st.button("Uruchom symulację")
 
+# Trwała pamięć trajektorii na dysku – wspólna z rzut_ukosny_web3.py
+@st.cache_resource(show_spinner=False)
+def get_trajectory_cache():
+    return TrajectoryCache()
+
+def build_animated_figure(x_full, y_full, n_frames, duration):
+    # Cała animacja w jednej figurze: n_frames klatek Plotly z przyciskami Start/Pauza.
+    # Każda klatka to uproszczona (z dokładnością do piksela) część toru aż do bieżącego położenia,
+    # więc rozmiar danych zależy od liczby klatek, a nie od liczby punktów trajektorii.
+    # Próbki są równomierne w czasie, więc klatki po duration / (n - 1) odtwarzają lot w duration [s];
+    # przy krótkiej animacji klatek jest mniej, aby żadna nie była krótsza niż MIN_FRAME_MS.
+    x_full = np.asarray(x_full)
+    y_full = np.asarray(y_full)
+    keep = simplify_indices(x_full, y_full)
+    n_frames = max(2, min(n_frames, int(duration * 1000 / MIN_FRAME_MS) + 1))
+    ends = np.unique(np.linspace(1, len(x_full), n_frames).round().astype(int))
+    frame_duration = 1000 * duration / max(len(ends) - 1, 1)
+    x = x_full[ends - 1]
+    y = y_full[ends - 1]
+    line = dict(color='blue', width=2)
+    marker = dict(size=5, color='red')
+
+    frames = []
+    for i, end in enumerate(ends):
+        idx = prefix(keep, end)
+        frames.append(go.Frame(data=[go.Scatter(x=x_full[idx], y=y_full[idx])], name=str(i)))
+    play = dict(frame=dict(duration=frame_duration, redraw=False), transition=dict(duration=0),
+                fromcurrent=True, mode='immediate')
+    pause = dict(frame=dict(duration=0, redraw=False), transition=dict(duration=0), mode='immediate')
+
+    fig = go.Figure(
+        data=[go.Scatter(x=x[:1], y=y[:1], mode='lines+markers', line=line, marker=marker)],
+        frames=frames,
+    )
+    fig.update_layout(
+        title="Animacja trajektorii",
+        xaxis_title="Pozycja X [m]",
+        yaxis_title="Pozycja Y [m]",
+        showlegend=False,
+        # Stały zakres osi – bez niego Plotly przeskalowywałby wykres w każdej klatce
+        xaxis=dict(range=[min(0.0, x.min()), 1.05 * x.max() or 1.0]),
+        yaxis=dict(range=[min(0.0, y.min()), 1.1 * y.max() or 1.0]),
+        updatemenus=[dict(
+            type='buttons', direction='left', x=0, y=-0.15, xanchor='left', yanchor='top',
+            buttons=[
+                dict(label="▶ Start", method='animate', args=[None, play]),
+                dict(label="⏸ Pauza", method='animate', args=[[None], pause]),
+            ],
+        )],
+        sliders=[dict(
+            x=0.2, len=0.8, y=-0.15, yanchor='top', currentvalue=dict(prefix="Klatka: "),
+            steps=[dict(method='animate', label=str(i), args=[[str(i)], pause]) for i in range(len(x))],
+        )],
+    )
+    return fig
+
 # Główny obszar
 if simulate_button:
-    # Oblicz pełną trajektorię
-    x_full, y_full = calculate_trajectory(angle, v0, k1, m, g, 0.005, speed_factor)
+    # Oblicz pełną trajektorię (postać zamknięta, dokładny punkt lądowania)
+    cache = get_trajectory_cache()
+    params = cache.quantize(angle, v0, k1, m, g)
+    if params != (float(angle), float(v0), float(k1), float(m), float(g)):
+        st.caption("Obliczenia dla wartości zaokrąglonych przez pamięć trajektorii: "
+                   + ", ".join(f"{name} = {value:g}" for name, value in zip(("kąt", "v0", "k1", "m", "g"), params)))
+    t_full, x_full, y_full = cache.get_or_compute(f"liniowy-t{n_points}", params,
+                                                  lambda *p: np.stack(linear_trajectory(*p, n_points)))
+    t_flight, range_val, t_apex, max_height, impact_speed, impact_angle = flight_summary(*params)
+
+    # Odczyty z postaci zamkniętej – nie zależą od liczby punktów trajektorii
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Czas lotu", f"{t_flight:.2f} s")
+    col2.metric("Zasięg", f"{range_val:.2f} m")
+    col3.metric("Wysokość maksymalna", f"{max_height:.2f} m", f"po {t_apex:.2f} s", delta_color="off")
+    col4.metric("Prędkość końcowa", f"{impact_speed:.2f} m/s")
+    col5.metric("Kąt uderzenia", f"{impact_angle:.1f}°")
     
-    # Inicjalizacja wykresu
-    fig = go.Figure()
-    plot = st.empty()  # Kontener na dynamiczny wykres
+    if animation_mode == "W przeglądarce":
+        # Jedno wysłanie figury z klatkami – animację odtwarza przeglądarka
+        duration = (t_full[-1] - t_full[0]) / speed_factor
+        st.plotly_chart(build_animated_figure(x_full, y_full, n_frames, duration), use_container_width=True)
+    else:
+        # Inicjalizacja wykresu
+        fig = go.Figure()
+        plot = st.empty()  # Kontener na dynamiczny wykres
     
-    # Animacja krokowa
-    for i in range(1, len(x_full)+1):
-        x = x_full[:i]
-        y = y_full[:i]
+        # Animacja krokowa w czasie rzeczywistym – klatka pokazuje tor do chwili zegar × przyspieszenie
+        # (koniec liczony dokładnie ze wzoru), a spóźnione klatki są pomijane
+        keep = simplify_indices(x_full, y_full)
+        playback = Playback(t_full, speed_factor)
+        for count, t_sim in playback.run(SERVER_FRAME_INTERVAL):
+            idx = prefix(keep, count)
+            head_x, head_y = position(t_sim, *params)
+            x = np.append(x_full[idx], head_x)
+            y = np.append(y_full[idx], max(float(head_y), 0.0))
         
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=x, 
-            y=y, 
-            mode='lines+markers',
-            line=dict(color='blue', width=2),
-            marker=dict(size=5, color='red')
-        ))
-        fig.update_layout(
-            title="Animacja trajektorii",
-            xaxis_title="Pozycja X [m]",
-            yaxis_title="Pozycja Y [m]",
-            showlegend=False
-        )
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x=x, 
+                y=y, 
+                mode='lines+markers',
+                line=dict(color='blue', width=2),
+                marker=dict(size=5, color='red')
+            ))
+            fig.update_layout(
+                title="Animacja trajektorii",
+                xaxis_title="Pozycja X [m]",
+                yaxis_title="Pozycja Y [m]",
+                showlegend=False
+            )
         
-        plot.plotly_chart(fig, use_container_width=True)
-        time.sleep(0.05)  # Opóźnienie dla efektu animacji
\ No newline at end of file
+            plot.plotly_chart(fig, use_container_width=True)
+        st.caption(f"Klatki: {playback.frames}, pominięte: {playback.dropped}")
\ No newline at end of file
@@ -1,10 +1,24 @@
 import math
+import os
+import tempfile
 import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import streamlit as st
 import plotly.graph_objects as go
-from scipy.integrate import solve_ivp
+from model_kwadratowy import compute_trajectory
+from zadania import JobRunner
+from celowanie import solve_angle_quadratic
+from tablica_strzelnicza import DEFAULT_PATH as FIRING_TABLE_PATH, FiringTable
+from pamiec_trajektorii import TrajectoryCache
+from upraszczanie import simplify
+from historia import PARAMS, TrajectoryHistory
+from rozrzut import simulate as simulate_dispersion
+from przeglad import optimal_angle, sweep
+from eksport import FORMATS as EXPORT_FORMATS, load_into_history, read_table, summary_chunks, \
+    trajectory_chunks, write_table
+from diagnostyka import recorder
 
 # Konfiguracja strony
 st.set_page_config(page_title="Rzut ukośny", layout="wide", page_icon="🎯")
@@ -25,6 +39,35 @@ with col4:
 # Suwak do grawitacji (umożliwia eksperymenty np. z Marsjaną)
 g = st.slider("Grawitacja (m/s²)", min_value=0.0, max_value=24.79, value=9.81, step=0.1)
 
+# Model rozszerzony – wiatr, gęstość powietrza malejąca z wysokością, wysokość startu i celu
+col5, col6, col7, col8 = st.columns(4)
+with col5:
+    wind = st.slider("Wiatr (m/s)", min_value=-30.0, max_value=30.0, value=0.0, step=0.5,
+                     help="Dodatni wieje w kierunku strzału (w plecy), ujemny – pod wiatr")
+with col6:
+    scale_height = st.slider("Wysokość skali atmosfery (m)", min_value=0.0, max_value=20000.0, value=0.0, step=500.0,
+                             help="Gęstość ρ(y) = ρ0·exp(-y / H); 0 – stała gęstość, dla Ziemi H ≈ 8500 m")
+with col7:
+    y_launch = st.slider("Wysokość startu (m)", min_value=0.0, max_value=2000.0, value=0.0, step=10.0)
+with col8:
+    y_target = st.slider("Wysokość celu (m)", min_value=-500.0, max_value=2000.0, value=0.0, step=10.0,
+                         help="Lot kończy się przy opadaniu na tę wysokość (0 – ziemia)")
+extended = (wind, scale_height, y_launch, y_target)
+# Te same parametry dla narzędzi w rozwijanych sekcjach (argumenty jak w integrate_batch)
+physics = dict(zip(('wind', 'scale_height', 'y_launch', 'y_target'), extended))
+
+# Podgląd z tablicy strzelniczej (jeśli zbudowano ją poleceniem `python tablica_strzelnicza.py`)
+@st.cache_resource(show_spinner=False)
+def load_firing_table(path):
+    return FiringTable.load(path) if os.path.exists(path) else None
+
+firing_table = load_firing_table(FIRING_TABLE_PATH)
+# Tablica opisuje tylko model podstawowy (bez wiatru, stała gęstość, start i cel na ziemi)
+if firing_table is not None and not any(extended):
+    t_pred, range_pred, height_pred, range_err = firing_table.query(v0, angle, g, drag, mass, rtol=1e-2)
+    st.caption(f"Prognoza z tablicy strzelniczej: zasięg ≈ {range_pred:.1f} m (±{range_err:.1f} m), "
+               f"wysokość ≈ {height_pred:.1f} m, czas lotu ≈ {t_pred:.2f} s")
+
 # Przyciski – "Ognia!" i "Wyczyść"
 colA, colB = st.columns(2)
 with colA:
@@ -32,62 +75,61 @@ with colA:
 with colB:
     clear = st.button("🔄 Wyczyść")
 
-# Utrzymanie historii trajektorii
-if 'trajectories' not in st.session_state:
-    st.session_state['trajectories'] = []
+# Utrzymanie historii trajektorii – ograniczona liczba strzałów, punkty tylko dla ostatnich
+if 'history' not in st.session_state:
+    st.session_state['history'] = TrajectoryHistory()
+history = st.session_state['history']
 
 if clear:
-    st.session_state['trajectories'] = []
-
-# Funkcja obliczeniowa – teraz z masą i grawitacją
-def projectile_ode(t, state, g, drag, mass):
-    x, y, vx, vy = state
-    v = math.sqrt(vx**2 + vy**2)
-    ax = - (drag / mass) * v * vx
-    ay = - g - (drag / mass) * v * vy
-    return [vx, vy, ax, ay]
-
-def hit_ground(t, state, g, drag, mass):
-    return state[1]
-hit_ground.terminal = True
-hit_ground.direction = -1
-
-@st.cache_data(show_spinner=False)
-def compute_trajectory(v0, angle, g, drag, mass):
-    angle_rad = math.radians(angle)
-    # Ustawiamy początkową wysokość na niewielką wartość, aby uniknąć natychmiastowego zakończenia
-    initial_state = [0.0, 1e-6, v0 * math.cos(angle_rad), v0 * math.sin(angle_rad)]
-    sol = solve_ivp(
-        fun=lambda t, y: projectile_ode(t, y, g, drag, mass),
-        t_span=(0, 1000),
-        y0=initial_state,
-        events=lambda t, y: hit_ground(t, y, g, drag, mass),
-        dense_output=True,
-        rtol=1e-7,
-        atol=1e-9
-    )
-    if sol.t_events[0].size > 0:
-        t_hit = sol.t_events[0][0]
-    else:
-        t_hit = sol.t[-1]
-    t_vals = np.linspace(0, t_hit, 300)
-    sol_vals = sol.sol(t_vals)
-    x = sol_vals[0]
-    y = sol_vals[1]
-    vx = sol_vals[2]
-    vy = sol_vals[3]
-    max_height = np.max(y)
-    range_val = x[-1]
+    history.clear()
+
+# Obliczenia – model z modułu model_kwadratowy, tutaj tylko z pamięcią podręczną Streamlit
+cached_compute_trajectory = st.cache_data(show_spinner=False)(compute_trajectory)
+
+# Trwała pamięć trajektorii na dysku – wspólna dla wszystkich sesji i restartów serwera
+@st.cache_resource(show_spinner=False)
+def get_trajectory_cache():
+    return TrajectoryCache()
+
+def cached_trajectory(v0, angle, g, drag, mass, wind=0.0, scale_height=0.0, y_launch=0.0, y_target=0.0):
+    # Parametry są zaokrąglane do rozdzielczości pamięci, więc prawie identyczne strzały nie wymagają całkowania
+    cache = get_trajectory_cache()
+    params = cache.quantize(v0, angle, g, drag, mass, wind, scale_height, y_launch, y_target)
+    data = cache.get_or_compute('kwadratowy', params, lambda *p: np.stack(cached_compute_trajectory(*p)[:5]))
+    t_vals, x, y, vx, vy = data
     final_speed = math.sqrt(vx[-1]**2 + vy[-1]**2)
-    return t_vals, x, y, vx, vy, max_height, range_val, final_speed
+    return params, (t_vals, x, y, vx, vy, np.max(y), x[-1], final_speed)
+
+def trajectory_series(*params):
+    # Odtworzenie punktów strzału, który wypadł z bufora historii (parametry jak historia.PARAMS)
+    return np.stack(cached_trajectory(*params)[1][:5])
+
+def trajectory_job(params, progress, cancel):
+    # Zadanie w tle: całkowanie z raportem postępu i możliwością przerwania, wynik trafia do pamięci na dysku
+    data = np.stack(compute_trajectory(*params, progress=progress, cancel=cancel)[:5])
+    get_trajectory_cache().put('kwadratowy', params, data)
+    return data
+
+# Obliczenia w tle – jedna pula wątków wspólna dla wszystkich sesji (sesja ma tylko własny rejestr
+# zadań do łączenia i przerywania); strona nie blokuje się podczas długiego całkowania
+JOB_WORKERS = int(os.environ.get('SYMULACJE_JOB_WORKERS', 4))
+
+@st.cache_resource(show_spinner=False)
+def get_job_executor():
+    return ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='symulacje')
+
+if 'jobs' not in st.session_state:
+    st.session_state['jobs'] = JobRunner(executor=get_job_executor())
+jobs = st.session_state['jobs']
 
 import plotly.graph_objects as go
 
 # Funkcja do generowania wykresu prędkości
 def plot_velocity(t_vals, vx, vy):
     v = np.sqrt(vx**2 + vy**2)
+    t_plot, v_plot = simplify(t_vals, v)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=t_vals, y=v, mode="lines", name="Prędkość"))
+    fig.add_trace(go.Scatter(x=t_plot, y=v_plot, mode="lines", name="Prędkość"))
     fig.update_layout(
         title="Prędkość w funkcji czasu",
         xaxis_title="Czas [s]",
@@ -101,8 +143,9 @@ def plot_acceleration(t_vals, vx, vy):
     ax = np.gradient(vx, t_vals)
     ay = np.gradient(vy, t_vals)
     a = np.sqrt(ax**2 + ay**2)
+    t_plot, a_plot = simplify(t_vals, a)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=t_vals, y=a, mode="lines", name="Przyspieszenie"))
+    fig.add_trace(go.Scatter(x=t_plot, y=a_plot, mode="lines", name="Przyspieszenie"))
     fig.update_layout(
         title="Przyspieszenie w funkcji czasu",
         xaxis_title="Czas [s]",
@@ -111,59 +154,337 @@ def plot_acceleration(t_vals, vx, vy):
     )
     return fig
 
+# Wyświetlenie wykresu z pomiarem czasu st.plotly_chart (w tym serializacji figury). Rozmiar danych
+# mierzony jest tylko na życzenie (panel diagnostyki), bo wymaga osobnej serializacji do JSON.
+def show_chart(fig, name):
+    fields = {}
+    if st.session_state.get('diagnostics_payload'):
+        fields['payload_bytes'] = len(fig.to_json())
+    with recorder.timer(f"plotly_chart[{name}]", **fields):
+        st.plotly_chart(fig, use_container_width=True)
 
-# Obliczanie trajektorii po kliknięciu "Ognia!"
+
+# Obliczanie trajektorii po kliknięciu "Ognia!" – z pamięci od razu, w przeciwnym razie w tle
+current_params = get_trajectory_cache().quantize(v0, angle, g, drag, mass, *extended)
+if current_params != tuple(float(p) for p in (v0, angle, g, drag, mass, *extended)):
+    # Rozdzielczość pamięci (SYMULACJE_CACHE_DIGITS) grubsza niż kroki suwaków – liczymy z zaokrąglonych
+    st.caption("Obliczenia dla wartości zaokrąglonych przez pamięć trajektorii: "
+               + ", ".join(f"{name} = {value:g}" for name, value in zip(PARAMS, current_params)))
 if fire:
-    t_vals, x, y, vx, vy, max_height, range_val, final_speed = compute_trajectory(v0, angle, g, drag, mass)
-    traj = {
-        'timestamp': datetime.now().strftime("%H:%M:%S"),
-        'v0': v0,
-        'angle': angle,
-        'drag': drag,
-        'mass': mass,
-        'g': g,
-        't': t_vals,
-        'x': x,
-        'y': y,
-        'vx': vx,
-        'vy': vy,
-        'max_height': max_height,
-        'range': range_val,
-        'final_speed': final_speed
-    }
-    st.session_state['trajectories'].append(traj)
-
-# Rysowanie wykresu wszystkich trajektorii
-fig = go.Figure()
-colors = ["red", "blue", "green", "orange", "purple", "brown"]
-for i, traj in enumerate(st.session_state['trajectories']):
-    color = colors[i % len(colors)]
-    fig.add_trace(go.Scatter(x=traj['x'], y=traj['y'],
-                             mode="lines",
-                             name=f"#{i+1}: v0={traj['v0']}, kąt={traj['angle']}°",
-                             line=dict(color=color, width=2)))
-fig.update_layout(
-    title="Trajektorie rzutu ukośnego",
-    xaxis_title="Odległość [m]",
-    yaxis_title="Wysokość [m]",
-    xaxis=dict(scaleanchor="y", scaleratio=1),
-    template="plotly_white"
-)
-st.plotly_chart(fig, use_container_width=True)
+    data = get_trajectory_cache().get('kwadratowy', current_params)
+    if data is not None:
+        history.append(current_params, data, datetime.now().strftime("%H:%M:%S"))
+    else:
+        st.session_state['pending'] = jobs.submit(current_params, trajectory_job, current_params)
+
+# Zmiana parametrów albo "Wyczyść" przed końcem obliczeń przerywa zadanie
+pending = st.session_state.get('pending')
+if pending is not None and (clear or pending.key != current_params):
+    pending.cancel()
+    st.session_state['pending'] = None
+    st.toast("Przerwano obliczenia – zmieniono parametry")
+
+@st.fragment(run_every=0.5)
+def pending_progress():
+    # Odpytywanie zadania w tle; po zakończeniu wynik trafia do historii i strona przeładowuje się
+    job = st.session_state.get('pending')
+    if job is None:
+        return
+    if job.done():
+        st.session_state['pending'] = None
+        if job.error() is not None:
+            st.session_state['job_error'] = str(job.error())
+        elif not job.cancelled():
+            history.append(job.key, job.result(), datetime.now().strftime("%H:%M:%S"))
+        st.rerun()
+    colP, colC = st.columns([4, 1])
+    colP.progress(job.progress, text=f"Obliczanie trajektorii... {job.progress:.0%}")
+    if colC.button("⏹ Przerwij"):
+        job.cancel()
+
+if st.session_state.get('pending') is not None:
+    pending_progress()
+if 'job_error' in st.session_state:
+    st.error(f"Błąd obliczeń: {st.session_state.pop('job_error')}")
+
+# Progi przejścia na WebGL (Scattergl) – powyżej nich wykres SVG przestaje płynnie reagować
+GL_TRACES = 30
+GL_POINTS = 20000
+
+def build_trajectory_figure(history):
+    start = time.perf_counter()
+    fig = go.Figure()
+    colors = ["red", "blue", "green", "orange", "purple", "brown"]
+    shots = history.shots()
+    # Wspólne zakresy osi z odczytów strzałów – tolerancja upraszczania liczona w pikselach tego samego wykresu
+    if len(shots):
+        x_range = (min(0.0, shots['range'].min()), max(0.0, shots['range'].max()))
+        y_range = (min(0.0, shots['y_target'].min()), max(0.0, shots['max_height'].max()))
+    lines = []
+    points_in = 0
+    for shot in shots:
+        t_vals, x, y, vx, vy = history.series(shot, trajectory_series)
+        lines.append(simplify(x, y, x_range=x_range, y_range=y_range))
+        points_in += len(x)
+    webgl = len(lines) > GL_TRACES or sum(len(x) for x, _ in lines) > GL_POINTS
+    trace = go.Scattergl if webgl else go.Scatter
+    for shot, (x_plot, y_plot) in zip(shots, lines):
+        color = colors[(shot['number'] - 1) % len(colors)]
+        fig.add_trace(trace(x=x_plot, y=y_plot,
+                            mode="lines",
+                            name=f"#{shot['number']}: v0={shot['v0']:g}, kąt={shot['angle']:g}°",
+                            line=dict(color=color, width=2)))
+    fig.update_layout(
+        title="Trajektorie rzutu ukośnego",
+        xaxis_title="Odległość [m]",
+        yaxis_title="Wysokość [m]",
+        xaxis=dict(scaleanchor="y", scaleratio=1),
+        template="plotly_white",
+        uirevision="trajektorie"  # zachowuje powiększenie użytkownika między przebiegami
+    )
+    recorder.record('build_trajectory_figure', time.perf_counter() - start, traces=len(lines),
+                    points_in=points_in, points_out=sum(len(x) for x, _ in lines), webgl=webgl)
+    return fig
+
+# Rysowanie wykresu wszystkich trajektorii – figura budowana ponownie tylko po zmianie historii,
+# a nie przy każdym poruszeniu suwaka
+cached_figure = st.session_state.get('trajectory_figure')
+figure_hit = cached_figure is not None and cached_figure[0] == history.version
+recorder.count('trajectory_figure', figure_hit)
+if not figure_hit:
+    cached_figure = (history.version, build_trajectory_figure(history))
+    st.session_state['trajectory_figure'] = cached_figure
+show_chart(cached_figure[1], "trajektorie")
 
 # Wyświetlenie odczytów ostatniego rzutu
-if st.session_state['trajectories']:
-    last_traj = st.session_state['trajectories'][-1]
+if len(history):
+    last_shot = history.last()
     st.markdown("### Odczyty ostatniego rzutu:")
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Czas ruchu", f"{last_traj['t'][-1]:.2f} s")
-    col2.metric("Zasięg", f"{last_traj['range']:.2f} m")
-    col3.metric("Wysokość maksymalna", f"{last_traj['max_height']:.2f} m")
-    col4.metric("Prędkość końcowa", f"{last_traj['final_speed']:.2f} m/s")
+    col1.metric("Czas ruchu", f"{last_shot['t_flight']:.2f} s")
+    col2.metric("Zasięg", f"{last_shot['range']:.2f} m")
+    col3.metric("Wysokość maksymalna", f"{last_shot['max_height']:.2f} m")
+    col4.metric("Prędkość końcowa", f"{last_shot['final_speed']:.2f} m/s")
+    if last_shot['max_height'] < last_shot['y_target']:
+        st.warning("Pocisk nie wznosi się na wysokość celu – tor kończy się w wierzchołku.")
+    cache_stats = get_trajectory_cache().stats()
+    st.caption(f"Pamięć trajektorii: {cache_stats['hits']} trafień, {cache_stats['misses']} chybień, "
+               f"{cache_stats['entries']} wpisów, {cache_stats['bytes'] / 2**20:.1f} MB")
+    history_memory = history.memory()
+    st.caption(f"Historia sesji: {history_memory['shots']}/{history.max_shots} strzałów, "
+               f"punkty w pamięci dla {history_memory['with_points']}, "
+               f"{history_memory['bytes'] / 2**10:.1f} kB")
 
     # Generowanie i wyświetlanie wykresów
-    velocity_fig = plot_velocity(last_traj['t'], last_traj['vx'], last_traj['vy'])
-    acceleration_fig = plot_acceleration(last_traj['t'], last_traj['vx'], last_traj['vy'])
+    t_vals, x, y, vx, vy = (a.astype(float) for a in history.series(last_shot, trajectory_series))
+    with recorder.timer('plot_velocity', points_in=len(t_vals)):
+        velocity_fig = plot_velocity(t_vals, vx, vy)
+    with recorder.timer('plot_acceleration', points_in=len(t_vals)):
+        acceleration_fig = plot_acceleration(t_vals, vx, vy)
+
+    show_chart(velocity_fig, "predkosc")
+    show_chart(acceleration_fig, "przyspieszenie")
+
+# Narzędzia w rozwijanych sekcjach są fragmentami – ich przyciski i pola przeliczają tylko swoją
+# sekcję, więc wykresy trajektorii nie są przy tym ponownie budowane, serializowane ani wysyłane
+# Celowanie – zadanie odwrotne dla bieżących parametrów
+@st.fragment
+def aiming_tool(v0, g, drag, mass, physics):
+    with st.expander("🎯 Celowanie: jaki kąt trafia w cel?"):
+        colX, colY = st.columns(2)
+        with colX:
+            target_x = st.number_input("Odległość celu x (m)", min_value=0.0, value=500.0, step=10.0)
+        with colY:
+            target_y = st.number_input("Wysokość celu y (m)", value=0.0, step=10.0,
+                                       help="W układzie wykresu – start na wysokości startu z panelu")
+        if st.button("Oblicz kąty"):
+            low, high = solve_angle_quadratic(target_x, target_y, v0, g, drag, mass, wind=physics['wind'],
+                                              scale_height=physics['scale_height'], y_launch=physics['y_launch'])
+            if np.isnan(low):
+                st.warning("Cel poza zasięgiem dla tej prędkości początkowej.")
+            else:
+                colL, colH = st.columns(2)
+                colL.metric("Tor płaski", f"{low:.2f}°")
+                colH.metric("Tor stromy", f"{high:.2f}°")
+
+aiming_tool(v0, g, drag, mass, physics)
+
+# Rozrzut punktu upadku – Monte Carlo wokół bieżących parametrów
+@st.cache_data(show_spinner="Losowanie strzałów...")
+def dispersion(v0, angle, g, drag, mass, spread, n_samples, model, physics):
+    nominal = {'v0': v0, 'angle': angle, 'g': g, 'drag': drag, 'mass': mass, **physics}
+    return simulate_dispersion(nominal, spread, n_samples, model=model)
+
+@st.fragment
+def dispersion_tool(v0, angle, g, drag, mass, physics):
+    with st.expander("🎲 Rozrzut: gdzie upadną pociski przy niepewnych parametrach?"):
+        colS1, colS2, colS3 = st.columns(3)
+        with colS1:
+            sigma_v0 = st.number_input("Odchylenie prędkości σ (m/s)", min_value=0.0, value=2.0, step=0.5)
+            sigma_angle = st.number_input("Odchylenie kąta σ (°)", min_value=0.0, value=0.5, step=0.1)
+        with colS2:
+            sigma_drag = st.number_input("Odchylenie oporu σ (%)", min_value=0.0, value=5.0, step=1.0)
+            sigma_mass = st.number_input("Odchylenie masy σ (%)", min_value=0.0, value=1.0, step=0.5)
+        with colS3:
+            sigma_azimuth = st.number_input("Odchylenie azymutu σ (°)", min_value=0.0, value=0.5, step=0.1)
+            n_samples = st.select_slider("Liczba strzałów", options=[1000, 10000, 100000, 1000000], value=10000)
+        dispersion_model = st.radio("Model oporu", ["kwadratowy", "liniowy"], horizontal=True)
+        model_drag = drag
+        model_physics = physics
+        if dispersion_model == "liniowy":
+            # Opór liniowy ma inne jednostki niż współczynnik b z panelu bocznego – osobne pole k1
+            model_drag = st.number_input("Współczynnik oporu liniowego k1 (kg/s)", min_value=0.1, max_value=10.0,
+                                         value=1.0, step=0.1)
+            model_physics = {}
+            if any(physics.values()):
+                st.info("Model liniowy liczy strzał w bezwietrznym powietrzu o stałej gęstości, z ziemi "
+                        "na ziemię – wiatr, atmosfera i wysokości z panelu są tu pomijane.")
+        if st.button("Symuluj rozrzut"):
+            spread = {'v0': sigma_v0, 'angle': sigma_angle, 'drag': model_drag * sigma_drag / 100,
+                      'mass': mass * sigma_mass / 100, 'azimuth': sigma_azimuth}
+            stats = dispersion(v0, angle, g, model_drag, mass, spread, n_samples, dispersion_model, model_physics)
+            if stats.count < 2:
+                st.warning("Żaden pocisk nie upadł – rozrzut nieokreślony (np. przy g = 0 albo celu powyżej wierzchołka toru).")
+            else:
+                hist = stats.histogram
+                x_centers = 0.5 * (hist.x_edges[1:] + hist.x_edges[:-1])
+                z_centers = 0.5 * (hist.z_edges[1:] + hist.z_edges[:-1])
+                disp_fig = go.Figure()
+                disp_fig.add_trace(go.Heatmap(x=x_centers, y=z_centers, z=hist.counts.T,
+                                              colorscale="Blues", showscale=False, name="Punkty upadku"))
+                for probability, dash in ((0.5, "dot"), (0.95, "solid")):
+                    ex, ez = stats.ellipse(probability)
+                    disp_fig.add_trace(go.Scatter(x=ex, y=ez, mode="lines", line=dict(color="red", dash=dash),
+                                                  name=f"Elipsa {probability:.0%}"))
+                disp_fig.add_trace(go.Scatter(x=[stats.mean('x')], y=[stats.mean('z')], mode="markers",
+                                              marker=dict(color="red", size=8), name="Średni punkt upadku"))
+                disp_fig.update_layout(
+                    title="Rozrzut punktów upadku",
+                    xaxis_title="Odległość [m]",
+                    yaxis_title="Odchylenie w bok [m]",
+                    template="plotly_white"
+                )
+                show_chart(disp_fig, "rozrzut")
+                colM1, colM2, colM3, colM4 = st.columns(4)
+                colM1.metric("Średni zasięg", f"{stats.mean('x'):.2f} m")
+                colM2.metric("σ zasięgu", f"{stats.std('x'):.2f} m")
+                colM3.metric("σ w bok", f"{stats.std('z'):.2f} m")
+                colM4.metric("Zasięg 5–95%", f"{stats.quantile('x', 0.05):.1f}–{stats.quantile('x', 0.95):.1f} m")
+                if stats.lost:
+                    st.caption(f"{stats.lost} strzałów nie upadło w czasie symulacji albo nie doleciało na wysokość celu i pominięto je.")
 
-    st.plotly_chart(velocity_fig, use_container_width=True)
-    st.plotly_chart(acceleration_fig, use_container_width=True)
+dispersion_tool(v0, angle, g, drag, mass, physics)
+
+# Mapa zasięgu w funkcji prędkości i kąta dla bieżącego oporu, masy i grawitacji
+@st.cache_data(show_spinner="Przegląd parametrów...")
+def range_map(v0_min, v0_max, n_v0, n_angle, drag, mass, g, physics):
+    v0_axis = np.linspace(v0_min, v0_max, n_v0)
+    result = sweep(v0=v0_axis, angle=np.linspace(0, 90, n_angle), drag=drag, mass=mass, g=g, physics=physics)
+    best_angle, best_range = optimal_angle(v0_axis, drag, mass, g, physics=physics)
+    return result, best_angle, best_range
+
+@st.fragment
+def range_map_tool(v0, g, drag, mass, physics):
+    with st.expander("🗺️ Mapa zasięgu: który kąt jest najlepszy?"):
+        v0_min, v0_max = st.slider("Zakres prędkości (m/s)", min_value=1.0, max_value=1000.0, value=(10.0, 500.0), step=1.0)
+        colR1, colR2 = st.columns(2)
+        with colR1:
+            n_v0 = st.number_input("Punkty prędkości", min_value=5, max_value=200, value=40, step=5)
+        with colR2:
+            n_angle = st.number_input("Punkty kąta", min_value=5, max_value=181, value=46, step=5)
+        if st.button("Rysuj mapę"):
+            result, best_angle, best_range = range_map(v0_min, v0_max, int(n_v0), int(n_angle), drag, mass, g, physics)
+            map_fig = go.Figure()
+            map_fig.add_trace(go.Heatmap(x=result.coords['v0'], y=result.coords['angle'], z=result['range'].T,
+                                         colorscale="Viridis", colorbar=dict(title="Zasięg [m]")))
+            map_fig.add_trace(go.Scatter(x=result.coords['v0'], y=best_angle, mode="lines",
+                                         line=dict(color="red", width=2), name="Kąt maksymalnego zasięgu"))
+            map_fig.update_layout(
+                title="Zasięg w funkcji prędkości początkowej i kąta",
+                xaxis_title="Prędkość początkowa [m/s]",
+                yaxis_title="Kąt [°]",
+                template="plotly_white"
+            )
+            show_chart(map_fig, "mapa_zasiegu")
+            best_here, range_here = optimal_angle(v0, drag, mass, g, physics=physics)
+            # 45° bez oporu tylko wtedy, gdy cel leży na wysokości startu
+            flat = " (bez oporu byłoby to 45°)" if physics['y_launch'] == physics['y_target'] else ""
+            if np.isnan(range_here):
+                st.caption(f"Dla v0 = {v0:g} m/s pocisk przy żadnym kącie nie wznosi się na wysokość celu.")
+            else:
+                st.caption(f"Dla v0 = {v0:g} m/s największy zasięg {range_here:.1f} m daje kąt {best_here:.2f}°{flat}.")
+
+range_map_tool(v0, g, drag, mass, physics)
+
+# Eksport historii do pliku i wczytanie zapisanych trajektorii z powrotem do historii
+def export_bytes(kind, fmt):
+    chunks = summary_chunks(history) if kind == "Odczyty strzałów" else trajectory_chunks(history, trajectory_series)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"eksport.{fmt}")
+        write_table(path, chunks, fmt)
+        with open(path, 'rb') as f:
+            return f.read()
+
+@st.fragment
+def export_tool():
+    with st.expander("💾 Eksport i import trajektorii"):
+        colE1, colE2 = st.columns(2)
+        with colE1:
+            export_kind = st.radio("Zawartość", ["Odczyty strzałów", "Punkty trajektorii"])
+        with colE2:
+            export_format = st.selectbox("Format", EXPORT_FORMATS)
+        export_key = (history.version, export_kind, export_format)
+        if st.button("Przygotuj plik", disabled=not len(history)):
+            try:
+                st.session_state['export'] = (export_key, export_bytes(export_kind, export_format))
+            except ImportError as error:
+                st.error(str(error))
+        prepared = st.session_state.get('export')
+        if prepared is not None and prepared[0] == export_key:
+            name = "odczyty" if export_kind == "Odczyty strzałów" else "trajektorie"
+            st.download_button("Pobierz", prepared[1], file_name=f"{name}.{export_format}")
+
+        uploaded = st.file_uploader("Wczytaj punkty trajektorii", type=list(EXPORT_FORMATS))
+        if uploaded is not None and st.session_state.get('imported') != uploaded.file_id:
+            st.session_state['imported'] = uploaded.file_id
+            try:
+                count = load_into_history(history, read_table(uploaded.getvalue()),
+                                          datetime.now().strftime("%H:%M:%S"))
+            except (ImportError, ValueError, KeyError) as error:
+                st.error(f"Nie udało się wczytać pliku: {error}")
+            else:
+                st.toast(f"Wczytano {count} strzałów")
+                st.rerun()
+
+export_tool()
+
+# Diagnostyka – pomiary całego procesu serwera (wszystkich sesji), nie tylko tej strony
+with st.expander("🩺 Diagnostyka"):
+    st.checkbox("Mierz rozmiar danych wykresów (dodatkowa serializacja JSON)", key='diagnostics_payload')
+    summary = recorder.summary()
+    if summary['operations']:
+        st.dataframe([{'operacja': name, **stats} for name, stats in sorted(summary['operations'].items())],
+                     use_container_width=True)
+    else:
+        st.caption("Brak pomiarów.")
+    last_integration = recorder.last('compute_trajectory')
+    if last_integration is not None:
+        st.caption(f"Ostatnie całkowanie: {last_integration['seconds'] * 1000:.1f} ms, "
+                   f"{last_integration['nfev']} wywołań prawej strony, kroki: {last_integration['accepted']} "
+                   f"przyjętych, {last_integration['rejected']} odrzuconych, {last_integration['points']} punktów")
+    cache_stats = get_trajectory_cache().stats()
+    caches = dict(summary['caches'], pamiec_trajektorii=cache_stats)
+    st.dataframe([{'pamięć': name, 'trafienia': c['hits'], 'chybienia': c['misses'],
+                   'skuteczność': f"{c['hit_ratio']:.0%}"} for name, c in sorted(caches.items())],
+                 use_container_width=True)
+    colD1, colD2 = st.columns(2)
+    if colD1.button("Przygotuj JSON"):
+        st.session_state['diagnostics_json'] = recorder.to_json(pamiec_trajektorii=cache_stats,
+                                                                historia=history.memory())
+    if 'diagnostics_json' in st.session_state:
+        colD1.download_button("Pobierz diagnostykę", st.session_state['diagnostics_json'],
+                              file_name="diagnostyka.json", mime="application/json")
+    if colD2.button("Wyczyść pomiary"):
+        recorder.clear()
+        st.session_state.pop('diagnostics_json', None)
+        st.rerun()
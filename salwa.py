@@ -0,0 +1,65 @@
+import numpy as np
+
+from model_liniowy import HORIZON_TAU, landing_time, position
+
+# Salwa: wiele pocisków modelu z oporem liniowym wystrzelonych naraz, przechowywanych jako jedna
+# tablica. Tor każdego pocisku jest próbkowany raz (n_points próbek równomiernie w jego czasie
+# lotu), a w każdej klatce aktualizowane są tylko pociski w locie – jednym wektorowym wywołaniem.
+# Tory pocisków, które wylądowały, są zamrożone i nie są już liczone.
+
+SALVO_POINTS = 100
+
+
+def spread(angle, v0, count, angle_spread, v0_spread, rng=None):
+    # Kąty [°] i prędkości losowane równomiernie wokół wartości nominalnych: kąt ± angle_spread,
+    # prędkość ± v0_spread (ułamek v0)
+    rng = np.random.default_rng() if rng is None else rng
+    angles = np.clip(angle + rng.uniform(-angle_spread, angle_spread, count), 1.0, 90.0)
+    v0s = np.maximum(v0 * (1 + rng.uniform(-v0_spread, v0_spread, count)), 1e-3)
+    return angles, v0s
+
+
+class Salvo:
+    def __init__(self, angles, v0s, k1, m, g, n_points=SALVO_POINTS):
+        self.angle = np.asarray(angles, dtype=float)
+        self.v0 = np.asarray(v0s, dtype=float)
+        self.k1, self.m, self.g = k1, m, g
+        t_land = np.asarray(landing_time(self.angle, self.v0, k1, m, g), dtype=float)
+        lands = np.isfinite(t_land)
+        self.t_end = np.where(lands, t_land, HORIZON_TAU * m / k1)
+        self.duration = float(self.t_end.max())
+
+        t = self.t_end[:, None] * np.linspace(0.0, 1.0, n_points)
+        x, y = position(t, self.angle[:, None], self.v0[:, None], k1, m, g)
+        self.samples = np.stack([x, np.maximum(y, 0.0)], axis=-1)   # (N, n_points, 2)
+        self.samples[lands, -1, 1] = 0.0
+
+        # Stan do rysowania: tor każdego pocisku do bieżącej chwili (dopełniony położeniem
+        # pocisku, więc kształt jest stały) i bieżące położenia
+        self.lines = np.zeros_like(self.samples)
+        self.heads = np.zeros((len(self.angle), 2))
+        self.active = np.arange(len(self.angle))
+
+    def __len__(self):
+        return len(self.angle)
+
+    def advance(self, t):
+        # Stan wszystkich pocisków w locie w chwili t; zwraca liczbę pocisków wciąż w locie
+        rows = self.active
+        if not len(rows):
+            return 0
+        t_end = self.t_end[rows]
+        landed = t_end <= t
+        t_row = np.minimum(t, t_end)
+        n_points = self.samples.shape[1]
+        fraction = np.divide(t_row, t_end, out=np.ones_like(t_row), where=t_end > 0)
+        count = np.minimum(np.floor(fraction * (n_points - 1)).astype(int) + 1, n_points)
+
+        x, y = position(t_row, self.angle[rows], self.v0[rows], self.k1, self.m, self.g)
+        heads = np.stack([x, np.maximum(y, 0.0)], axis=-1)
+        heads[landed] = self.samples[rows[landed], -1]
+        self.heads[rows] = heads
+        visible = np.arange(n_points) < count[:, None]
+        self.lines[rows] = np.where(visible[..., None], self.samples[rows], heads[:, None, :])
+        self.active = rows[~landed]
+        return len(self.active)
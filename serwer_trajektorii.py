@@ -0,0 +1,302 @@
+import argparse
+import json
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from model_kwadratowy import N_POINTS, compute_trajectory
+from model_liniowy import MIN_LINEAR_DRAG, trajectory as linear_trajectory
+from przeglad import AXES, OUTPUTS
+from rzut_cli import CHUNK_SIZE, DEFAULTS, MODELS, evaluate_params, parse_rows
+
+# Lokalna usługa HTTP/JSON z fizyką rzutu, dla narzędzi działających bez interfejsu Streamlit.
+#
+#   POST /strzal      {"v0": 100, "angle": 45, ...}        -> odczyty jednego strzału (JSON)
+#   POST /trajektoria {"v0": 100, "angle": 45, "punkty": 300} -> odczyty + punkty t, x, y, vx, vy
+#   POST /wsad        NDJSON albo lista JSON parametrów       -> wyniki strumieniowo jako NDJSON
+#   GET  /zdrowie                                             -> stan i statystyki łączenia
+#
+# Pojedyncze strzały nadchodzące w krótkim oknie czasowym łączone są w jedno wsadowe całkowanie
+# (micro-batching), a wszystkie obliczenia idą przez pulę o ograniczonej liczbie wątków.
+# Brakujące parametry biorą wartości domyślne jak w rzut_cli.py; "model": "liniowy" wybiera
+# opór liniowy – wtedy "drag" to k1 [kg/s] z własną wartością domyślną, a nie b [kg/m].
+#
+#   python serwer_trajektorii.py --port 8765
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Okno zbierania strzałów do jednej partii [s] i największa partia
+BATCH_WINDOW = 0.005
+MAX_BATCH = 1024
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+# Największe przyjmowane ciało żądania
+MAX_BODY = 64 * 2**20
+# Największa liczba punktów toru w odpowiedzi /trajektoria
+MAX_POINTS = 100000
+# Kolejka połączeń oczekujących na accept() – domyślne 5 z socketserver zrywa połączenia
+# (ConnectionResetError), gdy wielu klientów łączy się naraz
+REQUEST_QUEUE_SIZE = 1024
+
+
+def _clean(value):
+    # JSON nie zna NaN ani nieskończoności – zamieniamy je na null
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+class MicroBatcher:
+    # Kolejka pojedynczych strzałów: wątek dyspozytora czeka na wolne miejsce w puli, potem zbiera
+    # żądania przez BATCH_WINDOW (albo do MAX_BATCH) i zleca całą partię puli jako jedno wywołanie.
+    # Gdy wszystkie wątki liczą, nowe strzały czekają w kolejce i trafiają razem do następnej partii.
+    def __init__(self, pool, workers, window=BATCH_WINDOW, max_batch=MAX_BATCH, max_pending=None):
+        self.pool = pool
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        # Liczba partii naraz w puli (liczonych lub czekających) – domyślnie po jednej na wątek
+        self._slots = threading.BoundedSemaphore(max_pending or workers)
+        self._thread = threading.Thread(target=self._run, name='mikropartie', daemon=True)
+        self._thread.start()
+
+    def submit(self, params, model):
+        future = Future()
+        self._queue.put((params, model, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            self._slots.acquire()
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self.batches += 1
+            self.requests += len(batch)
+            self.pool.submit(self._evaluate, batch).add_done_callback(lambda _: self._slots.release())
+
+    def _evaluate(self, batch):
+        try:
+            params = [np.array([item[0][i] for item in batch]) for i in range(len(AXES))]
+            models = np.array([item[1] for item in batch])
+            results = evaluate_params(params, models)
+        except Exception as error:
+            for _, _, future in batch:
+                future.set_exception(error)
+            return
+        for k, (_, _, future) in enumerate(batch):
+            future.set_result({name: _clean(results[i, k]) for i, name in enumerate(OUTPUTS)})
+
+
+def full_trajectory(params, model, n_points):
+    # Odczyty i punkty toru jednego strzału
+    v0, angle, drag, mass, g = params
+    if model == 'liniowy':
+        drag = max(drag, MIN_LINEAR_DRAG)
+        t, x, y = linear_trajectory(angle, v0, drag, mass, g, n_points)
+        # Prędkość w modelu liniowym: v(t) = (v0 + g tau ŷ) exp(-t / tau) - g tau ŷ
+        tau = mass / drag
+        decay = np.exp(-t / tau)
+        vx = v0 * math.cos(math.radians(angle)) * decay
+        vy = (v0 * math.sin(math.radians(angle)) + g * tau) * decay - g * tau
+        summary = evaluate_params([np.array([p]) for p in params], np.array([model]))[:, 0]
+    else:
+        # Punkty prosto z rozwiązania gęstego solvera na żądanej siatce; wysokość maksymalna
+        # ze zdarzenia wierzchołka, więc nie zależy od liczby punktów
+        t, x, y, vx, vy, max_height, range_val, final_speed = compute_trajectory(v0, angle, g, drag, mass,
+                                                                                 n_points=n_points)
+        summary = (t[-1], range_val, max_height, final_speed)
+    result = {name: _clean(value) for name, value in zip(OUTPUTS, summary)}
+    result.update({name: [_clean(v) for v in series] for name, series in
+                   zip(('t', 'x', 'y', 'vx', 'vy'), (t, x, y, vx, vy))})
+    return result
+
+
+class TrajectoryHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'Symulacje/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY:
+            raise ValueError("zbyt duże żądanie")
+        return self.rfile.read(length)
+
+    def _parse_one(self, body):
+        row = json.loads(body or b'{}')
+        if not isinstance(row, dict):
+            raise ValueError("oczekiwano obiektu JSON z parametrami")
+        params, models = parse_rows([row], DEFAULTS, MODELS[0])
+        return row, tuple(float(p[0]) for p in params), str(models[0])
+
+    def do_GET(self):
+        if self.path == '/zdrowie':
+            batcher = self.server.batcher
+            self._send_json(200, {
+                'status': 'ok',
+                'partie': batcher.batches,
+                'strzaly': batcher.requests,
+                'srednia_partia': batcher.requests / batcher.batches if batcher.batches else 0.0,
+            })
+        else:
+            self._send_json(404, {'blad': f"nieznana ścieżka {self.path}"})
+
+    def do_POST(self):
+        try:
+            body = self._read_body()
+            if self.path == '/strzal':
+                _, params, model = self._parse_one(body)
+                self._send_json(200, self.server.batcher.submit(params, model).result())
+            elif self.path == '/trajektoria':
+                row, params, model = self._parse_one(body)
+                n_points = int(row.get('punkty', N_POINTS))
+                if not 2 <= n_points <= MAX_POINTS:
+                    raise ValueError(f"liczba punktów spoza zakresu 2..{MAX_POINTS}")
+                self._send_json(200, self.server.pool.submit(full_trajectory, params, model, n_points).result())
+            elif self.path == '/wsad':
+                self._stream_batch(body)
+            else:
+                self._send_json(404, {'blad': f"nieznana ścieżka {self.path}"})
+        except (ValueError, TypeError) as error:
+            self._send_json(400, {'blad': str(error)})
+        except Exception as error:
+            self._send_json(500, {'blad': f"{type(error).__name__}: {error}"})
+
+    def _write_chunk(self, data):
+        # Jeden fragment odpowiedzi chunked; pusty fragment kończy odpowiedź
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    @staticmethod
+    def _batch_rows(body):
+        # Wiersze /wsad (lista JSON albo NDJSON); każdy musi być obiektem – inaczej ValueError (400)
+        text = body.decode('utf-8').strip()
+        if text.startswith('['):
+            rows = json.loads(text)
+        else:
+            rows = []
+            for number, line in enumerate(text.splitlines(), 1):
+                if line.strip():
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError as error:
+                        raise ValueError(f"wiersz {number}: niepoprawny JSON ({error})") from None
+        if not isinstance(rows, list):
+            raise ValueError("oczekiwano listy JSON albo NDJSON z obiektami parametrów")
+        for number, row in enumerate(rows, 1):
+            if not isinstance(row, dict):
+                raise ValueError(f"wiersz {number}: oczekiwano obiektu JSON z parametrami")
+        return rows
+
+    def _stream_batch(self, body):
+        # Wiersze liczone porcjami po CHUNK_SIZE; każda porcja wysyłana od razu jako fragment
+        # odpowiedzi (Transfer-Encoding: chunked), po jednym wierszu NDJSON na strzał. Wszystkie
+        # wiersze są sprawdzane przed wysłaniem nagłówków, więc błędy danych kończą się odpowiedzią 400.
+        rows = self._batch_rows(body)
+        chunks = [parse_rows(rows[start:start + CHUNK_SIZE], DEFAULTS, MODELS[0], first_line=start + 1)
+                  for start in range(0, len(rows), CHUNK_SIZE)]
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        # Od tej chwili status 200 jest wysłany – żaden błąd nie może już trafić do _send_json.
+        # Błąd obliczeń trafia do strumienia jako ostatni wiersz NDJSON, a połączenie jest zamykane.
+        try:
+            try:
+                for params, models in chunks:
+                    results = self.server.pool.submit(evaluate_params, params, models).result()
+                    lines = []
+                    for k in range(len(models)):
+                        out = {name: _clean(p[k]) for name, p in zip(AXES, params)}
+                        out['model'] = str(models[k])
+                        out.update({name: _clean(results[i, k]) for i, name in enumerate(OUTPUTS)})
+                        lines.append(json.dumps(out, ensure_ascii=False))
+                    self._write_chunk(('\n'.join(lines) + '\n').encode('utf-8'))
+            except OSError:
+                raise
+            except Exception as error:
+                self.close_connection = True
+                line = json.dumps({'blad': f"{type(error).__name__}: {error}"}, ensure_ascii=False) + '\n'
+                self._write_chunk(line.encode('utf-8'))
+            self._write_chunk(b'')
+        except OSError:
+            # Klient zerwał połączenie – nie ma komu wysłać reszty
+            self.close_connection = True
+
+
+class TrajectoryServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+    def __init__(self, address, workers=DEFAULT_WORKERS, window=BATCH_WINDOW, verbose=False, max_pending=None):
+        super().__init__(address, TrajectoryHandler)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='obliczenia')
+        self.batcher = MicroBatcher(self.pool, workers, window, max_pending=max_pending)
+        self.verbose = verbose
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+        self.pool.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lokalna usługa HTTP z trajektoriami rzutu ukośnego")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="liczba wątków obliczeniowych")
+    parser.add_argument('--okno', type=float, default=BATCH_WINDOW * 1000,
+                        help="okno łączenia pojedynczych strzałów [ms]")
+    parser.add_argument('--partie', type=int, default=None,
+                        help="najwięcej partii naraz w puli (domyślnie liczba wątków)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="loguj każde żądanie")
+    args = parser.parse_args(argv)
+
+    server = TrajectoryServer((args.host, args.port), args.workers, args.okno / 1000, args.verbose, args.partie)
+    print(f"Serwer trajektorii na http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model_kwadratowy import integrate_batch
+
+# Tablica strzelnicza: czas lotu, zasięg i wysokość maksymalna modelu z kwadratowym oporem
+# policzone z góry na siatce (v0, kąt, k = drag / mass, g) i zapisane jako skompresowane tablice float32.
+# Zapytania to interpolacja wieloliniowa z oszacowaniem błędu; poza siatką albo przy zbyt dużym
+# oszacowaniu błędu wynik liczony jest dokładnie tym samym integratorem co compute_trajectory.
+# Oś k jest domyślnie rozciągnięta kwadratowo (węzły gęstsze przy k = 0): zasięg zmienia się
+# najszybciej przy małym oporze, a równe kroki k zostawiały tam komórki ze zbyt dużym błędem.
+
+AXES = ('v0', 'angle', 'k', 'g')
+OUTPUTS = ('t_flight', 'range', 'max_height')
+DEFAULT_PATH = os.environ.get('SYMULACJE_TABLICA', 'tablica_strzelnicza.npz')
+CHUNK_SIZE = 4096
+# Zapas oszacowania błędu względem błędu zmierzonego w środkach komórek
+ERROR_SAFETY = 2.0
+# Komórka, w której błąd w środku przekracza tyle razy oszacowanie z krzywizny w węzłach, ma
+# przebieg, którego siatka nie rozdziela – jej oszacowanie jest niewiarygodne (inf: zawsze całkowanie)
+RELIABILITY = 4.0
+# Wykładnik rozciągnięcia osi k: węzły k_i = k_max * (i / (n - 1))^K_STRETCH
+K_STRETCH = 2
+
+
+def _evaluate_chunk(axes, start, stop):
+    # Wiersze start:stop spłaszczonej siatki – siatka nie jest nigdy materializowana w całości
+    idx = np.unravel_index(np.arange(start, stop), [len(a) for a in axes])
+    v0, angle, k, g = (a[i] for a, i in zip(axes, idx))
+    t_flight, range_val, max_height, _ = integrate_batch(v0, angle, g, k, 1.0)
+    return np.stack([t_flight, range_val, max_height]).astype(np.float32)
+
+
+def _curvature_bound(values, axes):
+    # Oszacowanie błędu interpolacji wieloliniowej w każdej komórce siatki z samych węzłów:
+    # suma po osiach h² / 8 * max |∂²f/∂x²| w narożnikach komórki
+    n_out = values.shape[0]
+    bound = np.zeros((n_out,) + tuple(max(len(a) - 1, 1) for a in axes))
+    for i, ax in enumerate(axes):
+        if len(ax) < 3:
+            continue
+        second = np.abs(np.gradient(np.gradient(values, ax, axis=i + 1), ax, axis=i + 1))
+        # Maksimum po narożnikach komórki wzdłuż każdej osi
+        for j, other in enumerate(axes):
+            if len(other) > 1:
+                lo = [slice(None)] * second.ndim
+                hi = [slice(None)] * second.ndim
+                lo[j + 1] = slice(None, -1)
+                hi[j + 1] = slice(1, None)
+                second = np.maximum(second[tuple(lo)], second[tuple(hi)])
+        h = np.diff(ax).reshape([1] * (i + 1) + [-1] + [1] * (len(axes) - i - 1))
+        bound += h**2 / 8 * second
+    return bound
+
+
+def _midpoint_axes(axes):
+    return [0.5 * (a[:-1] + a[1:]) if len(a) > 1 else a for a in axes]
+
+
+def _error_bound(values, axes, midpoints):
+    # Oszacowanie błędu w każdej komórce: większe z oszacowania z krzywizny i rzeczywistego błędu
+    # interpolacji w środku komórki (midpoints – wartości policzone tam całkowaniem), z zapasem
+    # ERROR_SAFETY. Środek komórki to dla interpolacji wieloliniowej punkt największego błędu
+    # funkcji o stałej krzywiźnie; komórki, w których obie miary się rozjeżdżają, dostają inf.
+    center = values
+    for i, ax in enumerate(axes):
+        if len(ax) > 1:
+            lo = [slice(None)] * center.ndim
+            hi = [slice(None)] * center.ndim
+            lo[i + 1] = slice(None, -1)
+            hi[i + 1] = slice(1, None)
+            center = 0.5 * (center[tuple(lo)] + center[tuple(hi)])
+    measured = np.abs(center - midpoints)
+    curvature = _curvature_bound(values, axes)
+    bound = ERROR_SAFETY * np.maximum(measured, curvature)
+    scale = np.abs(values).max(axis=tuple(range(1, values.ndim)), keepdims=True)
+    bound[measured > RELIABILITY * curvature + 1e-9 * scale] = np.inf
+    return bound.astype(np.float32)
+
+
+def _evaluate(axes, workers, chunk_size):
+    # Wartości (3, *kształt siatki) na siatce rozpiętej przez osie
+    shape = tuple(len(a) for a in axes)
+    total = int(np.prod(shape))
+    bounds = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    if workers == 1:
+        chunks = [_evaluate_chunk(axes, start, stop) for start, stop in bounds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_evaluate_chunk, [axes] * len(bounds), *zip(*bounds)))
+    return np.concatenate(chunks, axis=1).reshape((len(OUTPUTS),) + shape)
+
+
+def build_table(v0, angle, k, g, workers=None, chunk_size=CHUNK_SIZE):
+    # Liczy tablicę dla podanych osi (i kontrolnie środki komórek); workers=1 liczy w bieżącym procesie
+    axes = [np.asarray(a, dtype=float) for a in (v0, angle, k, g)]
+    values = _evaluate(axes, workers, chunk_size)
+    midpoints = _evaluate(_midpoint_axes(axes), workers, chunk_size)
+    return FiringTable(axes, values, _error_bound(values.astype(float), axes, midpoints.astype(float)))
+
+
+class FiringTable:
+    def __init__(self, axes, values, error):
+        self.axes = [np.asarray(a, dtype=float) for a in axes]
+        self.values = values
+        self.error = error
+        # Stałe interpolacji: kroki spłaszczonej tablicy i przesunięcia 2^d narożników komórki
+        self._flat = values.reshape(values.shape[0], -1)
+        self._strides = np.cumprod((1,) + tuple(len(ax) for ax in self.axes[:0:-1]))[::-1]
+        self._corners = np.array(list(np.ndindex(*(2 if len(ax) > 1 else 1 for ax in self.axes))))
+        self._offsets = self._corners @ self._strides
+
+    def save(self, path=DEFAULT_PATH):
+        np.savez_compressed(path, values=self.values, error=self.error,
+                            **{name: ax for name, ax in zip(AXES, self.axes)})
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with np.load(path) as data:
+            return cls([data[name] for name in AXES], data['values'], data['error'])
+
+    def interpolate(self, v0, angle, k, g):
+        # Interpolacja wieloliniowa; zwraca (wartości (3, ...), oszacowanie błędu (3, ...), maska „w siatce”)
+        point = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (v0, angle, k, g)))
+        shape = point[0].shape
+        point = [p.ravel() for p in point]
+        inside = np.ones(len(point[0]), dtype=bool)
+        cells, fracs = [], []
+        for ax, p in zip(self.axes, point):
+            if len(ax) == 1:
+                inside &= np.abs(p - ax[0]) <= 1e-9 * max(abs(ax[0]), 1.0)
+                cells.append(np.zeros(len(p), dtype=int))
+                fracs.append(np.zeros(len(p)))
+                continue
+            inside &= (p >= ax[0]) & (p <= ax[-1])
+            i = np.clip(np.searchsorted(ax, p, side='right') - 1, 0, len(ax) - 2)
+            cells.append(i)
+            fracs.append(np.clip((p - ax[i]) / (ax[i + 1] - ax[i]), 0.0, 1.0))
+
+        # Wszystkie 2^d narożniki naraz: indeksy w spłaszczonej tablicy i iloczyny wag
+        base = sum(i * s for i, s in zip(cells, self._strides))
+        fracs = np.stack(fracs)
+        weights = np.prod(np.where(self._corners[:, :, None] == 1, fracs[None], 1.0 - fracs[None]), axis=1)
+        result = np.sum(weights * self._flat[:, base[None, :] + self._offsets[:, None]], axis=1)
+        error = self.error[(slice(None),) + tuple(cells)]
+        return (result.reshape((-1,) + shape), error.reshape((-1,) + shape).astype(float),
+                inside.reshape(shape))
+
+    def query(self, v0, angle, g, drag, mass, rtol=1e-3):
+        # (czas lotu, zasięg, wysokość maksymalna, oszacowanie błędu zasięgu) z tablicy,
+        # a dla punktów spoza siatki lub z błędem względnym ponad rtol – z dokładnego całkowania
+        v0, angle, g, drag, mass = np.broadcast_arrays(
+            *(np.asarray(a, dtype=float) for a in (v0, angle, g, drag, mass)))
+        shape = v0.shape
+        v0, angle, g, drag, mass = (a.ravel() for a in (v0, angle, g, drag, mass))
+        values, error, inside = self.interpolate(v0, angle, drag / mass, g)
+        range_error = error[1]
+        exact = ~inside | (range_error > rtol * np.maximum(np.abs(values[1]), 1.0))
+        if exact.any():
+            t_flight, range_val, max_height, _ = integrate_batch(
+                v0[exact], angle[exact], g[exact], drag[exact], mass[exact])
+            values[:, exact] = np.stack([t_flight, range_val, max_height])
+            range_error[exact] = 0.0
+        result = (values[0], values[1], values[2], range_error)
+        return tuple(r.reshape(shape)[()] for r in result)
+
+
+def _axis(spec):
+    start, stop, num = spec
+    return np.linspace(float(start), float(stop), int(num))
+
+
+def stretched_axis(stop, num, power=K_STRETCH):
+    # num węzłów od 0 do stop, zagęszczonych przy 0
+    return float(stop) * np.linspace(0.0, 1.0, int(num))**power
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Budowa tablicy strzelniczej modelu z kwadratowym oporem")
+    parser.add_argument('--out', default=DEFAULT_PATH, help="plik wynikowy .npz")
+    parser.add_argument('--v0', nargs=3, default=(0, 1000, 101), metavar=('OD', 'DO', 'N'),
+                        help="prędkość początkowa [m/s]")
+    parser.add_argument('--angle', nargs=3, default=(0, 90, 91), metavar=('OD', 'DO', 'N'),
+                        help="kąt [°]")
+    parser.add_argument('--k', nargs=2, default=(0.005, 26), metavar=('DO', 'N'),
+                        help="opór na jednostkę masy drag / mass [1/m]: N węzłów od 0 do DO, gęstszych przy 0")
+    parser.add_argument('--g', nargs=3, default=(9.81, 9.81, 1), metavar=('OD', 'DO', 'N'),
+                        help="grawitacja [m/s²]")
+    parser.add_argument('--workers', type=int, default=None, help="liczba procesów (domyślnie wszystkie rdzenie)")
+    parser.add_argument('--chunk', type=int, default=CHUNK_SIZE, help="liczba punktów siatki na zadanie")
+    args = parser.parse_args(argv)
+
+    table = build_table(_axis(args.v0), _axis(args.angle), stretched_axis(args.k[0], args.k[1]), _axis(args.g),
+                        workers=args.workers, chunk_size=args.chunk)
+    table.save(args.out)
+    print(f"Zapisano {args.out}: siatka {table.values.shape[1:]}, "
+          f"maksymalne oszacowanie błędu zasięgu {table.error[1][np.isfinite(table.error[1])].max():.3g} m, "
+          f"komórki bez wiarygodnego oszacowania: {np.mean(~np.isfinite(table.error[1])):.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from celowanie import (height_at_distance, solve_angle_linear, solve_angle_quadratic, solve_velocity_linear,
+                       solve_velocity_quadratic)
+from model_kwadratowy import compute_trajectory
+from model_liniowy import flight_summary, position
+
+K1, M, G = 1.0, 10.0, 9.81
+DRAG, MASS = 0.005, 10.0
+
+
+def _height_linear(x, v0, angle):
+    # Wysokość toru modelu liniowego nad punktem x – z chwili, w której pocisk tam jest
+    tau = M / K1
+    t = -tau * np.log1p(-x / (tau * v0 * np.cos(np.radians(angle))))
+    return position(t, angle, v0, K1, M, G)[1]
+
+
+@pytest.mark.parametrize('x, y', [(1000.0, 0.0), (2000.0, 300.0), (3000.0, -100.0)])
+def test_angle_linear_hits_target(x, y):
+    low, high = solve_angle_linear(x, y, 500.0, K1, M, G)
+    assert low < high
+    for angle in (low, high):
+        assert _height_linear(x, 500.0, angle) == pytest.approx(y, abs=1e-6)
+
+
+def test_angle_linear_ground_matches_range():
+    low, high = solve_angle_linear(1500.0, 0.0, 500.0, K1, M, G)
+    for angle in (low, high):
+        assert flight_summary(angle, 500.0, K1, M, G)[1] == pytest.approx(1500.0, rel=1e-9)
+
+
+def test_angle_linear_unreachable():
+    low, high = solve_angle_linear(1e6, 0.0, 500.0, K1, M, G)
+    assert np.isnan(low) and np.isnan(high)
+
+
+def test_velocity_linear_hits_target():
+    v0 = solve_velocity_linear(2000.0, 200.0, 40.0, K1, M, G)
+    assert _height_linear(2000.0, v0, 40.0) == pytest.approx(200.0, abs=1e-6)
+
+
+@pytest.mark.parametrize('x, y', [(1000.0, 0.0), (1500.0, 200.0)])
+def test_angle_quadratic_hits_target(x, y):
+    low, high = solve_angle_quadratic(x, y, 300.0, G, DRAG, MASS)
+    assert low < high
+    for angle in (low, high):
+        assert height_at_distance(x, y, 300.0, angle, G, DRAG, MASS) == pytest.approx(y, abs=1e-4)
+
+
+def test_angle_quadratic_ground_matches_solve_ivp():
+    low, high = solve_angle_quadratic(1000.0, 0.0, 300.0, G, DRAG, MASS)
+    for angle in (low, high):
+        assert compute_trajectory(300.0, angle, G, DRAG, MASS)[6] == pytest.approx(1000.0, rel=1e-6)
+
+
+def test_angle_quadratic_unreachable():
+    low, high = solve_angle_quadratic(1e5, 0.0, 300.0, G, DRAG, MASS)
+    assert np.isnan(low) and np.isnan(high)
+
+
+def test_velocity_quadratic_hits_target():
+    v0 = solve_velocity_quadratic(1000.0, 100.0, 45.0, G, DRAG, MASS)
+    assert height_at_distance(1000.0, 100.0, v0, 45.0, G, DRAG, MASS) == pytest.approx(100.0, abs=1e-4)
+
+
+def test_quadratic_solvers_use_extended_model():
+    # Wiatr, atmosfera wykładnicza i strzał ze wzniesienia – jak compute_trajectory z tymi parametrami
+    physics = dict(wind=-8.0, scale_height=3000.0, y_launch=100.0)
+    low, high = solve_angle_quadratic(800.0, 0.0, 150.0, G, DRAG, MASS, **physics)
+    for angle in (low, high):
+        assert compute_trajectory(150.0, angle, G, DRAG, MASS, **physics)[6] == pytest.approx(800.0, rel=1e-6)
+    v0 = solve_velocity_quadratic(800.0, 0.0, 30.0, G, DRAG, MASS, **physics)
+    assert compute_trajectory(v0, 30.0, G, DRAG, MASS, **physics)[6] == pytest.approx(800.0, rel=1e-6)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from eksport import read_table, write_table
+
+CHUNKS = (3, 5, 1, 7)
+
+
+def _chunks():
+    # Porcje o różnej długości; numer rośnie ciągle ponad granicami porcji
+    rng = np.random.default_rng(0)
+    start = 0
+    for n in CHUNKS:
+        yield {'number': np.arange(start, start + n, dtype=np.int64),
+               'x': rng.normal(0.0, 1e3, n),
+               'model': np.array(['kwadratowy', 'liniowy'] * n)[:n]}
+        start += n
+
+
+def _expected():
+    chunks = list(_chunks())
+    return {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+
+
+def _check(table, expected):
+    assert set(table) == set(expected)
+    for name, values in expected.items():
+        assert len(table[name]) == sum(CHUNKS)
+        np.testing.assert_array_equal(np.asarray(table[name]), values)
+
+
+def test_csv_round_trip(tmp_path):
+    path = tmp_path / 'tabela.csv'
+    assert write_table(path, _chunks()) == sum(CHUNKS)
+    table = read_table(path)
+    _check(table, _expected())
+    assert table['number'].dtype == np.int64
+    assert table['x'].dtype == np.float64
+
+
+def test_npz_round_trip_is_memory_mapped(tmp_path):
+    path = tmp_path / 'tabela.npz'
+    assert write_table(path, _chunks()) == sum(CHUNKS)
+    table = read_table(path)
+    _check(table, _expected())
+    assert table['number'].dtype == np.int64
+    assert table['x'].dtype == np.float64
+    assert table['model'].dtype.kind == 'U'
+    assert all(isinstance(column, np.memmap) for column in table.values())
+    # Z bajtów (np. przesłany plik) – te same kolumny jako widoki bufora
+    _check(read_table(path.read_bytes()), _expected())
+
+
+def test_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'tabela.parquet'
+    assert write_table(path, _chunks()) == sum(CHUNKS)
+    assert pq.ParquetFile(path).num_row_groups == len(CHUNKS)
+    table = read_table(path)
+    _check(table, _expected())
+    assert table['number'].dtype == np.int64
+    assert table['x'].dtype == np.float64
@@ -0,0 +1,68 @@
+import numpy as np
+
+from historia import PARAMS, RECORD_DTYPE, TrajectoryHistory
+
+N = 4
+
+
+def _shot(number):
+    # Parametry i szeregi (t, x, y, vx, vy) rozpoznawalne po numerze strzału
+    params = (float(number), 45.0, 9.81, 0.005, 10.0)
+    data = number + np.arange(5 * N, dtype=float).reshape(5, N)
+    return params, data
+
+
+def _history(shots, max_shots=3, max_points=2):
+    history = TrajectoryHistory(max_shots=max_shots, max_points=max_points)
+    for number in range(1, shots + 1):
+        history.append(*_shot(number), timestamp=f"00:00:0{number}")
+    return history
+
+
+def test_wraparound_evicts_oldest_and_reuses_slots():
+    history = _history(5)
+    shots = history.shots()
+    assert len(history) == 3
+    assert list(shots['number']) == [3, 4, 5]
+    assert list(shots['v0']) == [3.0, 4.0, 5.0]
+    # Pierścień rekordów: strzały 4 i 5 zajęły miejsca 1 i 2
+    assert list(history.records['number']) == [4, 5, 3]
+    assert history.last()['number'] == 5
+    # Dwa bufory punktów dzielone na zmianę: 5 nadpisał bufor strzału 3
+    assert list(shots['slot']) == [0, 1, 0]
+    assert list(history.slot_owner) == [5, 4]
+    assert history.version == 5
+
+
+def test_overwritten_points_are_rehydrated():
+    history = _history(5)
+    oldest, middle, newest = history.shots()
+    calls = []
+
+    def rehydrate(*params):
+        calls.append(params)
+        return _shot(int(params[0]))[1]
+
+    np.testing.assert_array_equal(history.series(newest, rehydrate), _shot(5)[1].astype(np.float32))
+    np.testing.assert_array_equal(history.series(middle, rehydrate), _shot(4)[1].astype(np.float32))
+    assert calls == []
+    np.testing.assert_array_equal(history.series(oldest, rehydrate), _shot(3)[1])
+    assert len(calls) == 1
+    assert calls[0][:5] == _shot(3)[0]
+    assert len(calls[0]) == len(PARAMS)
+
+
+def test_memory_reports_records_and_points():
+    history = _history(5)
+    assert history.memory() == {
+        'shots': 3,
+        'with_points': 2,
+        'records_bytes': 3 * RECORD_DTYPE.itemsize,
+        'points_bytes': 2 * 5 * N * 4,
+        'bytes': 3 * RECORD_DTYPE.itemsize + 2 * 5 * N * 4,
+    }
+    history.clear()
+    memory = history.memory()
+    assert memory['shots'] == 0 and memory['with_points'] == 0
+    # Bufory zostają zaalokowane – clear tylko zapomina strzały
+    assert memory['bytes'] == 3 * RECORD_DTYPE.itemsize + 2 * 5 * N * 4
@@ -0,0 +1,104 @@
+import math
+
+import numpy as np
+import pytest
+
+from model_kwadratowy import compute_trajectory, integrate_batch
+
+PARAMS = [
+    # v0, kąt, g, drag, mass
+    (100.0, 45.0, 9.81, 0.005, 10.0),
+    (400.0, 40.0, 9.81, 0.005, 10.0),
+    (900.0, 75.0, 9.81, 0.02, 50.0),
+    (50.0, 5.0, 3.71, 0.001, 1.0),
+]
+EXTENDED = [
+    dict(wind=-15.0),
+    dict(wind=20.0),
+    dict(scale_height=8500.0),
+    dict(y_launch=200.0),
+    dict(y_target=300.0),
+    dict(y_launch=500.0, y_target=100.0),
+    dict(wind=10.0, scale_height=3000.0, y_launch=100.0, y_target=400.0),
+]
+
+
+def _batch(params, **extended):
+    return tuple(float(r) for r in integrate_batch(*params, **extended))
+
+
+def _single(params, **extended):
+    t, x, y, vx, vy, max_height, range_val, final_speed = compute_trajectory(*params, **extended)
+    return t[-1], range_val, max_height, final_speed
+
+
+@pytest.mark.parametrize('params', PARAMS)
+def test_batch_matches_solve_ivp(params):
+    t_flight, range_val, max_height, final_speed = _batch(params)
+    expected = _single(params)
+    assert t_flight == pytest.approx(expected[0], rel=1e-6)
+    assert range_val == pytest.approx(expected[1], rel=1e-6)
+    # compute_trajectory bierze wierzchołek z próbek, integrate_batch – z interpolacji w kroku
+    assert max_height == pytest.approx(expected[2], rel=1e-4)
+    assert final_speed == pytest.approx(expected[3], rel=1e-6)
+
+
+@pytest.mark.parametrize('extended', EXTENDED)
+def test_extended_model_matches_solve_ivp(extended):
+    params = PARAMS[1]
+    t_flight, range_val, max_height, final_speed = _batch(params, **extended)
+    expected = _single(params, **extended)
+    assert t_flight == pytest.approx(expected[0], rel=1e-6)
+    assert range_val == pytest.approx(expected[1], rel=1e-6)
+    assert max_height == pytest.approx(expected[2], rel=1e-4)
+    assert final_speed == pytest.approx(expected[3], rel=1e-6)
+
+
+def test_no_drag_closed_form():
+    v0, angle, g = 300.0, 35.0, 9.81
+    vx, vy = v0 * math.cos(math.radians(angle)), v0 * math.sin(math.radians(angle))
+    t_flight, range_val, max_height, final_speed = _batch((v0, angle, g, 0.0, 1.0))
+    assert t_flight == pytest.approx(2 * vy / g, rel=1e-7)
+    assert range_val == pytest.approx(2 * vx * vy / g, rel=1e-7)
+    assert max_height == pytest.approx(vy**2 / (2 * g), rel=1e-7)
+    assert final_speed == pytest.approx(v0, rel=1e-7)
+
+
+def test_target_altitude():
+    params = PARAMS[1]
+    t, x, y, vx, vy, max_height, range_val, final_speed = compute_trajectory(*params, y_target=300.0)
+    assert y[-1] == pytest.approx(300.0, abs=1e-6)
+    assert vy[-1] < 0
+    # Cel ponad wierzchołkiem: lot kończy się w wierzchołku
+    t, x, y, vx, vy, max_height, range_val, final_speed = compute_trajectory(*params, y_target=5000.0)
+    assert max_height < 5000.0
+    assert abs(vy[-1]) < 1e-6 * params[0]
+    assert _batch(params, y_target=5000.0)[2] == pytest.approx(max_height, rel=1e-4)
+
+
+def test_batch_shapes():
+    v0 = np.array([[100.0, 200.0], [300.0, 400.0]])
+    results = integrate_batch(v0, 45.0, 9.81, 0.005, 10.0)
+    assert all(r.shape == v0.shape for r in results)
+    assert results[1][0, 1] == pytest.approx(_batch((200.0, 45.0, 9.81, 0.005, 10.0))[1])
+
+
+@pytest.mark.parametrize('n_points', [2, 300, 5000])
+def test_points_from_dense_solution(n_points):
+    # Punkty toru na żądanej siatce wprost z rozwiązania gęstego – porównanie z dokładnym DOP853
+    from scipy.integrate import solve_ivp
+
+    from model_kwadratowy import Y_START, projectile_ode
+
+    v0, angle, g, drag, mass = 300.0, 60.0, 9.81, 0.005, 10.0
+    t, x, y, vx, vy, max_height, _, _ = compute_trajectory(v0, angle, g, drag, mass, n_points=n_points)
+    assert len(t) == n_points
+    angle_rad = math.radians(angle)
+    exact = solve_ivp(lambda s, state: projectile_ode(s, state, g, drag, mass), (0.0, t[-1]),
+                      [0.0, Y_START, v0 * math.cos(angle_rad), v0 * math.sin(angle_rad)],
+                      method='DOP853', dense_output=True, rtol=1e-12, atol=1e-12).sol(t)
+    for series, reference in zip((x, y, vx, vy), exact):
+        np.testing.assert_allclose(series, reference, atol=1e-3)
+    # Wysokość maksymalna ze zdarzenia wierzchołka – niezależna od liczby punktów
+    exact_apex = compute_trajectory(v0, angle, g, drag, mass, n_points=5000)[5]
+    assert max_height == pytest.approx(exact_apex, rel=1e-9)
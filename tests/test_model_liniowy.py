@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from scipy.optimize import brentq
+
+from model_liniowy import flight_summary, landing_time, position
+
+
+def _landing_brentq(angle, v0, k1, m, g):
+    # Czas lądowania z rozwiązania numerycznego: y(t) > 0 tuż po starcie, y(t_max) < 0
+    t_max = 2 * v0 * np.sin(np.radians(angle)) / g + 1.0
+    return brentq(lambda t: position(t, angle, v0, k1, m, g)[1], 1e-9 * t_max, t_max, xtol=1e-14, rtol=1e-14)
+
+
+@pytest.mark.parametrize('angle, v0, k1, m, g', [
+    (45.0, 500.0, 1.0, 10.0, 9.81),
+    (80.0, 1000.0, 10.0, 1.0, 9.81),
+    (10.0, 20.0, 0.1, 100.0, 1.62),
+    (0.5, 100.0, 1.0, 10.0, 9.81),
+])
+def test_landing_time_matches_root(angle, v0, k1, m, g):
+    t_land = landing_time(angle, v0, k1, m, g)
+    assert t_land == pytest.approx(_landing_brentq(angle, v0, k1, m, g), rel=1e-10)
+    assert abs(position(t_land, angle, v0, k1, m, g)[1]) < 1e-8 * v0 * t_land
+
+
+def test_landing_time_small_drag_series():
+    # Znikomy opór: wynik zbiega do 2 vy0 / g (gałąź szeregu)
+    angle, v0, g = 30.0, 10.0, 9.81
+    t_land = landing_time(angle, v0, 1e-12, 1.0, g)
+    assert t_land == pytest.approx(2 * v0 * np.sin(np.radians(angle)) / g, rel=1e-9)
+
+
+def test_landing_time_never_falls():
+    assert landing_time(45.0, 100.0, 1.0, 10.0, 0.0) == np.inf
+    assert landing_time(0.0, 100.0, 1.0, 10.0, 9.81) == 0.0
+
+
+def test_landing_time_broadcasting():
+    angles = np.array([15.0, 45.0, 75.0])
+    t_land = landing_time(angles, 300.0, 1.0, 10.0, 9.81)
+    assert t_land.shape == angles.shape
+    assert t_land == pytest.approx([landing_time(a, 300.0, 1.0, 10.0, 9.81) for a in angles])
+
+
+def test_flight_summary_consistent():
+    t_flight, range_val, t_apex, max_height, final_speed, impact_angle = flight_summary(45.0, 500.0, 1.0, 10.0, 9.81)
+    x, y = position(t_flight, 45.0, 500.0, 1.0, 10.0, 9.81)
+    assert range_val == pytest.approx(x)
+    assert max_height == pytest.approx(position(t_apex, 45.0, 500.0, 1.0, 10.0, 9.81)[1])
+    assert 0 < t_apex < t_flight
@@ -0,0 +1,33 @@
+import numpy as np
+
+from odtwarzanie import Playback
+
+
+class SteppingClock:
+    # Zegar przesuwający się przy każdym odczycie – jak przy obciążonej pętli animacji
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def test_finished_decided_from_frame_time():
+    t = np.linspace(0.0, 10.0, 101)
+    playback = Playback(t, clock=SteppingClock(6.0))
+    count, t_sim = playback.frame()
+    assert t_sim < t[-1]
+    # Zegar zdążył już minąć koniec toru, ale ta klatka nie narysowała stanu końcowego
+    assert playback.sim_time() >= t[-1]
+    assert not playback.finished(t_sim)
+    count, t_sim = playback.frame()
+    assert playback.finished(t_sim)
+    assert t_sim == t[-1] and count == len(t)
+
+
+def test_run_ends_on_last_sample():
+    t = np.linspace(0.0, 1.0, 11)
+    frames = list(Playback(t, speed=100.0).run(0.001))
+    assert frames[-1] == (len(t), 1.0)
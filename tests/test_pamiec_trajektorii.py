@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+
+from pamiec_trajektorii import TrajectoryCache
+
+DATA = np.arange(100, dtype=float)
+
+
+def _entry_size(tmp_path):
+    path = tmp_path / 'rozmiar.npy'
+    np.save(path, DATA)
+    size = path.stat().st_size
+    path.unlink()
+    return size
+
+
+def test_nearby_params_share_key(tmp_path):
+    cache = TrajectoryCache(tmp_path, digits=4)
+    assert cache.quantize(100.004, 45.0, 0.0050001) == (100.0, 45.0, 0.005)
+    assert cache._path('tor', cache.quantize(100.004, 45.0)) == cache._path('tor', cache.quantize(100.0, 45.0))
+    assert cache._path('tor', cache.quantize(100.1, 45.0)) != cache._path('tor', cache.quantize(100.0, 45.0))
+    assert cache._path('tor', (100.0, 45.0)) != cache._path('inny', (100.0, 45.0))
+
+    calls = []
+
+    def compute(*params):
+        calls.append(params)
+        return DATA
+
+    cache.get_or_compute('tor', (100.004, 45.0), compute)
+    cache.get_or_compute('tor', (99.996, 45.0), compute)
+    cache.get_or_compute('tor', (100.1, 45.0), compute)
+    # Obliczenia idą na wartościach zaokrąglonych, tak jak klucz
+    assert calls == [(100.0, 45.0), (100.1, 45.0)]
+    assert cache.stats()['entries'] == 2
+
+
+def test_entries_are_memory_mapped(tmp_path):
+    cache = TrajectoryCache(tmp_path)
+    assert cache.get('tor', (1.0,)) is None
+    cache.put('tor', (1.0,), DATA)
+    data = cache.get('tor', (1.0,))
+    assert isinstance(data, np.memmap)
+    assert not data.flags.writeable
+    np.testing.assert_array_equal(data, DATA)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = TrajectoryCache(tmp_path, max_bytes=2 * _entry_size(tmp_path))
+    cache.put('tor', (1.0,), DATA)
+    cache.put('tor', (2.0,), DATA + 1)
+    # Jawne znaczniki czasu: wpis 1 starszy od 2, potem odczyt 1 czyni go najświeższym
+    os.utime(cache._path('tor', (1.0,)), (1000, 1000))
+    os.utime(cache._path('tor', (2.0,)), (2000, 2000))
+    assert cache.get('tor', (1.0,)) is not None
+
+    cache.put('tor', (3.0,), DATA + 2)
+    assert cache.get('tor', (2.0,)) is None
+    np.testing.assert_array_equal(cache.get('tor', (1.0,)), DATA)
+    np.testing.assert_array_equal(cache.get('tor', (3.0,)), DATA + 2)
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['bytes'] <= cache.max_bytes
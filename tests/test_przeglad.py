@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from model_kwadratowy import integrate_batch
+from model_liniowy import flight_summary
+from przeglad import evaluate, optimal_angle, sweep
+
+G, DRAG, MASS = 9.81, 0.005, 10.0
+
+
+def test_raised_target_optimum_reaches_target():
+    # Strzał, który nie wznosi się na wysokość celu, nie ma zasięgu – optimum musi ją osiągać
+    physics = dict(wind=0.0, scale_height=0.0, y_launch=0.0, y_target=400.0)
+    angle, range_val = optimal_angle(100.0, DRAG, MASS, G, physics=physics)
+    _, range_check, max_height, _ = integrate_batch(100.0, angle, G, DRAG, MASS, y_target=400.0)
+    assert max_height >= 400.0
+    assert range_val == pytest.approx(range_check)
+    # Najlepszy zasięg z gęstego przeglądu kątów, które dolatują do celu
+    angles = np.linspace(60.0, 90.0, 3001)
+    _, ranges, heights, _ = integrate_batch(100.0, angles, G, DRAG, MASS, y_target=400.0)
+    assert range_val == pytest.approx(ranges[heights >= 400.0].max(), rel=1e-4)
+    assert range_val >= ranges[heights >= 400.0].max() - 1e-6
+
+
+def test_shots_below_target_have_no_range():
+    t_flight, range_val, max_height, final_speed = evaluate('kwadratowy', 100.0, np.array([20.0, 85.0]), DRAG,
+                                                            MASS, G, physics=dict(y_target=400.0))
+    assert np.isnan(t_flight[0]) and np.isnan(range_val[0]) and np.isnan(final_speed[0])
+    assert max_height[0] < 400.0
+    assert np.isfinite(range_val[1]) and max_height[1] >= 400.0
+
+
+def test_unreachable_target_at_every_angle():
+    _, range_val = optimal_angle(10.0, DRAG, MASS, G, physics=dict(y_target=400.0))
+    assert np.isnan(range_val)
+
+
+def test_no_drag_matches_closed_form():
+    v0 = np.array([50.0, 100.0])
+    # Od 0.5° – przy 0° pocisk spada z wysokości startowej Y_START, więc zasięg nie jest zerowy
+    angles = np.linspace(0.5, 90.0, 180)
+    result = sweep(v0=v0, angle=angles, drag=0.0, mass=MASS, g=G, workers=1, chunk_size=100)
+    rad = np.radians(angles)
+    np.testing.assert_allclose(result['range'], v0[:, None]**2 * np.sin(2 * rad) / G, rtol=1e-5, atol=1e-4)
+    np.testing.assert_allclose(result['max_height'], (v0[:, None] * np.sin(rad))**2 / (2 * G), rtol=1e-5, atol=1e-4)
+    np.testing.assert_array_equal(result.argmax('range', 'angle'), [45.0, 45.0])
+
+    angle, range_val = optimal_angle(v0, 0.0, MASS, G, workers=1)
+    np.testing.assert_allclose(angle, 45.0, atol=1e-4)
+    np.testing.assert_allclose(range_val, v0**2 / G, rtol=1e-6)
+
+
+def test_linear_model_matches_flight_summary():
+    v0 = np.array([30.0, 80.0, 200.0])
+    angles = np.linspace(5.0, 85.0, 17)
+    k1 = 0.5
+    result = sweep('liniowy', v0=v0, angle=angles, drag=k1, mass=MASS, g=G, workers=1, chunk_size=10)
+    t_flight, range_val, _, max_height, final_speed, _ = flight_summary(angles, v0[:, None], k1, MASS, G)
+    np.testing.assert_allclose(result['t_flight'], t_flight, rtol=1e-12)
+    np.testing.assert_allclose(result['range'], range_val, rtol=1e-12)
+    np.testing.assert_allclose(result['max_height'], max_height, rtol=1e-12)
+    np.testing.assert_allclose(result['final_speed'], final_speed, rtol=1e-12)
+
+    angle, best = optimal_angle(v0, k1, MASS, G, model='liniowy', workers=1)
+    np.testing.assert_allclose(best, flight_summary(angle, v0, k1, MASS, G)[1], rtol=1e-12)
+    # Żaden kąt z gęstej siatki nie daje większego zasięgu niż znalezione optimum
+    dense = flight_summary(np.linspace(0.0, 90.0, 9001), v0[:, None], k1, MASS, G)[1]
+    assert np.all(best >= dense.max(axis=1) - 1e-6)
+    assert np.all(angle < 45.0)
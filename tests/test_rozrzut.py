@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from rozrzut import (QUANTITIES, SKETCH_ACCURACY, ImpactHistogram, QuantileSketch, RunningMoments,
+                     _chunk_impacts, simulate)
+
+NOMINAL = {'v0': 100.0, 'angle': 45.0, 'drag': 0.005, 'mass': 10.0, 'g': 9.81}
+SPREAD = {'v0': 2.0, 'angle': 0.5}
+
+
+def test_shots_below_target_altitude_are_lost():
+    # Żaden strzał pod kątem 20° nie wznosi się na 400 m – nie może być punktów upadku
+    stats = simulate(dict(NOMINAL, angle=20.0, y_target=400.0), SPREAD, 2000, workers=1)
+    assert stats.count == 0
+    assert stats.lost == 2000
+
+
+def test_only_shots_reaching_target_are_counted():
+    # Przy 85° część strzałów dolatuje na 400 m, część kończy się w wierzchołku poniżej
+    stats = simulate(dict(NOMINAL, angle=85.0, y_target=400.0), SPREAD, 2000, workers=1)
+    assert 0 < stats.lost < 2000
+    assert stats.count + stats.lost == 2000
+    assert stats.histogram.counts.sum() == stats.count
+
+
+def test_moments_merged_from_chunks_match_numpy():
+    samples = np.random.default_rng(1).normal([100.0, -5.0, 3.0], [10.0, 2.0, 0.5], size=(10001, 3))
+    total = RunningMoments(3)
+    for chunk in np.array_split(samples, 7):
+        part = RunningMoments(3)
+        part.update(chunk)
+        total.merge(part)
+    assert total.count == len(samples)
+    np.testing.assert_allclose(total.mean, samples.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(total.covariance(), np.cov(samples, rowvar=False), rtol=1e-10)
+
+
+def test_quantile_sketch_keeps_relative_accuracy():
+    rng = np.random.default_rng(2)
+    values = np.concatenate([rng.lognormal(3.0, 2.0, 20000), -rng.lognormal(1.0, 1.0, 5000), np.zeros(100)])
+    sketch = QuantileSketch()
+    for chunk in np.array_split(rng.permutation(values), 5):
+        part = QuantileSketch()
+        part.update(chunk)
+        sketch.merge(part)
+    for q in (0.0, 0.01, 0.1, 0.2, 0.5, 0.9, 0.99, 1.0):
+        # Szkic zwraca przybliżenie próbki o randze floor(q * (n - 1))
+        exact = np.quantile(values, q, method='lower')
+        assert abs(sketch.quantile(q) - exact) <= SKETCH_ACCURACY * abs(exact) * (1 + 1e-9)
+
+
+def test_histogram_matches_numpy_and_counts_outside():
+    rng = np.random.default_rng(3)
+    x, z = rng.normal(0.0, 1.0, (2, 5000))
+    edges = np.linspace(-2, 2, 21), np.linspace(-3, 3, 31)
+    histogram = ImpactHistogram(*edges)
+    for xs, zs in zip(np.array_split(x, 4), np.array_split(z, 4)):
+        histogram.update(xs, zs)
+    expected, _, _ = np.histogram2d(x, z, bins=edges)
+    np.testing.assert_array_equal(histogram.counts, expected)
+    assert histogram.outside == len(x) - expected.sum()
+
+
+@pytest.fixture(scope='module')
+def pooled():
+    return simulate(NOMINAL, SPREAD, 5000, seed=7, chunk_size=1000, workers=2)
+
+
+def test_result_does_not_depend_on_worker_count(pooled):
+    serial = simulate(NOMINAL, SPREAD, 5000, seed=7, chunk_size=1000, workers=1)
+    assert serial.count == pooled.count
+    np.testing.assert_array_equal(serial.moments.mean, pooled.moments.mean)
+    np.testing.assert_array_equal(serial.moments.m2, pooled.moments.m2)
+    np.testing.assert_array_equal(serial.histogram.counts, pooled.histogram.counts)
+    for name in QUANTITIES:
+        assert serial.quantile(name, 0.9) == pooled.quantile(name, 0.9)
+
+
+def test_statistics_match_numpy_on_the_same_samples(pooled):
+    seeds = np.random.SeedSequence(7).spawn(5)
+    samples = np.concatenate([_chunk_impacts('kwadratowy', NOMINAL, SPREAD, 1000, s) for s in seeds])
+    for i, name in enumerate(QUANTITIES):
+        assert pooled.mean(name) == pytest.approx(samples[:, i].mean(), rel=1e-10)
+        assert pooled.std(name) == pytest.approx(samples[:, i].std(ddof=1), rel=1e-8)
+        exact = np.quantile(samples[:, i], 0.5, method='lower')
+        assert pooled.quantile(name, 0.5) == pytest.approx(exact, rel=SKETCH_ACCURACY)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from przeglad import AXES
+from rzut_cli import DEFAULTS, main, parse_rows
+
+
+def test_missing_drag_uses_default_of_the_row_model():
+    rows = [{'v0': 100, 'angle': 45}, {'v0': 100, 'angle': 45, 'model': 'liniowy'}]
+    params, models = parse_rows(rows, DEFAULTS, 'kwadratowy')
+    drag = params[AXES.index('drag')]
+    assert list(models) == ['kwadratowy', 'liniowy']
+    assert drag[0] == DEFAULTS['drag']
+    assert drag[1] == DEFAULTS['k1']
+
+
+def test_explicit_drag_is_kept_for_both_models():
+    rows = [{'v0': 100, 'angle': 45, 'drag': 0.2, 'model': model} for model in ('kwadratowy', 'liniowy')]
+    params, _ = parse_rows(rows, DEFAULTS, 'kwadratowy')
+    np.testing.assert_array_equal(params[AXES.index('drag')], [0.2, 0.2])
+
+
+def test_missing_parameter_without_default_is_reported_with_line():
+    with pytest.raises(ValueError, match="wiersz 3: brak parametru 'v0'"):
+        parse_rows([{'angle': 45}], DEFAULTS, 'kwadratowy', first_line=3)
+
+
+def _run(tmp_path, capsys, name, text, *args):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(path), '-o', str(tmp_path / 'wynik.csv'), *args])
+    return exit_info.value.code, capsys.readouterr().err
+
+
+def test_invalid_jsonl_line_is_reported_with_line(tmp_path, capsys):
+    code, err = _run(tmp_path, capsys, 'dane.jsonl', '{"v0": 100, "angle": 45}\n{"v0": 100,\n')
+    assert code == 1
+    assert 'wiersz 2: niepoprawny JSON' in err
+
+
+def test_csv_lines_are_counted_after_header(tmp_path, capsys):
+    code, err = _run(tmp_path, capsys, 'dane.csv', 'v0,angle\n100,45\n100,abc\n', '--chunk', '1')
+    assert code == 1
+    assert "wiersz 3: niepoprawna wartość angle='abc'" in err
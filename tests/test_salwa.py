@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from model_liniowy import flight_summary, position
+from odtwarzanie import Playback
+from salwa import SALVO_POINTS, Salvo, spread
+
+matplotlib = pytest.importorskip('matplotlib')
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+
+from rzut_ukosny import ProjectileSimulation  # noqa: E402
+
+K1, M, G = 1.0, 10.0, 9.81
+FRAMES = 20
+
+
+class SteppingClock:
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def _landing_points(salvo):
+    # Salwa liczy tory modelem liniowym – punkty upadku z jego postaci zamkniętej
+    t_flight, range_val = flight_summary(salvo.angle, salvo.v0, K1, M, G)[:2]
+    return t_flight, np.stack([range_val, np.zeros_like(range_val)], axis=-1)
+
+
+def test_salvo_endpoints_match_closed_form():
+    angles, v0s = spread(45.0, 100.0, 50, 10.0, 0.1, rng=np.random.default_rng(0))
+    salvo = Salvo(angles, v0s, K1, M, G)
+    t_flight, landing = _landing_points(salvo)
+    np.testing.assert_allclose(salvo.t_end, t_flight, rtol=1e-12)
+    np.testing.assert_allclose(salvo.samples[:, 0], 0.0, atol=1e-12)
+    np.testing.assert_allclose(salvo.samples[:, -1], landing, rtol=1e-9, atol=1e-9)
+
+    # W połowie najdłuższego lotu: położenia pocisków w locie z modelu, wylądowane w punkcie upadku
+    t = salvo.duration / 2
+    in_flight = salvo.advance(t)
+    flying = t_flight > t
+    assert in_flight == flying.sum()
+    x, y = position(t, salvo.angle[flying], salvo.v0[flying], K1, M, G)
+    np.testing.assert_allclose(salvo.heads[flying], np.stack([x, y], axis=-1), rtol=1e-12)
+    np.testing.assert_allclose(salvo.heads[~flying], landing[~flying], rtol=1e-9, atol=1e-9)
+
+    assert salvo.advance(salvo.duration) == 0
+    np.testing.assert_array_equal(salvo.lines, salvo.samples)
+
+
+@pytest.mark.parametrize('blit', [True, False])
+def test_headless_salvo_animation(blit):
+    sim = ProjectileSimulation(blit=blit, salvo_size=30)
+    sim.k1, sim.m, sim.g = K1, M, G
+    try:
+        sim.fig.canvas.draw()
+        sim.start_salvo(None)
+        sim.anim.event_source.stop()
+        salvo = sim.salvo
+        # Zegar przesuwany ręcznie – cała salwa w FRAMES klatkach
+        step = salvo.duration / FRAMES / sim.speed_factor
+        sim.playback = Playback(sim.t_points, sim.speed_factor, clock=SteppingClock(step))
+
+        assert len(sim.salvo_lines.get_paths()) == 30
+        in_flight = []
+        for frame in range(2 * FRAMES):
+            if not sim.simulation_running:
+                break
+            sim.update_frame(frame)
+            sim.fig.canvas.draw()
+            in_flight.append(sim.shown)
+        assert not sim.simulation_running
+        assert in_flight[-1] == 0
+        assert all(a >= b for a, b in zip(in_flight, in_flight[1:]))
+
+        paths = sim.salvo_lines.get_paths()
+        assert len(paths) == 30
+        assert all(len(path.vertices) == SALVO_POINTS for path in paths)
+        _, landing = _landing_points(salvo)
+        ends = np.array([path.vertices[-1] for path in paths])
+        np.testing.assert_allclose(ends, landing, rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose([path.vertices[0] for path in paths], 0.0, atol=1e-12)
+        np.testing.assert_allclose(np.column_stack(sim.salvo_heads.get_data()), landing, rtol=1e-9, atol=1e-9)
+    finally:
+        plt.close(sim.fig)
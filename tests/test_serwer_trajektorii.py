@@ -0,0 +1,63 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+import serwer_trajektorii
+from serwer_trajektorii import TrajectoryServer
+
+
+@pytest.fixture
+def server():
+    server = TrajectoryServer(('127.0.0.1', 0), workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _post(server, path, body):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=30)
+    try:
+        conn.request('POST', path, body.encode('utf-8'))
+        response = conn.getresponse()
+        return response.status, response.read().decode('utf-8')
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('body', ['[1, 2]', '{"v0": 100}\n[1]', '{"v0": 100}\n{"v0": ', '{"v0": 100}',
+                                  '[{"v0": "abc"}]'])
+def test_batch_rejects_invalid_rows_with_400(server, body):
+    status, text = _post(server, '/wsad', body)
+    assert status == 400
+    assert 'blad' in json.loads(text)
+
+
+def test_batch_streams_one_line_per_row(server):
+    status, text = _post(server, '/wsad', '{"v0": 100, "angle": 45}\n{"v0": 50, "angle": 30, "model": "liniowy"}\n')
+    assert status == 200
+    lines = [json.loads(line) for line in text.splitlines()]
+    assert [line['model'] for line in lines] == ['kwadratowy', 'liniowy']
+    assert all(line['range'] > 0 for line in lines)
+
+
+def test_batch_error_after_headers_ends_stream_with_error_line(server, monkeypatch):
+    def failing(params, models):
+        raise RuntimeError("awaria")
+    monkeypatch.setattr(serwer_trajektorii, 'evaluate_params', failing)
+    status, text = _post(server, '/wsad', '[{"v0": 100, "angle": 45}]')
+    assert status == 200
+    assert json.loads(text.splitlines()[-1]) == {'blad': 'RuntimeError: awaria'}
+
+
+
+def test_trajectory_points_on_requested_grid(server):
+    status, text = _post(server, '/trajektoria', '{"v0": 300, "angle": 60, "punkty": 5000}')
+    assert status == 200
+    result = json.loads(text)
+    assert len(result['t']) == 5000
+    assert result['t'][-1] == pytest.approx(result['t_flight'])
+    assert max(result['y']) <= result['max_height'] + 1e-6
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from model_kwadratowy import integrate_batch
+from tablica_strzelnicza import build_table, stretched_axis
+
+
+@pytest.fixture(scope='module')
+def table():
+    # Mała siatka – ten sam kod co tablica domyślna, ale liczy się w ułamku sekundy
+    return build_table(np.linspace(0, 1000, 21), np.linspace(0, 90, 19), stretched_axis(0.005, 11), [9.81],
+                       workers=1)
+
+
+@pytest.fixture(scope='module')
+def queries():
+    rng = np.random.default_rng(0)
+    n = 2000
+    v0 = rng.uniform(0, 1000, n)
+    angle = rng.uniform(0, 90, n)
+    k = rng.uniform(0, 0.005, n)
+    t_flight, range_val, max_height, _ = integrate_batch(v0, angle, 9.81, k, 1.0)
+    return v0, angle, k, np.stack([t_flight, range_val, max_height])
+
+
+def test_error_bound_holds(table, queries):
+    v0, angle, k, exact = queries
+    values, error, inside = table.interpolate(v0, angle, k, 9.81)
+    assert inside.all()
+    assert np.all(np.abs(values - exact) <= error)
+
+
+def test_query_within_reported_error(table, queries):
+    v0, angle, k, exact = queries
+    t_flight, range_val, max_height, range_error = table.query(v0, angle, 9.81, k, 1.0, rtol=1e-2)
+    assert np.all(np.abs(range_val - exact[1]) <= range_error + 1e-9 * np.abs(exact[1]))
+    served = range_error > 0
+    assert np.all(range_error[served] <= 1e-2 * np.maximum(np.abs(range_val[served]), 1.0))
+
+
+def test_outside_grid_is_integrated(table):
+    t_flight, range_val, max_height, range_error = table.query(1500.0, 45.0, 9.81, 0.005, 1.0)
+    assert range_error == 0.0
+    assert range_val == pytest.approx(integrate_batch(1500.0, 45.0, 9.81, 0.005, 1.0)[1])
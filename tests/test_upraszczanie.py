@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from model_liniowy import trajectory
+from upraszczanie import PLOT_HEIGHT, PLOT_WIDTH, simplify, simplify_indices
+
+
+def _pixels(x, y, x_range, y_range):
+    return ((x - x_range[0]) / (x_range[1] - x_range[0]) * PLOT_WIDTH,
+            (y - y_range[0]) / (y_range[1] - y_range[0]) * PLOT_HEIGHT)
+
+
+def _max_deviation(px, py, keep):
+    # Największa odległość punktu pełnej łamanej od odcinka uproszczonej, na którym leży
+    seg = np.clip(np.searchsorted(keep, np.arange(len(px)), side='right') - 1, 0, len(keep) - 2)
+    ax, ay = px[keep[seg]], py[keep[seg]]
+    dx, dy = px[keep[seg + 1]] - ax, py[keep[seg + 1]] - ay
+    length2 = dx**2 + dy**2
+    u = np.clip(((px - ax) * dx + (py - ay) * dy) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+    return np.max(np.hypot(px - ax - u * dx, py - ay - u * dy))
+
+
+@pytest.mark.parametrize('angle, k1', [(45.0, 0.1), (80.0, 2.0), (5.0, 0.5)])
+@pytest.mark.parametrize('tolerance', [0.5, 2.0])
+def test_keeps_key_points_within_tolerance(angle, k1, tolerance):
+    _, x, y = trajectory(angle, 100.0, k1, 10.0, 9.81, n_points=5000)
+    x_range, y_range = (0.0, x.max()), (0.0, y.max())
+    keep = simplify_indices(x, y, tolerance, x_range=x_range, y_range=y_range)
+
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.argmax(y) in keep
+    assert np.all(np.diff(keep) > 0)
+    assert len(keep) < len(x) // 10
+    px, py = _pixels(x, y, x_range, y_range)
+    assert _max_deviation(px, py, keep) <= tolerance + 1e-9
+
+    xs, ys = simplify(x, y, tolerance, x_range=x_range, y_range=y_range)
+    np.testing.assert_array_equal(xs, x[keep])
+    np.testing.assert_array_equal(ys, y[keep])
@@ -0,0 +1,32 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from zadania import JobRunner
+
+
+def _job(value, progress, cancel):
+    progress(1.0)
+    return value
+
+
+def test_shared_executor_outlives_runner():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        first, second = JobRunner(executor=executor), JobRunner(executor=executor)
+        assert first.submit('a', _job, 1).future.result(timeout=5) == 1
+        first.shutdown()
+        assert second.submit('a', _job, 2).future.result(timeout=5) == 2
+
+
+def test_same_key_joins_running_job():
+    release = threading.Event()
+
+    def slow(value, progress, cancel):
+        release.wait(5)
+        return value
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        runner = JobRunner(executor=executor)
+        job = runner.submit('k', slow, 1)
+        assert runner.submit('k', slow, 2) is job
+        release.set()
+        assert job.result() == 1
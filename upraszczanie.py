@@ -0,0 +1,67 @@
+import numpy as np
+
+# Upraszczanie trajektorii przed rysowaniem: zostawiamy najmniej punktów, przy których narysowana
+# łamana odbiega od pełnej o co najwyżej `tolerance` pikseli (algorytm Ramera–Douglasa–Peuckera
+# w układzie pikseli). Wierzchołek toru i punkt uderzenia są zachowywane zawsze.
+
+# Domyślny rozmiar obszaru wykresu w pikselach, gdy wywołujący go nie zna
+PLOT_WIDTH = 1200
+PLOT_HEIGHT = 600
+TOLERANCE_PX = 0.5
+
+
+def _scale(values, value_range, pixels):
+    lo, hi = value_range if value_range is not None else (np.min(values), np.max(values))
+    span = hi - lo
+    return pixels / span if span > 0 else 0.0
+
+
+def simplify_indices(x, y, tolerance=TOLERANCE_PX, width=PLOT_WIDTH, height=PLOT_HEIGHT,
+                     x_range=None, y_range=None):
+    # Posortowane indeksy punktów do narysowania. x_range / y_range to zakresy osi wykresu –
+    # przy wielu nałożonych trajektoriach należy podać wspólne, aby tolerancja była w tych samych pikselach.
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= 2:
+        return np.arange(n)
+    px = x * _scale(x, x_range, width)
+    py = y * _scale(y, y_range, height)
+
+    keep = np.zeros(n, dtype=bool)
+    apex = int(np.argmax(y))
+    keep[[0, apex, n - 1]] = True
+    stack = [(0, apex), (apex, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        dx = px[b] - px[a]
+        dy = py[b] - py[a]
+        seg = np.hypot(dx, dy)
+        rx = px[a + 1:b] - px[a]
+        ry = py[a + 1:b] - py[a]
+        if seg > 0:
+            dist = np.abs(dx * ry - dy * rx) / seg
+        else:
+            dist = np.hypot(rx, ry)
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = a + 1 + i
+            keep[mid] = True
+            stack.append((a, mid))
+            stack.append((mid, b))
+    return np.flatnonzero(keep)
+
+
+def simplify(x, y, tolerance=TOLERANCE_PX, width=PLOT_WIDTH, height=PLOT_HEIGHT, x_range=None, y_range=None):
+    idx = simplify_indices(x, y, tolerance, width, height, x_range, y_range)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def prefix(keep, i):
+    # Indeksy uproszczonej krzywej dla pierwszych i punktów (animacje): zachowane punkty przed
+    # i-tym plus bieżący koniec trajektorii
+    head = np.searchsorted(keep, i - 1)
+    return np.append(keep[:head], i - 1)
+
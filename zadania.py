@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from model_kwadratowy import ComputationCancelled
+
+# Obliczenia w tle dla aplikacji Streamlit: skrypt zleca zadanie i od razu wraca, a strona
+# odpytuje postęp. Zadania o tym samym kluczu (np. tych samych parametrach) w trakcie liczenia
+# są łączone w jedno. Funkcja zadania dostaje argumenty progress(ułamek) i cancel (threading.Event),
+# które sprawdza w trakcie pracy – przerwanie kończy się wyjątkiem ComputationCancelled.
+# JobRunner może korzystać ze wspólnej puli wątków (executor) – wtedy jej nie zamyka, a sam nie
+# trzyma żadnych wątków, więc porzucony obiekt (np. po końcu sesji) niczego nie zostawia.
+
+DEFAULT_WORKERS = 2
+
+
+class Job:
+    def __init__(self, key):
+        self.key = key
+        self.progress = 0.0
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    def report(self, fraction):
+        # Wywoływane z wątku roboczego; postęp nigdy się nie cofa
+        self.progress = max(self.progress, min(float(fraction), 1.0))
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.future.cancel()
+
+    def done(self):
+        return self.future.done()
+
+    def cancelled(self):
+        if self.future.cancelled():
+            return True
+        return self.future.done() and isinstance(self.future.exception(), ComputationCancelled)
+
+    def result(self):
+        return self.future.result()
+
+    def error(self):
+        # Wyjątek zadania innego niż przerwanie albo None
+        if not self.future.done() or self.cancelled():
+            return None
+        return self.future.exception()
+
+
+class JobRunner:
+    def __init__(self, max_workers=DEFAULT_WORKERS, executor=None):
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='symulacje')
+        self._executor = executor
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args):
+        # Zleca func(*args, progress=..., cancel=...) albo zwraca trwające zadanie o tym samym kluczu
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.done() and not job.cancel_event.is_set():
+                return job
+            job = Job(key)
+            job.future = self._executor.submit(func, *args, progress=job.report, cancel=job.cancel_event)
+            self._jobs[key] = job
+        job.future.add_done_callback(lambda _: self._forget(job))
+        return job
+
+    def _forget(self, job):
+        with self._lock:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+
+    def active(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel_all(self):
+        for job in self.active():
+            job.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+